@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, files, admin
+from app.api.v1 import auth, files, uploads, admin
 
 router = APIRouter()
 
 router.include_router(auth.router)
+router.include_router(uploads.router)
 router.include_router(files.router)
 router.include_router(admin.router)
\ No newline at end of file
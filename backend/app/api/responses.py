@@ -0,0 +1,155 @@
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from typing import AsyncIterator, Callable, Mapping, Optional
+import anyio
+import os
+import uuid
+
+
+class SendfileResponse(Response):
+    """
+    Отдача файла (или его диапазона) с локального диска.
+
+    Если ASGI-сервер поддерживает расширение http.response.zerocopysend,
+    данные уходят в сокет через sendfile без копирования в userspace;
+    иначе файл читается кусками через os.pread в пуле потоков.
+
+    Принимает уже открытый дескриптор (и закрывает его после отправки):
+    файл из дискового кэша может быть вытеснен в любой момент, а открытый
+    дескриптор остаётся читаемым и после удаления файла.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        fd: int,
+        offset: int = 0,
+        length: Optional[int] = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: str = "application/octet-stream",
+    ) -> None:
+        self.fd = fd
+        self.offset = offset
+        self.length = length if length is not None else os.fstat(fd).st_size - offset
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers.setdefault("content-length", str(self.length))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        fd = self.fd
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            if scope["method"].upper() == "HEAD":
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            else:
+                await self._send_chunks(fd, send)
+        finally:
+            os.close(fd)
+
+    async def _send_chunks(self, fd: int, send: Send) -> None:
+        position = self.offset
+        remaining = self.length
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, remaining), position)
+            if not chunk:
+                break
+            position += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0 or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _open_local(local_path: Optional[str]) -> Optional[int]:
+    """Дескриптор файла на диске или None, если файла уже нет (вытеснен из кэша)"""
+    if not local_path:
+        return None
+    try:
+        return os.open(local_path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+
+
+def ranged_response(
+    open_stream: Callable[[int, Optional[int]], AsyncIterator[bytes]],
+    size: int,
+    ranges: Optional[list[tuple[int, int]]],
+    headers: dict,
+    local_path: Optional[str] = None,
+    media_type: str = "application/octet-stream",
+) -> Response:
+    """
+    Ответ на скачивание: весь файл (200), один диапазон (206) или
+    несколько диапазонов (206, multipart/byteranges).
+
+    open_stream(offset, length) открывает поток нужного куска из хранилища,
+    так что читаются только запрошенные байты. С local_path диапазоны
+    отдаются с диска через SendfileResponse; файл открывается здесь же,
+    и если его уже нет, ответ идёт потоком из хранилища.
+    """
+    headers = {**headers, "Accept-Ranges": "bytes"}
+
+    if not ranges:
+        headers["Content-Length"] = str(size)
+        fd = _open_local(local_path)
+        if fd is not None:
+            return SendfileResponse(fd, 0, size, headers=headers, media_type=media_type)
+        return StreamingResponse(open_stream(0, None), media_type=media_type, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(length)
+        fd = _open_local(local_path)
+        if fd is not None:
+            return SendfileResponse(fd, start, length, status_code=206, headers=headers, media_type=media_type)
+        return StreamingResponse(open_stream(start, length), status_code=206, media_type=media_type, headers=headers)
+
+    boundary = uuid.uuid4().hex
+    part_headers = [
+        (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("latin-1")
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    content_length = (
+        sum(len(h) for h in part_headers)
+        + sum(end - start + 1 for start, end in ranges)
+        + 2 * (len(ranges) - 1)  # \r\n между частями
+        + len(closing)
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        for index, ((start, end), part_header) in enumerate(zip(ranges, part_headers)):
+            yield (b"\r\n" if index else b"") + part_header
+            async for chunk in open_stream(start, end - start + 1):
+                yield chunk
+        yield closing
+
+    headers["Content-Length"] = str(content_length)
+    return StreamingResponse(
+        body(),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.services.admin_service import AdminService
+from app.jobs.base import JobQueueError
 from app.middleware.admin_middleware import require_admin
 from app.database import get_db
 from typing import Optional
@@ -146,6 +147,7 @@ async def get_dashboard(
     - User counts
     - File counts
     - Storage usage
+    - Chunk store usage and deduplication ratio
     - File type distribution
     """
     service = AdminService(db)
@@ -168,3 +170,98 @@ async def get_top_users(
         "limit": limit,
         "top_users": top_users
     }
+
+@router.get("/cache-stats", summary="Get storage cache statistics (Admin)")
+async def get_cache_stats(
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get read cache counters:
+    - Entries and bytes used
+    - Hits, misses, fills and evictions
+    """
+    service = AdminService(db)
+    return service.get_cache_stats()
+
+@router.get("/jobs", summary="Get background job queue statistics (Admin)")
+async def get_job_stats(
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get per-queue job statistics:
+    - Depth: ready, in flight, delayed for retry and dead-lettered jobs
+    - Age of the oldest waiting job
+    - Processed, retried and failed counters
+    - Average wait and run time
+    """
+    service = AdminService(db)
+    try:
+        return await service.get_job_stats()
+    except JobQueueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/cpu", summary="Get CPU task pool statistics (Admin)")
+async def get_cpu_stats(
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get per-task-type statistics of the shared CPU pools (hash, compress, image):
+    - Concurrency limit, running and waiting tasks
+    - Completed, failed and rejected counters
+    - Average and maximum wait time, average run time
+    """
+    service = AdminService(db)
+    return service.get_cpu_stats()
+
+# ================== СБОРКА МУСОРА ==================
+
+@router.post("/gc", summary="Collect deleted files (Admin)")
+async def collect_garbage(
+    dry_run: bool = Query(True),
+    max_files: Optional[int] = Query(None, ge=1),
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Permanently remove files that were deleted more than the grace period ago.
+    Expired upload sessions and presigned uploads are removed in the same run.
+    - dry_run=true (default): report what would be removed, change nothing
+    - dry_run=false: queue a collection run; progress is checkpointed in /admin/gc
+    """
+    service = AdminService(db)
+    try:
+        return await service.collect_garbage(dry_run, max_files)
+    except JobQueueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/gc", summary="Get garbage collection runs (Admin)")
+async def get_gc_runs(
+    limit: int = Query(20, le=100),
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get recent garbage collection runs with their checkpoint and counters.
+    """
+    service = AdminService(db)
+    return {"runs": service.get_gc_runs(limit)}
+
+@router.post("/versions/prune", summary="Prune old file versions (Admin)")
+async def prune_versions(
+    admin: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue removal of file versions beyond the retention rules:
+    - More than FILE_VERSIONS_MAX older versions per file
+    - Versions replaced more than FILE_VERSION_RETENTION_DAYS ago
+    Versions are deleted in small batches to keep the load on the database low.
+    """
+    service = AdminService(db)
+    try:
+        return await service.prune_versions()
+    except JobQueueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
@@ -1,19 +1,84 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.services.file_service import FileService
-from app.middleware.auth import get_current_user
+from app.services.image_service import ImageService, generate_standard_derivatives
+from app.api.responses import ranged_response
+from app.jobs.base import JobQueueError
+from app.jobs.tasks import enqueue
+from app.utils.compression import accepts_encoding
+from app.utils.cpu_executor import CpuBusyError
+from app.utils.http_cache import content_disposition, evaluate_preconditions, http_date, if_range_allows, make_etag
+from app.utils.http_ranges import RangeNotSatisfiableError, parse_range_header
+from app.utils.images import IMAGE_FORMATS
+from app.models.file import (
+    BatchUploadResponse,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    FileUploadResponse,
+    FileVersionListResponse,
+    FileVersionResponse,
+    PresignedDownloadResponse,
+    PresignedUploadCreate,
+    PresignedUploadResponse,
+    UploadByHashRequest,
+    UploadByHashResponse,
+)
+from app.schemas.file import File as FileModel
+from app.schemas.file_version import FileVersion
+from app.middleware.auth import get_active_user, get_current_user
 from app.database import get_db
-import io
+from app.config import get_settings
+import hashlib
+import json
 
 router = APIRouter(prefix="/files", tags=["Files"])
+settings = get_settings()
+
+
+def _cache_headers(etag: str, last_modified: datetime, immutable: bool = False) -> dict:
+    """Валидаторы и политика кэширования ответа"""
+    if immutable:
+        cache_control = f"private, max-age={settings.DOWNLOAD_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = "private, no-cache"
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control,
+    }
+
+
+def _precondition_response(request: Request, headers: dict, last_modified: datetime) -> Optional[Response]:
+    """Ответ 304/412 на условный запрос, если он нужен"""
+    status = evaluate_preconditions(request.headers, headers["ETag"], last_modified)
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    if status == 412:
+        return Response(status_code=412, headers={"ETag": headers["ETag"]})
+    return None
+
+
+async def _schedule_thumbnails(background_tasks: BackgroundTasks, file_id: str, filename: Optional[str]):
+    """Миниатюры стандартных размеров генерируются фоновой задачей после ответа"""
+    if not (settings.IMAGE_EAGER_WIDTHS and ImageService.is_image(filename)):
+        return
+    try:
+        await enqueue("generate_thumbnails", file_id=file_id)
+    except JobQueueError as e:
+        # Очередь недоступна — в этом процессе после отправки ответа
+        print(f"Warning: {e}")
+        background_tasks.add_task(generate_standard_derivatives, file_id)
 
 
 @router.post("/upload", summary="Upload a file")
 async def upload_file(
+        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         folder: str = Query("root"),
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_active_user),
         db: Session = Depends(get_db)
 ):
     """
@@ -23,6 +88,7 @@ async def upload_file(
     try:
         service = FileService(db)
         result = await service.upload_file(current_user['sub'], file, folder)
+        await _schedule_thumbnails(background_tasks, result.id, result.filename)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -30,6 +96,91 @@ async def upload_file(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+@router.post("/upload/batch", response_model=BatchUploadResponse, summary="Upload several files")
+async def upload_files(
+        background_tasks: BackgroundTasks,
+        files: List[UploadFile] = File(...),
+        folder: str = Query("root"),
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Upload several files in one request.
+    Each file is reported separately; a failed file does not fail the batch.
+    """
+    try:
+        service = FileService(db)
+        result = await service.upload_files(current_user['sub'], files, folder)
+        for item in result.results:
+            if item.success:
+                await _schedule_thumbnails(background_tasks, item.file.id, item.filename)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.post("/upload/by-hash", response_model=UploadByHashResponse, summary="Upload by content hash")
+async def upload_by_hash(
+        data: UploadByHashRequest,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Create a file from content the server already stores (SHA-256 + size),
+    without sending the bytes.
+
+    Content already present in the caller's own files is linked right away.
+    Otherwise the response carries a `challenge`: repeat the request with its
+    `token` as `challenge` and the SHA-256 of bytes `[offset, offset + length)`
+    of the file as `range_sha256`. If `exists` is still false, upload the file
+    as usual.
+    """
+    try:
+        service = FileService(db)
+        return await service.upload_by_hash(current_user['sub'], data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/presigned/upload", response_model=PresignedUploadResponse, summary="Get a presigned upload URL")
+async def create_presigned_upload(
+        data: PresignedUploadCreate,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Issue a short-lived URL for uploading the file straight to object storage.
+    PUT the bytes to the URL, then call the complete endpoint to register the file.
+    """
+    try:
+        service = FileService(db)
+        return await service.create_presigned_upload(current_user['sub'], data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/presigned/upload/{upload_id}/complete",
+    response_model=FileUploadResponse,
+    summary="Complete a presigned upload"
+)
+async def complete_presigned_upload(
+        upload_id: str,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """Register the object uploaded through a presigned URL as a file"""
+    try:
+        service = FileService(db)
+        return await service.complete_presigned_upload(upload_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
 @router.get("/", summary="List user files")
 async def list_files(
         folder: str = Query("root"),
@@ -44,25 +195,255 @@ async def list_files(
     return files
 
 
+@router.get("/archive", summary="Download files as a ZIP archive")
+async def download_archive(
+        file_ids: Optional[List[str]] = Query(None, description="Files to include, in archive order"),
+        folder: Optional[str] = Query(None, description="Archive the whole folder instead"),
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Download several files, or a whole folder, as one ZIP archive.
+    The archive is streamed while it is built; nothing is staged server-side.
+    """
+    try:
+        service = FileService(db)
+        files = service.get_archive_files(current_user['sub'], file_ids, folder)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    archive_name = f"{folder}.zip" if folder and not file_ids else "files.zip"
+    return StreamingResponse(
+        service.stream_archive(files),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(archive_name)}
+    )
+
+
+def _download_response(
+        request: Request,
+        service: FileService,
+        file: Union[FileModel, FileVersion],
+        last_modified: datetime,
+        v: Optional[str]
+) -> Response:
+    """Ответ на скачивание содержимого файла или одной из его версий"""
+    # Сжатый при хранении файл отдаётся как есть, если клиент принимает
+    # этот Content-Encoding и не просит диапазонов (они — по исходному содержимому)
+    encoded = bool(file.codec) and "range" not in request.headers and accepts_encoding(
+        request.headers.get("accept-encoding"), file.codec
+    )
+
+    # Содержимое однозначно задаётся хешем: условные запросы решаются
+    # по записи в БД, без обращения к хранилищу. Сжатое представление —
+    # другие байты, поэтому у него свой ETag
+    etag = make_etag(f"{file.file_hash}.{file.codec}" if encoded else file.file_hash)
+    cache_headers = _cache_headers(etag, last_modified, immutable=v == file.file_hash)
+    if file.codec:
+        cache_headers["Vary"] = "Accept-Encoding"
+    not_modified = _precondition_response(request, cache_headers, last_modified)
+    if not_modified:
+        return not_modified
+
+    ranges = None
+    if if_range_allows(request.headers, etag, last_modified):
+        try:
+            ranges = parse_range_header(request.headers.get("range"), file.file_size)
+        except RangeNotSatisfiableError:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{file.file_size}"}
+            )
+
+    headers = {
+        "Content-Disposition": content_disposition(file.original_name),
+        **cache_headers,
+    }
+    if encoded:
+        headers["Content-Encoding"] = file.codec
+
+    return ranged_response(
+        lambda offset, length: service.stream_file(file, offset, length, encoded),
+        size=file.stored_size if encoded else file.file_size,
+        ranges=ranges,
+        headers=headers,
+        # Локальное хранилище: отдача с диска без копирования в userspace
+        local_path=service.local_path(file, encoded),
+    )
+
+
 @router.get("/{file_id}/download", summary="Download file")
 async def download_file(
+        file_id: str,
+        request: Request,
+        v: Optional[str] = Query(None, description="Content hash; pins the URL so it can be cached as immutable"),
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Download a file, or byte ranges of it when a Range header is sent"""
+    try:
+        service = FileService(db)
+        file = service.get_file(file_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return _download_response(request, service, file, file.updated_at, v)
+
+
+@router.post("/{file_id}/versions", response_model=FileVersionResponse, summary="Upload a new version")
+async def upload_version(
+        file_id: str,
+        background_tasks: BackgroundTasks,
+        file: UploadFile = File(...),
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Upload new content for an existing file.
+    The previous content is kept as an older version.
+    """
+    service = FileService(db)
+    try:
+        service.get_file(file_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        result = await service.upload_version(file_id, current_user['sub'], file)
+        await _schedule_thumbnails(background_tasks, file_id, result.filename)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.get("/{file_id}/versions", response_model=FileVersionListResponse, summary="List file versions")
+async def list_versions(
         file_id: str,
         current_user: dict = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    """Download a file"""
+    """List the current and previous versions of a file, newest first"""
+    try:
+        return FileService(db).get_versions(file_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{file_id}/versions/{version}/download", summary="Download a file version")
+async def download_version(
+        file_id: str,
+        version: int,
+        request: Request,
+        v: Optional[str] = Query(None, description="Content hash; pins the URL so it can be cached as immutable"),
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Download a specific version of a file; supports Range like the regular download"""
     try:
         service = FileService(db)
-        file_data, filename = await service.download_file(file_id, current_user['sub'])
+        content = service.get_version(file_id, current_user['sub'], version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-        return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type="application/octet-stream",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+    last_modified = content.updated_at if isinstance(content, FileModel) else content.uploaded_at
+    return _download_response(request, service, content, last_modified, v)
+
+
+@router.get("/{file_id}/download-url", response_model=PresignedDownloadResponse, summary="Get a presigned download URL")
+async def get_download_url(
+        file_id: str,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Issue a short-lived URL for downloading the file straight from object storage"""
+    try:
+        service = FileService(db)
+        file = service.get_file(file_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        return service.presigned_download(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{file_id}/thumbnail", summary="Download a resized image")
+async def download_thumbnail(
+        file_id: str,
+        request: Request,
+        width: int = Query(256, ge=16, le=settings.IMAGE_MAX_WIDTH),
+        format: str = Query("webp", pattern="^(webp|jpeg|png)$"),
+        v: Optional[str] = Query(None, description="Content hash; pins the URL so it can be cached as immutable"),
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Resized copy of an image file, never upscaled. `width` is rounded up to
+    the nearest standard thumbnail width, so the image may be slightly wider.
+    Generated on the first request and served from storage afterwards.
+    """
+    try:
+        file = FileService(db).get_file(file_id, current_user['sub'])
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    # Копия однозначно задаётся содержимым и параметрами
+    width = ImageService.snap_width(width)
+    etag = make_etag(f"{file.file_hash}.w{width}.{format}")
+    cache_headers = _cache_headers(etag, file.updated_at, immutable=v == file.file_hash)
+    not_modified = _precondition_response(request, cache_headers, file.updated_at)
+    if not_modified:
+        return not_modified
+
+    service = ImageService(db)
+    try:
+        derivative = await service.get_derivative(file, width, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CpuBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    ranges = None
+    if if_range_allows(request.headers, etag, file.updated_at):
+        try:
+            ranges = parse_range_header(request.headers.get("range"), derivative.size)
+        except RangeNotSatisfiableError:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{derivative.size}"}
+            )
+
+    return ranged_response(
+        lambda offset, length: service.stream(derivative, offset, length),
+        size=derivative.size,
+        ranges=ranges,
+        headers=cache_headers,
+        local_path=service.local_path(derivative),
+        media_type=IMAGE_FORMATS[format][1],
+    )
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteResponse, summary="Delete several files")
+async def delete_files(
+        data: BulkDeleteRequest,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Delete files by `file_ids` or every file in `folder`.
+    IDs that are missing, already deleted or not owned are listed in `not_found`.
+    """
+    try:
+        service = FileService(db)
+        return await service.delete_files(current_user['sub'], data.file_ids, data.folder)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.delete("/{file_id}", summary="Delete file")
 async def delete_file(
@@ -98,13 +479,21 @@ async def rename_file(
 @router.get("/{file_id}/metadata", summary="Get file metadata")
 async def get_file_metadata(
         file_id: str,
+        request: Request,
         current_user: dict = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Get file metadata"""
     try:
         service = FileService(db)
-        metadata = service.get_file_metadata(file_id, current_user['sub'])
-        return metadata
+        file = service.get_file(file_id, current_user['sub'])
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+    metadata = service.file_metadata(file)
+    digest = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()[:32]
+    cache_headers = _cache_headers(make_etag(digest), file.updated_at)
+    not_modified = _precondition_response(request, cache_headers, file.updated_at)
+    if not_modified:
+        return not_modified
+    return JSONResponse(metadata, headers=cache_headers)
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from app.services.upload_session_service import UploadSessionService
+from app.models.file import UploadSessionCreate, UploadSessionResponse, UploadSessionStatusResponse
+from app.middleware.auth import get_active_user, get_current_user
+from app.database import get_db
+
+router = APIRouter(prefix="/files/uploads", tags=["Resumable Uploads"])
+
+
+@router.post("", response_model=UploadSessionResponse, summary="Create upload session")
+async def create_upload_session(
+        data: UploadSessionCreate,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Start a resumable upload.
+    The file is then sent as `total_chunks` chunks of `chunk_size` bytes (the last one may be shorter).
+    """
+    try:
+        service = UploadSessionService(db)
+        return await service.create_session(current_user['sub'], data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.put("/{session_id}/chunks/{index}", summary="Upload a chunk")
+async def upload_chunk(
+        session_id: str,
+        index: int,
+        request: Request,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Upload chunk number `index` (starting at 0) as the raw request body.
+    Chunks can be sent in any order and in parallel; re-sending a chunk overwrites it.
+    """
+    try:
+        service = UploadSessionService(db)
+        return await service.upload_chunk(session_id, current_user['sub'], index, request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.get("/{session_id}", response_model=UploadSessionStatusResponse, summary="Get upload session status")
+async def get_upload_session(
+        session_id: str,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """List received and missing chunks, to resume an interrupted upload"""
+    try:
+        service = UploadSessionService(db)
+        return service.get_status(session_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/{session_id}/complete", summary="Complete upload session")
+async def complete_upload_session(
+        session_id: str,
+        current_user: dict = Depends(get_active_user),
+        db: Session = Depends(get_db)
+):
+    """Assemble the uploaded chunks into a file"""
+    try:
+        service = UploadSessionService(db)
+        return await service.complete_session(session_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.delete("/{session_id}", summary="Abort upload session")
+async def abort_upload_session(
+        session_id: str,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Abort the upload and discard received chunks"""
+    try:
+        service = UploadSessionService(db)
+        return await service.abort_session(session_id, current_user['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -15,14 +15,125 @@ class Settings(BaseSettings):
 
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
+    STORAGE_BACKEND: str = "minio"  # minio | local
+    LOCAL_STORAGE_PATH: str = "./storage_data"
+    LOCAL_FSYNC_BYTES: int = 64 * 1024 * 1024  # fsync пачками, а не на каждую запись
+
+    # Дисковый read-through кэш перед MinIO (пустой путь — выключен)
+    DISK_CACHE_PATH: str = ""
+    DISK_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024  # 10 GB
+    DISK_CACHE_MAX_OBJECT_SIZE: int = 1024 * 1024 * 1024  # 1 GB
+    DISK_CACHE_FILL_WAIT_SECONDS: float = 30.0  # промах ждёт, пока тот же объект дозаполнит другой запрос
+    # Кэш мелких объектов в памяти процесса (0 — выключен)
+    MEMORY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256 MB
+    MEMORY_CACHE_MAX_OBJECT_SIZE: int = 256 * 1024  # 256 KB
+
     MINIO_URL: str = "http://localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET_NAME: str = "files"
+    MINIO_POOL_SIZE: int = 64  # соединений на хост; не меньше STORAGE_IO_WORKERS + MULTIPART_MAX_WORKERS
+    MINIO_CONNECT_TIMEOUT: float = 10.0
+    MINIO_READ_TIMEOUT: float = 300.0
+    MINIO_TCP_KEEPALIVE: bool = True
+    MINIO_PUBLIC_URL: str = ""  # адрес MinIO для клиентов в подписанных ссылках (по умолчанию MINIO_URL)
+    MINIO_REGION: str = "us-east-1"
+    PRESIGNED_URL_EXPIRE_MINUTES: int = 15
 
     REDIS_URL: str = "redis://localhost:6379"
 
+    # Фоновые задачи (миниатюры, удаление объектов) вне обработки запроса
+    JOB_BACKEND: str = "redis"  # redis | memory (очередь в памяти процесса — для тестов и разработки)
+    JOB_KEY_PREFIX: str = "jobs"  # префикс ключей очередей в Redis
+    JOB_QUEUES: dict[str, int] = {"default": 4, "images": 2, "purge": 2}  # очередь -> задач одновременно в worker'е
+    JOB_IN_PROCESS_WORKER: bool = True  # выполнять задачи и в процессе API; False — только отдельный worker
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF: float = 2.0  # секунды до повтора, удваиваются с каждой попыткой
+    JOB_RETRY_BACKOFF_MAX: float = 300.0
+    JOB_VISIBILITY_TIMEOUT: float = 300.0  # задача без продления за это время выдаётся заново
+    JOB_POLL_INTERVAL: float = 0.5  # пауза опроса пустой очереди
+    JOB_SHUTDOWN_TIMEOUT: float = 30.0  # ожидание текущих задач при остановке worker'а
+    JOB_DEAD_LETTER_MAX: int = 1000  # задач, хранимых в очереди неудачных
+
+    # Сжатие при хранении для хорошо сжимаемых типов (пустая строка — выключено)
+    COMPRESSION_CODEC: str = "zstd"
+    COMPRESSION_LEVEL: int = 3
+    COMPRESSION_MIN_SIZE: int = 4096  # файлы меньше хранятся как есть
+    COMPRESSIBLE_EXTENSIONS: set[str] = {"txt", "csv", "json", "xml"}
+
+    # Дедупликация по кускам переменной длины для документов, которые
+    # загружают заново после небольших правок (выключено по умолчанию)
+    CHUNKING_ENABLED: bool = False
+    CHUNKING_EXTENSIONS: set[str] = {"doc", "docx", "xls", "xlsx", "pdf", "zip"}
+    CHUNKING_MIN_FILE_SIZE: int = 4 * 1024 * 1024  # файлы меньше хранятся одним объектом
+    CHUNK_MIN_SIZE: int = 256 * 1024  # не меньше 48 байт (окно поиска границы)
+    CHUNK_AVG_SIZE: int = 1024 * 1024
+    CHUNK_MAX_SIZE: int = 4 * 1024 * 1024
+    CHUNK_PREFETCH: int = 4  # кусков, читаемых из хранилища заранее при скачивании
+
     MAX_FILE_SIZE: int = 1_000_000_000  # 1 GB
+    UPLOAD_FORM_OVERHEAD: int = 64 * 1024  # границы, заголовки частей и поля формы сверх размера файла
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # 8 MB, не меньше 5 MB (минимум части S3 multipart)
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    # Загрузка по хешу чужого содержимого: клиент хеширует выбранный сервером диапазон
+    UPLOAD_BY_HASH_PROOF_SIZE: int = 64 * 1024  # байт в проверяемом диапазоне
+    UPLOAD_BY_HASH_CHALLENGE_MINUTES: int = 5  # срок действия выданного диапазона
+    DOWNLOAD_CHUNK_SIZE: int = 256 * 1024  # 256 KB
+    # Срок кэширования скачиваний, закреплённых за содержимым (?v=<file_hash>)
+    DOWNLOAD_IMMUTABLE_MAX_AGE: int = 365 * 24 * 3600
+
+    # Уменьшенные копии изображений (миниатюры)
+    IMAGE_EXTENSIONS: set[str] = {"jpg", "jpeg", "png", "gif", "webp"}
+    IMAGE_MAX_WIDTH: int = 2048
+    # Ширины миниатюр: запрошенная округляется вверх до ближайшей, чтобы
+    # разные ширины в URL не порождали каждая своё декодирование и свою копию
+    IMAGE_WIDTHS: list[int] = [64, 128, 256, 512, 1024, 2048]
+    IMAGE_QUALITY: int = 80
+    IMAGE_MAX_SOURCE_SIZE: int = 50 * 1024 * 1024  # 50 MB, больше — не уменьшаются
+    IMAGE_MAX_PIXELS: int = 50_000_000  # защита от «бомб» с огромным разрешением
+    IMAGE_EAGER_WIDTHS: list[int] = []  # ширины, генерируемые сразу после загрузки, например [256]
+    IMAGE_EAGER_FORMAT: str = "webp"
+
+    BATCH_UPLOAD_MAX_FILES: int = 1000  # файлов в одном запросе пакетной загрузки
+    BATCH_UPLOAD_CONCURRENCY: int = 8  # файлов, одновременно записываемых в хранилище
+    BATCH_UPLOAD_MAX_SIZE: int = 5_000_000_000  # 5 GB, тело запроса пакетной загрузки целиком
+
+    ARCHIVE_MAX_FILES: int = 1000  # файлов в одном ZIP-архиве
+    ARCHIVE_PREFETCH_FILES: int = 4  # файлов, читаемых из хранилища заранее
+    ARCHIVE_PREFETCH_CHUNKS: int = 4  # кусков DOWNLOAD_CHUNK_SIZE в очереди на файл
+
+    BULK_DELETE_MAX_FILES: int = 10000  # ID файлов в одном запросе массового удаления
+    STORAGE_DELETE_BATCH_SIZE: int = 1000  # ключей в одном запросе DeleteObjects (не больше 1000)
+    CONTENT_CLAIM_WAIT_SECONDS: int = 120  # ожидание чужой записи или удаления того же blob/куска
+    CONTENT_CLAIM_STALE_MINUTES: int = 30  # заявки старше сборщик мусора считает брошенными
+
+    # История версий файлов: прежние версии ссылаются на blob, поэтому
+    # неизменное содержимое не дублируется
+    FILE_VERSIONS_MAX: int = 20  # прежних версий на файл, старшие удаляются (0 — без ограничения)
+    FILE_VERSION_RETENTION_DAYS: int = 0  # версии, заменённые раньше, удаляются (0 — хранятся бессрочно)
+    VERSION_PRUNE_BATCH_SIZE: int = 500  # версий в одной транзакции удаления
+    VERSION_PRUNE_BATCH_DELAY: float = 0.5  # пауза между пачками при полной очистке
+
+    # Сборщик мусора: окончательное удаление мягко удалённых файлов и их объектов
+    GC_GRACE_PERIOD_HOURS: int = 72  # удалённые раньше этого срока записи не трогаются
+    GC_BATCH_SIZE: int = 500  # записей в одной транзакции и одном пакетном удалении объектов
+    GC_BATCH_DELAY: float = 1.0  # пауза между пачками, чтобы не нагружать БД и хранилище
+    GC_MAX_FILES_PER_RUN: int = 0  # файлов за один запуск (0 — без ограничения), остаток — в следующий
+    GC_EXPIRED_UPLOAD_GRACE_HOURS: int = 1  # незавершённые загрузки, просроченные раньше, удаляются вместе с частями
+
+    # Общие пулы для CPU-задач (хеширование, сжатие, изображения)
+    CPU_THREAD_WORKERS: int = 4  # потоки для задач, отпускающих GIL (sha256, zstd)
+    CPU_PROCESS_WORKERS: int = 2  # процессы для задач, держащих GIL (Pillow, разбиение на куски)
+    CPU_TASK_LIMITS: dict[str, int] = {"hash": 4, "compress": 4, "chunk": 2, "image": 2}  # одновременных задач по типу
+    # Ожидающих задач по типу, сверх — отказ (503); загрузки не ограничены:
+    # каждая ждёт не больше одного своего куска
+    CPU_QUEUE_LIMITS: dict[str, int] = {"image": 32}
+
+    STORAGE_IO_WORKERS: int = 32  # потоки для блокирующих вызовов клиента MinIO
+
+    MULTIPART_PART_SIZE: int = 16 * 1024 * 1024  # 16 MB
+    MULTIPART_PARALLELISM: int = 4  # частей одного файла в полёте одновременно
+    MULTIPART_MAX_WORKERS: int = 16  # общий пул потоков для загрузки частей
     ALLOWED_EXTENSIONS: set[str] = {
         "pdf", "doc", "docx", "xls", "xlsx",
         "jpg", "jpeg", "png", "gif", "webp",
@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Optional
+import json
+import time
+import uuid
+
+
+class JobQueueError(Exception):
+    """Очередь задач недоступна (задача не поставлена или не получена)"""
+
+
+@dataclass
+class Job:
+    """
+    Фоновая задача: имя обработчика и его аргументы (JSON).
+
+    attempts — номер текущей выдачи worker'у, считает брокер;
+    enqueued_at — время первой постановки, от него считается ожидание.
+    """
+
+    queue: str
+    task: str
+    payload: dict[str, Any]
+    max_attempts: int
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    enqueued_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "id": self.id,
+            "queue": self.queue,
+            "task": self.task,
+            "payload": self.payload,
+            "max_attempts": self.max_attempts,
+            "enqueued_at": self.enqueued_at,
+            "last_error": self.last_error,
+        })
+
+    @classmethod
+    def loads(cls, data: str, attempts: int = 0) -> "Job":
+        return cls(**json.loads(data), attempts=attempts)
+
+
+class JobBroker(ABC):
+    """
+    Брокер очередей фоновых задач.
+
+    Выданная задача остаётся «в работе» до ack/retry/fail; если worker не
+    продлил её (extend) за visibility_timeout, она выдаётся снова — так
+    задачи упавшего worker'а не теряются. Ошибки брокера — JobQueueError.
+    """
+
+    async def close(self):
+        """Освободить соединения брокера"""
+
+    @abstractmethod
+    async def enqueue(self, job: Job):
+        """Поставить задачу в очередь job.queue"""
+
+    @abstractmethod
+    async def dequeue(self, queue: str, visibility_timeout: float) -> Optional[Job]:
+        """Следующая задача очереди или None, если очередь пуста (не ждёт)"""
+
+    @abstractmethod
+    async def extend(self, job: Job, visibility_timeout: float):
+        """Продлить срок выполнения задачи (heartbeat)"""
+
+    @abstractmethod
+    async def ack(self, job: Job, wait_time: float, run_time: float):
+        """Задача выполнена: удалить её и учесть время ожидания и выполнения"""
+
+    @abstractmethod
+    async def retry(self, job: Job, delay: float, error: str):
+        """Вернуть задачу в очередь через delay секунд"""
+
+    @abstractmethod
+    async def fail(self, job: Job, error: str):
+        """Переложить задачу в очередь неудачных (dead letter)"""
+
+    @abstractmethod
+    async def stats(self, queues: list[str]) -> dict:
+        """Глубина очередей и счётчики по каждой очереди"""
+
+
+def queue_stats(depth: dict, counters: dict, oldest_enqueued_at: Optional[float]) -> dict:
+    """Статистика очереди в общем для всех брокеров виде"""
+    processed = int(counters.get("processed", 0))
+    return {
+        **depth,
+        "oldest_ready_age": round(time.time() - oldest_enqueued_at, 3) if oldest_enqueued_at else 0,
+        "enqueued": int(counters.get("enqueued", 0)),
+        "processed": processed,
+        "retried": int(counters.get("retried", 0)),
+        "failed": int(counters.get("failed", 0)),
+        "redelivered": int(counters.get("redelivered", 0)),
+        "avg_wait_ms": round(float(counters.get("wait_ms", 0)) / processed, 1) if processed else 0,
+        "avg_run_ms": round(float(counters.get("run_ms", 0)) / processed, 1) if processed else 0,
+    }
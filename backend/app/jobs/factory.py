@@ -0,0 +1,23 @@
+from functools import lru_cache
+from app.config import get_settings
+from app.jobs.base import JobBroker
+
+settings = get_settings()
+
+
+def create_job_broker() -> JobBroker:
+    """Брокер очередей задач по настройке JOB_BACKEND"""
+    if settings.JOB_BACKEND == "memory":
+        from app.jobs.memory_broker import MemoryBroker
+        return MemoryBroker()
+    if settings.JOB_BACKEND != "redis":
+        raise ValueError(f"Unknown job backend: {settings.JOB_BACKEND}")
+
+    from app.jobs.redis_broker import RedisBroker
+    return RedisBroker()
+
+
+@lru_cache
+def get_job_broker() -> JobBroker:
+    """Общий для процесса брокер; закрывается в lifespan приложения или worker'а"""
+    return create_job_broker()
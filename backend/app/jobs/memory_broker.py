@@ -0,0 +1,112 @@
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from typing import Optional
+import time
+from app.config import get_settings
+from app.jobs.base import Job, JobBroker, queue_stats
+
+settings = get_settings()
+
+
+@dataclass
+class _Queue:
+    ready: deque = field(default_factory=deque)
+    inflight: dict[str, float] = field(default_factory=dict)  # id -> срок выполнения
+    delayed: dict[str, float] = field(default_factory=dict)  # id -> время повтора
+    dead: deque = field(default_factory=deque)
+    counters: Counter = field(default_factory=Counter)
+
+
+class MemoryBroker(JobBroker):
+    """
+    Очереди в памяти процесса с той же семантикой, что у RedisBroker.
+
+    Для тестов и разработки без Redis: задачи не переживают перезапуск
+    и не видны другим процессам.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, _Queue] = {}
+        self._jobs: dict[str, Job] = {}
+        self._attempts: Counter = Counter()
+
+    def _queue(self, name: str) -> _Queue:
+        return self._queues.setdefault(name, _Queue())
+
+    async def enqueue(self, job: Job):
+        queue = self._queue(job.queue)
+        self._jobs[job.id] = replace(job)
+        queue.ready.append(job.id)
+        queue.counters["enqueued"] += 1
+
+    async def dequeue(self, queue_name: str, visibility_timeout: float) -> Optional[Job]:
+        queue = self._queue(queue_name)
+        now = time.time()
+        # Задачи, которые worker не успел завершить, — в начало очереди
+        for job_id, deadline in list(queue.inflight.items()):
+            if deadline <= now:
+                del queue.inflight[job_id]
+                queue.ready.appendleft(job_id)
+                queue.counters["redelivered"] += 1
+        for job_id, run_at in list(queue.delayed.items()):
+            if run_at <= now:
+                del queue.delayed[job_id]
+                queue.ready.append(job_id)
+
+        if not queue.ready:
+            return None
+        job_id = queue.ready.popleft()
+        queue.inflight[job_id] = now + visibility_timeout
+        self._attempts[job_id] += 1
+        return replace(self._jobs[job_id], attempts=self._attempts[job_id])
+
+    async def extend(self, job: Job, visibility_timeout: float):
+        queue = self._queue(job.queue)
+        if job.id in queue.inflight:
+            queue.inflight[job.id] = time.time() + visibility_timeout
+
+    async def ack(self, job: Job, wait_time: float, run_time: float):
+        queue = self._queue(job.queue)
+        queue.inflight.pop(job.id, None)
+        self._jobs.pop(job.id, None)
+        self._attempts.pop(job.id, None)
+        queue.counters["processed"] += 1
+        queue.counters["wait_ms"] += int(wait_time * 1000)
+        queue.counters["run_ms"] += int(run_time * 1000)
+
+    async def retry(self, job: Job, delay: float, error: str):
+        queue = self._queue(job.queue)
+        # Задача уже выдана заново другому worker'у — ей распоряжается он
+        if queue.inflight.pop(job.id, None) is None:
+            return
+        self._jobs[job.id].last_error = error
+        queue.delayed[job.id] = time.time() + delay
+        queue.counters["retried"] += 1
+
+    async def fail(self, job: Job, error: str):
+        queue = self._queue(job.queue)
+        if queue.inflight.pop(job.id, None) is None:
+            return
+        self._jobs[job.id].last_error = error
+        self._attempts.pop(job.id, None)
+        queue.dead.appendleft(job.id)
+        while len(queue.dead) > settings.JOB_DEAD_LETTER_MAX:
+            self._jobs.pop(queue.dead.pop(), None)
+        queue.counters["failed"] += 1
+
+    async def stats(self, queues: list[str]) -> dict:
+        result = {}
+        for name in queues:
+            queue = self._queue(name)
+            oldest = self._jobs[queue.ready[0]].enqueued_at if queue.ready else None
+            result[name] = queue_stats(
+                {
+                    "ready": len(queue.ready),
+                    "inflight": len(queue.inflight),
+                    "delayed": len(queue.delayed),
+                    "dead": len(queue.dead),
+                },
+                queue.counters,
+                oldest
+            )
+        return result
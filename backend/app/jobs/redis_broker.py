@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+from typing import Optional
+import time
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from app.config import get_settings
+from app.jobs.base import Job, JobBroker, JobQueueError, queue_stats
+
+settings = get_settings()
+
+# Сколько просроченных и отложенных задач переносится в очередь за один dequeue
+_PROMOTE_LIMIT = 100
+
+# KEYS: ready, inflight, delayed, jobs, attempts, stats
+# ARGV: now, deadline, limit
+# ready — список: новые задачи слева, выдаются справа
+_DEQUEUE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('RPUSH', KEYS[1], id)
+    redis.call('HINCRBY', KEYS[6], 'redelivered', 1)
+end
+local due = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[3], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+while true do
+    local id = redis.call('RPOP', KEYS[1])
+    if not id then
+        return nil
+    end
+    local data = redis.call('HGET', KEYS[4], id)
+    if data then
+        redis.call('ZADD', KEYS[2], ARGV[2], id)
+        local attempts = redis.call('HINCRBY', KEYS[5], id, 1)
+        return {data, attempts}
+    end
+end
+"""
+
+# KEYS: inflight, jobs, delayed, stats
+# ARGV: id, data, run_at
+_RETRY = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[1])
+redis.call('HINCRBY', KEYS[4], 'retried', 1)
+return 1
+"""
+
+# KEYS: inflight, jobs, attempts, dead, stats
+# ARGV: id, data, dead_max
+_FAIL = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('LPUSH', KEYS[4], ARGV[1])
+while redis.call('LLEN', KEYS[4]) > tonumber(ARGV[3]) do
+    redis.call('HDEL', KEYS[2], redis.call('RPOP', KEYS[4]))
+end
+redis.call('HINCRBY', KEYS[5], 'failed', 1)
+return 1
+"""
+
+
+@contextmanager
+def _redis_errors():
+    try:
+        yield
+    except (RedisError, OSError) as e:
+        raise JobQueueError(f"Job queue unavailable: {e}") from e
+
+
+class RedisBroker(JobBroker):
+    """
+    Очереди задач в Redis.
+
+    На очередь: список ready, ZSET inflight (срок выполнения), ZSET delayed
+    (время повтора), список dead и хэши с данными задач, попытками и
+    счётчиками. Переходы между ними атомарны (Lua-скрипты и MULTI), поэтому
+    несколько worker'ов не получат одну задачу дважды.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: Optional[str] = None):
+        self.prefix = prefix or settings.JOB_KEY_PREFIX
+        self._redis = aioredis.from_url(
+            url or settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=10,
+        )
+        self._dequeue = self._redis.register_script(_DEQUEUE)
+        self._retry = self._redis.register_script(_RETRY)
+        self._fail = self._redis.register_script(_FAIL)
+
+    def _key(self, queue: str, name: str) -> str:
+        return f"{self.prefix}:{queue}:{name}"
+
+    async def close(self):
+        await self._redis.aclose()
+
+    async def enqueue(self, job: Job):
+        with _redis_errors():
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self._key(job.queue, "jobs"), job.id, job.dumps())
+                pipe.lpush(self._key(job.queue, "ready"), job.id)
+                pipe.hincrby(self._key(job.queue, "stats"), "enqueued", 1)
+                await pipe.execute()
+
+    async def dequeue(self, queue: str, visibility_timeout: float) -> Optional[Job]:
+        now = time.time()
+        with _redis_errors():
+            result = await self._dequeue(
+                keys=[
+                    self._key(queue, "ready"),
+                    self._key(queue, "inflight"),
+                    self._key(queue, "delayed"),
+                    self._key(queue, "jobs"),
+                    self._key(queue, "attempts"),
+                    self._key(queue, "stats"),
+                ],
+                args=[now, now + visibility_timeout, _PROMOTE_LIMIT]
+            )
+        if not result:
+            return None
+        data, attempts = result
+        return Job.loads(data, attempts=int(attempts))
+
+    async def extend(self, job: Job, visibility_timeout: float):
+        with _redis_errors():
+            await self._redis.zadd(
+                self._key(job.queue, "inflight"),
+                {job.id: time.time() + visibility_timeout},
+                xx=True
+            )
+
+    async def ack(self, job: Job, wait_time: float, run_time: float):
+        stats_key = self._key(job.queue, "stats")
+        with _redis_errors():
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(self._key(job.queue, "inflight"), job.id)
+                pipe.hdel(self._key(job.queue, "jobs"), job.id)
+                pipe.hdel(self._key(job.queue, "attempts"), job.id)
+                pipe.hincrby(stats_key, "processed", 1)
+                pipe.hincrby(stats_key, "wait_ms", int(wait_time * 1000))
+                pipe.hincrby(stats_key, "run_ms", int(run_time * 1000))
+                await pipe.execute()
+
+    async def retry(self, job: Job, delay: float, error: str):
+        job.last_error = error
+        with _redis_errors():
+            await self._retry(
+                keys=[
+                    self._key(job.queue, "inflight"),
+                    self._key(job.queue, "jobs"),
+                    self._key(job.queue, "delayed"),
+                    self._key(job.queue, "stats"),
+                ],
+                args=[job.id, job.dumps(), time.time() + delay]
+            )
+
+    async def fail(self, job: Job, error: str):
+        job.last_error = error
+        with _redis_errors():
+            await self._fail(
+                keys=[
+                    self._key(job.queue, "inflight"),
+                    self._key(job.queue, "jobs"),
+                    self._key(job.queue, "attempts"),
+                    self._key(job.queue, "dead"),
+                    self._key(job.queue, "stats"),
+                ],
+                args=[job.id, job.dumps(), settings.JOB_DEAD_LETTER_MAX]
+            )
+
+    async def stats(self, queues: list[str]) -> dict:
+        result = {}
+        with _redis_errors():
+            for queue in queues:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    pipe.llen(self._key(queue, "ready"))
+                    pipe.zcard(self._key(queue, "inflight"))
+                    pipe.zcard(self._key(queue, "delayed"))
+                    pipe.llen(self._key(queue, "dead"))
+                    pipe.hgetall(self._key(queue, "stats"))
+                    pipe.lindex(self._key(queue, "ready"), -1)
+                    ready, inflight, delayed, dead, counters, oldest_id = await pipe.execute()
+
+                oldest = None
+                if oldest_id:
+                    data = await self._redis.hget(self._key(queue, "jobs"), oldest_id)
+                    oldest = Job.loads(data).enqueued_at if data else None
+                result[queue] = queue_stats(
+                    {"ready": ready, "inflight": inflight, "delayed": delayed, "dead": dead},
+                    counters,
+                    oldest
+                )
+        return result
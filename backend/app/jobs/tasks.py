@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from app.config import get_settings
+from app.jobs.base import Job
+from app.jobs.factory import get_job_broker
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    func: Callable[..., Awaitable[Any]]
+    queue: str
+    max_attempts: int
+
+
+# Имя задачи -> обработчик; имя хранится в задаче, поэтому его нельзя менять,
+# пока в очередях остаются задачи со старым именем
+TASKS: dict[str, TaskSpec] = {}
+
+
+def task(name: str, queue: str = "default", max_attempts: Optional[int] = None):
+    """Зарегистрировать асинхронную функцию как фоновую задачу (аргументы — JSON)"""
+    def register(func):
+        TASKS[name] = TaskSpec(func, queue, max_attempts or settings.JOB_MAX_ATTEMPTS)
+        return func
+    return register
+
+
+async def enqueue(name: str, **payload) -> Job:
+    """Поставить задачу в очередь; JobQueueError — очередь недоступна"""
+    spec = TASKS[name]
+    job = Job(queue=spec.queue, task=name, payload=payload, max_attempts=spec.max_attempts)
+    await get_job_broker().enqueue(job)
+    return job
+
+
+# ================== ЗАДАЧИ ==================
+# Сервисы импортируются внутри задач: сами сервисы ставят задачи в очередь
+
+
+@task("generate_thumbnails", queue="images")
+async def generate_thumbnails(file_id: str):
+    """Миниатюры стандартных размеров для загруженного изображения"""
+    from app.services.image_service import generate_standard_derivatives
+    await generate_standard_derivatives(file_id)
+
+
+@task("purge_objects", queue="purge")
+async def purge_objects(keys: list[str]):
+    """Удалить объекты из хранилища; неудача — повтор всей пачки (удаление идемпотентно)"""
+    from app.services.storage_service import StorageService
+    from app.storage.base import StorageError
+
+    failed = await StorageService().delete_files(keys)
+    if failed:
+        raise StorageError(f"Failed to delete {len(failed)} of {len(keys)} objects")
+
+
+@task("collect_garbage")
+async def collect_garbage(max_files: Optional[int] = None):
+    """Сборка мусора; повтор после ошибки продолжает с контрольной точки"""
+    from app.database import SessionLocal
+    from app.services.gc_service import GarbageCollector
+
+    db = SessionLocal()
+    try:
+        await GarbageCollector(db).run(max_files)
+    finally:
+        db.close()
+
+
+@task("prune_versions")
+async def prune_versions(file_id: Optional[str] = None):
+    """Удаление прежних версий по правилам хранения: одного файла или всех"""
+    from app.database import SessionLocal
+    from app.services.version_service import VersionPruner
+
+    db = SessionLocal()
+    try:
+        await VersionPruner(db).prune(file_id)
+    finally:
+        db.close()
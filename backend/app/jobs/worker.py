@@ -0,0 +1,164 @@
+from typing import Optional
+import asyncio
+import signal
+import time
+from app.config import get_settings
+from app.jobs.base import Job, JobBroker, JobQueueError
+from app.jobs.tasks import TASKS
+
+settings = get_settings()
+
+# Пауза после ошибки брокера, чтобы не опрашивать недоступный Redis в цикле
+_BROKER_ERROR_DELAY = 5.0
+
+
+def retry_delay(attempts: int) -> float:
+    """Пауза перед повтором: экспоненциально растёт с номером попытки"""
+    return min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX)
+
+
+class Worker:
+    """
+    Исполнитель фоновых задач.
+
+    На каждую очередь запускается столько потребителей, сколько задано в
+    queues (очередь -> параллельность), поэтому медленные задачи одной
+    очереди не задерживают другие. Пока задача выполняется, её срок
+    продлевается; ошибка — повтор с растущей паузой, после max_attempts
+    задача уходит в очередь неудачных.
+    """
+
+    def __init__(
+            self,
+            broker: JobBroker,
+            queues: Optional[dict[str, int]] = None,
+            visibility_timeout: Optional[float] = None,
+            poll_interval: Optional[float] = None
+    ):
+        self.broker = broker
+        self.queues = queues or settings.JOB_QUEUES
+        self.visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self._stopping = asyncio.Event()
+        self._consumers: list[asyncio.Task] = []
+
+    def start(self):
+        """Запустить потребителей в текущем event loop"""
+        self._stopping.clear()
+        self._consumers = [
+            asyncio.create_task(self._consume(queue), name=f"job-worker-{queue}-{i}")
+            for queue, concurrency in self.queues.items()
+            for i in range(concurrency)
+        ]
+
+    def request_stop(self):
+        """Попросить run() завершиться (из обработчика сигнала)"""
+        self._stopping.set()
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Дождаться текущих задач; незавершённые за timeout отменяются и будут выданы снова"""
+        self._stopping.set()
+        if not self._consumers:
+            return
+        _, pending = await asyncio.wait(
+            self._consumers,
+            timeout=settings.JOB_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        )
+        for consumer in pending:
+            consumer.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._consumers = []
+
+    async def run(self):
+        """Работать до stop()"""
+        self.start()
+        await self._stopping.wait()
+        await self.stop()
+
+    async def _consume(self, queue: str):
+        while not self._stopping.is_set():
+            try:
+                job = await self.broker.dequeue(queue, self.visibility_timeout)
+            except JobQueueError as e:
+                print(f"Warning: {e}")
+                await self._sleep(_BROKER_ERROR_DELAY)
+                continue
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+            try:
+                await self.execute(job)
+            except JobQueueError as e:
+                # Результат не записан — задача будет выдана снова по истечении срока
+                print(f"Warning: Could not finish job {job.id}: {e}")
+
+    async def _sleep(self, delay: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def execute(self, job: Job):
+        """Выполнить одну выданную задачу и записать результат в брокер"""
+        spec = TASKS.get(job.task)
+        if spec is None:
+            await self.broker.fail(job, f"Unknown task: {job.task}")
+            return
+        if job.attempts > job.max_attempts:
+            # Задача выдавалась снова, потому что worker падал на ней
+            await self.broker.fail(job, job.last_error or "Too many attempts")
+            return
+
+        started = time.time()
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await spec.func(**job.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"Warning: Job {job.task} ({job.id}) attempt {job.attempts} failed: {error}")
+            if job.attempts >= job.max_attempts:
+                await self.broker.fail(job, error)
+            else:
+                await self.broker.retry(job, retry_delay(job.attempts), error)
+        else:
+            await self.broker.ack(job, started - job.enqueued_at, time.time() - started)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job):
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.broker.extend(job, self.visibility_timeout)
+            except JobQueueError as e:
+                print(f"Warning: {e}")
+
+
+async def main():
+    """Отдельный процесс worker'а: python -m app.jobs.worker"""
+    from app.jobs.factory import get_job_broker
+    from app.storage.factory import get_storage_backend
+    from app.utils.cpu_executor import cpu_executor, shutdown_cpu_executor
+
+    storage = get_storage_backend()
+    storage.ensure_ready()
+    cpu_executor()
+    broker = get_job_broker()
+    worker = Worker(broker)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.request_stop)
+
+    print(f"🚀 Job worker started: {worker.queues}")
+    try:
+        await worker.run()
+    finally:
+        print("🛑 Job worker stopped")
+        await broker.close()
+        storage.close()
+        shutdown_cpu_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,11 @@ from contextlib import asynccontextmanager
 from app.config import get_settings
 from app.api.gateway import router
 from app.database import init_db
+from app.jobs.factory import get_job_broker
+from app.jobs.worker import Worker
+from app.middleware.upload_limits import UploadLimitMiddleware
+from app.storage.factory import get_storage_backend
+from app.utils.cpu_executor import cpu_executor, shutdown_cpu_executor
 
 settings = get_settings()
 
@@ -12,8 +17,25 @@ settings = get_settings()
 async def lifespan(app: FastAPI):
     print("🚀 Starting up File Storage Service...")
     init_db()
+    # Клиент хранилища один на процесс; bucket проверяется один раз при старте
+    storage = get_storage_backend()
+    storage.ensure_ready()
+    # Пулы для хеширования, сжатия и изображений — общие на процесс
+    cpu_executor()
+    broker = get_job_broker()
+    # Очередь в памяти видна только этому процессу, поэтому её задачи
+    # выполняются здесь же; с Redis это можно оставить отдельным worker'ам
+    worker = None
+    if settings.JOB_IN_PROCESS_WORKER or settings.JOB_BACKEND == "memory":
+        worker = Worker(broker)
+        worker.start()
     yield
     print("🛑 Shutting down...")
+    if worker:
+        await worker.stop()
+    await broker.close()
+    storage.close()
+    shutdown_cpu_executor()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -22,6 +44,10 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Загрузки отклоняются до чтения тела; CORS добавляется снаружи, чтобы
+# браузер увидел и эти ответы
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
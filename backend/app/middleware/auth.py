@@ -1,5 +1,8 @@
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.repositories.user_repository import UserRepository
 from app.utils.password_utils import JWTUtils
 
 security = HTTPBearer()
@@ -20,3 +23,21 @@ async def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_active_user(
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db)
+) -> dict:
+    """
+    Пользователь, которому разрешено создавать файлы. Токен остаётся
+    действительным и после удаления или блокировки аккаунта, поэтому
+    для загрузок аккаунт проверяется по БД.
+    """
+    user = UserRepository(db).get_existing(current_user["sub"])
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is deleted or blocked",
+        )
+    return current_user
@@ -0,0 +1,171 @@
+from typing import Optional
+import re
+from multipart.multipart import parse_options_header
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import get_settings
+from app.utils.validators import FileValidator
+
+settings = get_settings()
+
+# Маршруты загрузки: метод, путь, проверять ли расширения файлов в теле.
+# В пакетной загрузке недопустимый файл — ошибка одного элемента, а не запроса
+_SINGLE_FILE = re.compile(rf"^{re.escape(settings.API_V1_STR)}/files/(upload|[^/]+/versions)/?$")
+_BATCH = re.compile(rf"^{re.escape(settings.API_V1_STR)}/files/upload/batch/?$")
+_CHUNK = re.compile(rf"^{re.escape(settings.API_V1_STR)}/files/uploads/[^/]+/chunks/\d+/?$")
+
+
+def upload_limit(method: str, path: str) -> Optional[tuple[int, bool]]:
+    """(Максимальный размер тела, проверять ли имена файлов) или None — не загрузка"""
+    if method == "POST" and _SINGLE_FILE.match(path):
+        return settings.MAX_FILE_SIZE + settings.UPLOAD_FORM_OVERHEAD, True
+    if method == "POST" and _BATCH.match(path):
+        return settings.BATCH_UPLOAD_MAX_SIZE, False
+    if method == "PUT" and _CHUNK.match(path):
+        return settings.UPLOAD_CHUNK_SIZE, False
+    return None
+
+
+class MultipartFilenames:
+    """
+    Имена файлов из заголовков частей multipart по мере поступления тела.
+
+    Заголовки части идут перед её содержимым, поэтому недопустимый файл
+    виден до того, как принят хотя бы один его байт. Само содержимое
+    не разбирается: ищутся только разделители частей.
+    """
+
+    MAX_HEADERS_SIZE = 16 * 1024
+
+    def __init__(self, boundary: bytes):
+        self.delimiter = b"\r\n--" + boundary
+        # Первый разделитель стоит в начале тела, без перевода строки
+        self.buffer = b"\r\n"
+        self.in_headers = False
+
+    def feed(self, data: bytes) -> list[str]:
+        """Передать очередной фрагмент тела; возвращает имена файлов, чьи заголовки завершились"""
+        self.buffer += data
+        names = []
+        while True:
+            if self.in_headers:
+                end = self.buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self.buffer) > self.MAX_HEADERS_SIZE:
+                        # Некорректная форма — её отклонит разбор тела
+                        self.buffer, self.in_headers = b"", False
+                    return names
+                filename = self._filename(self.buffer[:end])
+                if filename is not None:
+                    names.append(filename)
+                self.buffer = self.buffer[end + 4:]
+                self.in_headers = False
+            else:
+                start = self.buffer.find(self.delimiter)
+                if start < 0:
+                    # Разделитель мог оборваться на границе фрагментов
+                    self.buffer = self.buffer[-(len(self.delimiter) - 1):]
+                    return names
+                self.buffer = self.buffer[start + len(self.delimiter):]
+                self.in_headers = True
+
+    @staticmethod
+    def _filename(headers: bytes) -> Optional[str]:
+        for line in headers.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-disposition":
+                _, options = parse_options_header(value.strip())
+                filename = options.get(b"filename")
+                return filename.decode("utf-8", errors="replace") if filename is not None else None
+        return None
+
+
+def _multipart_boundary(content_type: bytes) -> Optional[bytes]:
+    media_type, options = parse_options_header(content_type)
+    if media_type != b"multipart/form-data":
+        return None
+    return options.get(b"boundary")
+
+
+def _reject(status_code: int, detail: str) -> JSONResponse:
+    # Остаток тела не читается, поэтому соединение закрывается
+    return JSONResponse({"detail": detail}, status_code=status_code, headers={"Connection": "close"})
+
+
+class UploadLimitMiddleware:
+    """
+    Допуск запросов на загрузку до чтения тела.
+
+    Starlette разбирает multipart-форму целиком (во временный файл) ещё до
+    вызова обработчика, поэтому проверки в сервисах срабатывают, только когда
+    всё тело уже принято. Здесь запрос отклоняется сразу: без токена,
+    с Content-Length больше лимита, с недопустимым расширением файла —
+    по заголовкам его части. Тело без Content-Length или с неверным
+    Content-Length обрывается, как только превысит лимит.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit = upload_limit(scope["method"], scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+        max_size, check_filenames = limit
+
+        headers = dict(scope["headers"])
+        # Без токена запрос всё равно отклонит авторизация — но уже после разбора тела
+        if not headers.get(b"authorization", b"").lower().startswith(b"bearer "):
+            return await _reject(403, "Not authenticated")(scope, receive, send)
+        try:
+            content_length = int(headers[b"content-length"])
+        except (KeyError, ValueError):
+            content_length = None
+        if content_length is not None and content_length > max_size:
+            return await _reject(413, f"Request body too large. Max size: {max_size} bytes")(scope, receive, send)
+
+        boundary = _multipart_boundary(headers.get(b"content-type", b"")) if check_filenames else None
+        filenames = MultipartFilenames(boundary) if boundary else None
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def checked_send(message: Message):
+            nonlocal response_started
+            # После отказа приложение ещё может ответить на обрыв тела — этот ответ не нужен
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def reject(status_code: int, detail: str) -> Message:
+            nonlocal rejected
+            if not response_started:
+                await _reject(status_code, detail)(scope, receive, send)
+            rejected = True
+            # Для приложения клиент отключился: разбор тела прекращается
+            return {"type": "http.disconnect"}
+
+        async def checked_receive() -> Message:
+            nonlocal received
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            received += len(body)
+            if received > max_size:
+                return await reject(413, f"Request body too large. Max size: {max_size} bytes")
+            if filenames:
+                for filename in filenames.feed(body):
+                    try:
+                        FileValidator.validate_extension(filename)
+                    except ValueError as e:
+                        return await reject(400, str(e))
+            return message
+
+        await self.app(scope, checked_receive, checked_send)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -18,6 +18,80 @@ class FileUploadResponse(BaseModel):
             }
         }
 
+class BatchUploadItem(BaseModel):
+    filename: str
+    success: bool
+    file: Optional[FileUploadResponse] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    uploaded: int
+    failed: int
+    results: list[BatchUploadItem]
+
+class UploadByHashRequest(BaseModel):
+    filename: str
+    size: int
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$")
+    content_type: Optional[str] = None
+    folder: str = "root"
+    # Ответ на выданный сервером диапазон: SHA-256 байтов [offset, offset + length)
+    challenge: Optional[str] = None
+    range_sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "installer.zip",
+                "size": 200000000,
+                "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "folder": "root"
+            }
+        }
+
+class HashChallenge(BaseModel):
+    token: str
+    offset: int
+    length: int
+    expires_at: datetime
+
+class UploadByHashResponse(BaseModel):
+    exists: bool
+    file: Optional[FileUploadResponse] = None
+    challenge: Optional[HashChallenge] = None
+
+class BulkDeleteRequest(BaseModel):
+    file_ids: Optional[list[str]] = None
+    folder: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "file_ids": [
+                    "550e8400-e29b-41d4-a716-446655440000",
+                    "6fa459ea-ee8a-3ca4-894e-db77e160355e"
+                ]
+            }
+        }
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+    file_ids: list[str]
+    not_found: list[str]
+
+class FileVersionResponse(BaseModel):
+    version: int
+    filename: str
+    size: int
+    hash: str
+    uploaded_at: datetime
+    current: bool
+
+class FileVersionListResponse(BaseModel):
+    file_id: str
+    current_version: int
+    versions: list[FileVersionResponse]
+
 class FileMetadata(BaseModel):
     id: str
     filename: str
@@ -37,3 +111,60 @@ class FileListItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    folder: str = "root"
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "video.mp4",
+                "size": 1000000000,
+                "content_type": "video/mp4",
+                "folder": "root"
+            }
+        }
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    chunk_size: int
+    total_chunks: int
+    expires_at: datetime
+
+class UploadSessionStatusResponse(BaseModel):
+    session_id: str
+    status: str
+    chunk_size: int
+    total_chunks: int
+    received_chunks: list[int]
+    missing_chunks: list[int]
+    expires_at: datetime
+
+class PresignedUploadCreate(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    folder: str = "root"
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "dataset.zip",
+                "size": 500000000,
+                "content_type": "application/zip",
+                "folder": "root"
+            }
+        }
+
+class PresignedUploadResponse(BaseModel):
+    upload_id: str
+    url: str
+    method: str = "PUT"
+    expires_at: datetime
+
+class PresignedDownloadResponse(BaseModel):
+    url: str
+    expires_at: datetime
@@ -0,0 +1,199 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.schemas.blob import Blob, ContentState
+from app.schemas.chunk import BlobChunk
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+class BlobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_hash(self, file_hash: str) -> Optional[Blob]:
+        """Получить blob по хешу содержимого"""
+        return self.db.query(Blob).filter(Blob.hash == file_hash).first()
+
+    def get_for_update(self, file_hash: str) -> Optional[Blob]:
+        """Получить blob с блокировкой строки до конца транзакции"""
+        return self.db.query(Blob).filter(Blob.hash == file_hash).with_for_update().first()
+
+    def add_reference(self, file_hash: str) -> Optional[Blob]:
+        """Атомарно увеличить счётчик ссылок; None, если готового blob нет"""
+        updated = self.db.query(Blob).filter(Blob.hash == file_hash, Blob.state == ContentState.READY).update(
+            {Blob.ref_count: Blob.ref_count + 1},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return self.get_by_hash(file_hash) if updated else None
+
+    def create(
+        self,
+        file_hash: str,
+        stored_name: str,
+        size: int,
+        codec: Optional[str] = None,
+        stored_size: Optional[int] = None,
+        chunks: Optional[list[str]] = None
+    ) -> Optional[Blob]:
+        """
+        Создать blob с одной ссылкой; None, если его уже создал параллельный запрос.
+        chunks — хеши кусков по порядку для содержимого, хранящегося кусками.
+        """
+        blob = Blob(
+            hash=file_hash,
+            stored_name=stored_name,
+            size=size,
+            codec=codec,
+            stored_size=stored_size,
+            chunked=chunks is not None,
+            ref_count=1
+        )
+        self.db.add(blob)
+        try:
+            if chunks:
+                # Манифест пишется в той же транзакции, что и blob
+                self.db.flush()
+                self.db.execute(insert(BlobChunk), [
+                    {"blob_hash": file_hash, "position": position, "chunk_hash": chunk_hash}
+                    for position, chunk_hash in enumerate(chunks)
+                ])
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        self.db.refresh(blob)
+        return blob
+
+    def claim(
+        self,
+        file_hash: str,
+        stored_name: str,
+        size: int,
+        codec: Optional[str] = None,
+        stored_size: Optional[int] = None
+    ) -> bool:
+        """
+        Заявить blob перед записью объекта: строка без ссылок в состоянии pending.
+        False — строка уже есть (blob готов, пишется или удаляется другим запросом).
+        """
+        self.db.add(Blob(
+            hash=file_hash,
+            stored_name=stored_name,
+            size=size,
+            codec=codec,
+            stored_size=stored_size,
+            state=ContentState.PENDING,
+            ref_count=0
+        ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return False
+        return True
+
+    def activate(self, file_hash: str, stored_name: str) -> Optional[Blob]:
+        """Объект заявленного blob записан: blob готов, с одной ссылкой. None — заявки больше нет"""
+        updated = self.db.query(Blob).filter(
+            Blob.hash == file_hash,
+            Blob.stored_name == stored_name,
+            Blob.state == ContentState.PENDING
+        ).update(
+            {Blob.state: ContentState.READY, Blob.ref_count: Blob.ref_count + 1},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return self.get_by_hash(file_hash) if updated else None
+
+    def drop_claim(self, file_hash: str, stored_name: str):
+        """Отказаться от заявки, объект которой записать не удалось"""
+        self.db.query(Blob).filter(
+            Blob.hash == file_hash,
+            Blob.stored_name == stored_name,
+            Blob.state == ContentState.PENDING
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+    def remove_references(self, counts: dict[str, int]) -> list[tuple[str, str, int]]:
+        """
+        Снять ссылки сразу с нескольких blob (hash -> сколько ссылок снять).
+
+        Строки остаются заблокированными до конца транзакции; коммит делает
+        вызывающий код. Возвращает (hash, stored_name, ref_count) после уменьшения.
+        """
+        # Строки блокируются в порядке хеша: параллельные массовые удаления
+        # с пересекающимися blob не взаимоблокируются
+        self.db.execute(
+            select(Blob.hash).where(Blob.hash.in_(list(counts))).order_by(Blob.hash).with_for_update()
+        ).all()
+
+        # Один UPDATE на каждое встречающееся число ссылок — обычно это единица
+        by_count = defaultdict(list)
+        for file_hash, count in counts.items():
+            by_count[count].append(file_hash)
+
+        result = []
+        for count, hashes in by_count.items():
+            statement = (
+                update(Blob)
+                .where(Blob.hash.in_(hashes))
+                .values(ref_count=Blob.ref_count - count)
+                .returning(Blob.hash, Blob.stored_name, Blob.ref_count)
+                .execution_options(synchronize_session=False)
+            )
+            result.extend(tuple(row) for row in self.db.execute(statement))
+        return result
+
+    def delete_unreferenced(self, hashes: list[str]):
+        """Удалить строки blob без ссылок (в текущей транзакции)"""
+        if hashes:
+            self.db.execute(
+                delete(Blob)
+                .where(Blob.hash.in_(hashes), Blob.ref_count <= 0, Blob.state != ContentState.PENDING)
+                .execution_options(synchronize_session=False)
+            )
+
+    def mark_deleting(self, hashes: list[str]):
+        """
+        Перевести blob без ссылок в удаление (в текущей транзакции). После
+        коммита на них нельзя сослаться, и объект удаляется без блокировок.
+        """
+        if hashes:
+            self.db.execute(
+                update(Blob)
+                .where(Blob.hash.in_(hashes), Blob.ref_count <= 0)
+                .values(state=ContentState.DELETING, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    def restore(self, hashes: list[str]):
+        """
+        Вернуть в ready blob, объект которых удалить не удалось (в текущей
+        транзакции): следующая загрузка того же содержимого снова на них сошлётся
+        """
+        if hashes:
+            self.db.execute(
+                update(Blob)
+                .where(Blob.hash.in_(hashes), Blob.state == ContentState.DELETING)
+                .values(state=ContentState.READY)
+                .execution_options(synchronize_session=False)
+            )
+
+    def take_stale_claims(self, claimed_before: datetime) -> list[tuple[str, str]]:
+        """
+        Заявки, брошенные упавшими запросами (pending или deleting дольше срока),
+        перевести в удаление заново (в текущей транзакции). Возвращает (hash, stored_name).
+        """
+        rows = self.db.execute(
+            update(Blob)
+            .where(
+                Blob.state.in_([ContentState.PENDING, ContentState.DELETING]),
+                Blob.updated_at < claimed_before
+            )
+            .values(state=ContentState.DELETING, updated_at=datetime.utcnow())
+            .returning(Blob.hash, Blob.stored_name)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return [tuple(row) for row in rows]
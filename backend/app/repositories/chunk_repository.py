@@ -0,0 +1,172 @@
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.schemas.blob import ContentState
+from app.schemas.chunk import BlobChunk, Chunk
+from collections import Counter, defaultdict
+from datetime import datetime
+
+class ChunkRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_reference(self, chunk_hash: str) -> bool:
+        """Атомарно увеличить счётчик ссылок; False, если готового куска нет"""
+        updated = self.db.query(Chunk).filter(Chunk.hash == chunk_hash, Chunk.state == ContentState.READY).update(
+            {Chunk.ref_count: Chunk.ref_count + 1},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return bool(updated)
+
+    def claim(self, chunk_hash: str, stored_name: str, size: int) -> bool:
+        """
+        Заявить кусок перед записью объекта: строка без ссылок в состоянии pending.
+        False — строка уже есть (кусок готов, пишется или удаляется другим запросом).
+        """
+        self.db.add(Chunk(
+            hash=chunk_hash,
+            stored_name=stored_name,
+            size=size,
+            state=ContentState.PENDING,
+            ref_count=0
+        ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return False
+        return True
+
+    def activate(self, chunk_hash: str) -> bool:
+        """Объект заявленного куска записан: кусок готов, с одной ссылкой. False — заявки больше нет"""
+        updated = self.db.query(Chunk).filter(
+            Chunk.hash == chunk_hash,
+            Chunk.state == ContentState.PENDING
+        ).update(
+            {Chunk.state: ContentState.READY, Chunk.ref_count: Chunk.ref_count + 1},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return bool(updated)
+
+    def drop_claim(self, chunk_hash: str):
+        """Отказаться от заявки, объект которой записать не удалось"""
+        self.db.query(Chunk).filter(
+            Chunk.hash == chunk_hash,
+            Chunk.state == ContentState.PENDING
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+    def get_manifest(self, blob_hash: str) -> list[tuple[str, int]]:
+        """Куски blob по порядку: (ключ объекта, размер)"""
+        rows = self.db.execute(
+            select(Chunk.stored_name, Chunk.size)
+            .join(BlobChunk, BlobChunk.chunk_hash == Chunk.hash)
+            .where(BlobChunk.blob_hash == blob_hash)
+            .order_by(BlobChunk.position)
+        ).all()
+        return [tuple(row) for row in rows]
+
+    def delete_manifests(self, blob_hashes: list[str]) -> Counter:
+        """
+        Удалить манифесты blob (в текущей транзакции).
+        Возвращает, сколько ссылок снять с каждого куска.
+        """
+        if not blob_hashes:
+            return Counter()
+        chunk_hashes = self.db.execute(
+            delete(BlobChunk)
+            .where(BlobChunk.blob_hash.in_(blob_hashes))
+            .returning(BlobChunk.chunk_hash)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        return Counter(chunk_hashes)
+
+    def remove_references(self, counts: dict[str, int]) -> list[tuple[str, str, int]]:
+        """
+        Снять ссылки с кусков (hash -> сколько ссылок снять).
+
+        Строки остаются заблокированными до конца транзакции; коммит делает
+        вызывающий код. Возвращает (hash, stored_name, ref_count) после уменьшения.
+        """
+        # Тот же порядок блокировок, что и у blob: по хешу
+        self.db.execute(
+            select(Chunk.hash).where(Chunk.hash.in_(list(counts))).order_by(Chunk.hash).with_for_update()
+        ).all()
+
+        by_count = defaultdict(list)
+        for chunk_hash, count in counts.items():
+            by_count[count].append(chunk_hash)
+
+        result = []
+        for count, hashes in by_count.items():
+            statement = (
+                update(Chunk)
+                .where(Chunk.hash.in_(hashes))
+                .values(ref_count=Chunk.ref_count - count)
+                .returning(Chunk.hash, Chunk.stored_name, Chunk.ref_count)
+                .execution_options(synchronize_session=False)
+            )
+            result.extend(tuple(row) for row in self.db.execute(statement))
+        return result
+
+    def delete_unreferenced(self, hashes: list[str]):
+        """Удалить строки кусков без ссылок (в текущей транзакции)"""
+        if hashes:
+            self.db.execute(
+                delete(Chunk)
+                .where(Chunk.hash.in_(hashes), Chunk.ref_count <= 0, Chunk.state != ContentState.PENDING)
+                .execution_options(synchronize_session=False)
+            )
+
+    def mark_deleting(self, hashes: list[str]):
+        """
+        Перевести куски без ссылок в удаление (в текущей транзакции). После
+        коммита на них нельзя сослаться, и объект удаляется без блокировок.
+        """
+        if hashes:
+            self.db.execute(
+                update(Chunk)
+                .where(Chunk.hash.in_(hashes), Chunk.ref_count <= 0, Chunk.state == ContentState.READY)
+                .values(state=ContentState.DELETING, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    def restore(self, hashes: list[str]):
+        """Вернуть в ready куски, объект которых удалить не удалось (в текущей транзакции)"""
+        if hashes:
+            self.db.execute(
+                update(Chunk)
+                .where(Chunk.hash.in_(hashes), Chunk.state == ContentState.DELETING)
+                .values(state=ContentState.READY)
+                .execution_options(synchronize_session=False)
+            )
+
+    def take_stale_claims(self, claimed_before: datetime) -> list[tuple[str, str]]:
+        """
+        Заявки, брошенные упавшими запросами (pending или deleting дольше срока),
+        перевести в удаление заново (в текущей транзакции). Возвращает (hash, stored_name).
+        """
+        rows = self.db.execute(
+            update(Chunk)
+            .where(
+                Chunk.state.in_([ContentState.PENDING, ContentState.DELETING]),
+                Chunk.updated_at < claimed_before
+            )
+            .values(state=ContentState.DELETING, updated_at=datetime.utcnow())
+            .returning(Chunk.hash, Chunk.stored_name)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return [tuple(row) for row in rows]
+
+    def get_stats(self) -> tuple[int, int, int]:
+        """Число кусков, их суммарный размер и объём содержимого, которое из них собирается"""
+        count, stored = self.db.query(
+            func.count(Chunk.hash),
+            func.coalesce(func.sum(Chunk.size), 0)
+        ).one()
+        content = self.db.query(func.coalesce(func.sum(Chunk.size), 0)).select_from(BlobChunk).join(
+            Chunk, BlobChunk.chunk_hash == Chunk.hash
+        ).scalar()
+        return count, stored, content
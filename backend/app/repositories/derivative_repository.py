@@ -0,0 +1,63 @@
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.schemas.blob import Blob
+from app.schemas.derivative import Derivative
+from app.schemas.file import File
+from typing import Optional
+
+class DerivativeRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, file_hash: str, width: int, image_format: str) -> Optional[Derivative]:
+        """Получить производное изображение по хешу содержимого и параметрам"""
+        return self.db.query(Derivative).filter(
+            Derivative.file_hash == file_hash,
+            Derivative.width == width,
+            Derivative.format == image_format
+        ).first()
+
+    def create(self, file_hash: str, width: int, image_format: str, stored_name: str, size: int) -> Derivative:
+        """Сохранить производное изображение; если параллельный запрос успел раньше — вернуть его запись"""
+        derivative = Derivative(
+            file_hash=file_hash,
+            width=width,
+            format=image_format,
+            stored_name=stored_name,
+            size=size
+        )
+        self.db.add(derivative)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return self.get(file_hash, width, image_format)
+        self.db.refresh(derivative)
+        return derivative
+
+    def delete_for_hashes(self, hashes: list[str]) -> list[str]:
+        """Удалить производные изображения содержимого; возвращает ключи их объектов"""
+        if not hashes:
+            return []
+        stored_names = self.db.execute(
+            delete(Derivative)
+            .where(Derivative.file_hash.in_(hashes))
+            .returning(Derivative.stored_name)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        self.db.commit()
+        return list(stored_names)
+
+    def delete_orphaned(self, hashes: list[str]) -> list[str]:
+        """Удалить производные изображения содержимого, на которое не ссылается ни один файл и blob"""
+        if not hashes:
+            return []
+        orphaned = self.db.execute(
+            select(Derivative.file_hash).distinct().where(
+                Derivative.file_hash.in_(hashes),
+                ~exists().where(File.file_hash == Derivative.file_hash),
+                ~exists().where(Blob.hash == Derivative.file_hash)
+            )
+        ).scalars().all()
+        return self.delete_for_hashes(list(orphaned))
@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, insert, select, update
 from app.schemas.file import File
+from app.schemas.presigned_upload import PresignedUpload
+from app.schemas.upload_session import UploadSession
+from app.schemas.user import User
+from datetime import datetime
 from uuid import UUID
 from typing import Optional, List
 
@@ -11,9 +15,15 @@ class FileRepository:
     def get_by_id(self, file_id: str) -> Optional[File]:
 
         return self.db.query(File).filter(
-            and_(File.id == UUID(file_id), File.is_deleted == False)
+            and_(File.id == UUID(file_id), File.is_deleted.is_(False))
         ).first()
 
+    def get_for_update(self, file_id: str) -> Optional[File]:
+        """Файл с блокировкой строки до конца транзакции"""
+        return self.db.query(File).filter(
+            and_(File.id == UUID(file_id), File.is_deleted.is_(False))
+        ).with_for_update().first()
+
     def get_user_files(
         self,
         user_id: str,
@@ -26,10 +36,32 @@ class FileRepository:
             and_(
                 File.owner_id == UUID(user_id),
                 File.folder == folder,
-                File.is_deleted == False
+                File.is_deleted.is_(False)
             )
         ).offset(skip).limit(limit).all()
 
+    def get_user_files_by_ids(self, user_id: str, file_ids: List[str]) -> List[File]:
+        """Файлы пользователя из списка ID (чужие и удалённые пропускаются)"""
+        return self.db.query(File).filter(
+            and_(
+                File.id.in_([UUID(file_id) for file_id in file_ids]),
+                File.owner_id == UUID(user_id),
+                File.is_deleted.is_(False)
+            )
+        ).all()
+
+    def user_has_blob(self, user_id: str, blob_hash: str) -> bool:
+        """Ссылается ли пользователь на содержимое своими неудалёнными файлами"""
+        return self.db.query(
+            self.db.query(File).filter(
+                and_(
+                    File.owner_id == UUID(user_id),
+                    File.blob_hash == blob_hash,
+                    File.is_deleted.is_(False)
+                )
+            ).exists()
+        ).scalar()
+
     def create(self, file_data: dict) -> File:
         """Создать запись о файле"""
         file = File(**file_data)
@@ -38,13 +70,132 @@ class FileRepository:
         self.db.refresh(file)
         return file
 
-    def soft_delete(self, file_id: str):
+    def create_many(self, files_data: List[dict]):
+        """Создать записи о файлах одним INSERT в одной транзакции"""
+        if not files_data:
+            return
+        try:
+            self.db.execute(insert(File), files_data)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def soft_delete(self, file_id: str, detach_blob: bool = False):
         """Мягкое удаление файла"""
         file = self.get_by_id(file_id)
         if file:
             file.is_deleted = True
+            if detach_blob:
+                # Ссылка на blob снята сразу, сборщику мусора она не нужна
+                file.blob_hash = None
             self.db.commit()
 
+    def soft_delete_of_deleted_users(self) -> int:
+        """
+        Мягко удалить оставшиеся файлы удалённых пользователей (в текущей
+        транзакции): загрузку, начатую до удаления аккаунта, не остановить
+        """
+        return self.db.execute(
+            update(File)
+            .where(
+                File.is_deleted.is_(False),
+                File.owner_id.in_(select(User.id).where(User.deleted_at.is_not(None)))
+            )
+            .values(is_deleted=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def soft_delete_many(
+        self,
+        user_id: str,
+        file_ids: Optional[List[str]] = None,
+        folder: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Мягкое удаление файлов пользователя одним UPDATE (по списку ID или всей папки).
+
+        Возвращает (id, stored_name, blob_hash) удалённых строк; blob_hash —
+        значение до удаления, сама ссылка на blob у записей снимается.
+        """
+        condition = and_(File.owner_id == UUID(user_id), File.is_deleted.is_(False))
+        if file_ids is not None:
+            condition = and_(condition, File.id.in_([UUID(file_id) for file_id in file_ids]))
+        else:
+            condition = and_(condition, File.folder == folder)
+
+        # Повторное удаление уже удалённой строки исключено условием is_deleted:
+        # параллельный запрос дождётся блокировки и её не вернёт
+        statement = (
+            update(File)
+            .where(condition)
+            .values(is_deleted=True)
+            .returning(File.id, File.stored_name, File.blob_hash)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            rows = self.db.execute(statement).all()
+            # Ссылки на blob снимаются в той же транзакции; RETURNING выше
+            # вернул blob_hash до этого
+            detached = [row.id for row in rows if row.blob_hash]
+            if detached:
+                self.db.execute(
+                    update(File)
+                    .where(File.id.in_(detached))
+                    .values(blob_hash=None)
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return [tuple(row) for row in rows]
+
+    def get_deleted_batch(
+        self,
+        deleted_before: datetime,
+        after_id: Optional[str] = None,
+        limit: int = 500,
+        lock: bool = True
+    ) -> List[tuple]:
+        """
+        Мягко удалённые до deleted_before файлы по возрастанию ID, после after_id.
+
+        Возвращает (id, stored_name, blob_hash, file_hash, file_size, stored_size).
+        С lock строки блокируются до конца транзакции, а занятые параллельным
+        сборщиком пропускаются.
+        """
+        # Удалённая запись больше не меняется, так что updated_at — время удаления
+        statement = (
+            select(File.id, File.stored_name, File.blob_hash, File.file_hash, File.file_size, File.stored_size)
+            .where(File.is_deleted.is_(True), File.updated_at < deleted_before)
+            .order_by(File.id)
+            .limit(limit)
+        )
+        if after_id:
+            statement = statement.where(File.id > UUID(after_id))
+        if lock:
+            statement = statement.with_for_update(skip_locked=True)
+        return self.db.execute(statement).all()
+
+    def hard_delete(self, file_ids: List[UUID]):
+        """Окончательно удалить записи файлов (в текущей транзакции, без коммита)"""
+        if not file_ids:
+            return
+        # Завершённые загрузки ссылаются на созданный файл — ссылка снимается
+        for model in (UploadSession, PresignedUpload):
+            self.db.execute(
+                update(model)
+                .where(model.file_id.in_(file_ids))
+                .values(file_id=None)
+                .execution_options(synchronize_session=False)
+            )
+        self.db.execute(
+            delete(File)
+            .where(File.id.in_(file_ids))
+            .execution_options(synchronize_session=False)
+        )
+
     def update_name(self, file_id: str, new_name: str):
         """Обновить имя файла"""
         file = self.get_by_id(file_id)
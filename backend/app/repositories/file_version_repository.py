@@ -0,0 +1,83 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, or_, select
+from app.schemas.file_version import FileVersion
+from datetime import datetime
+from uuid import UUID
+from typing import Optional, List
+
+class FileVersionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, version_data: dict) -> FileVersion:
+        """Добавить прежнюю версию файла (в текущей транзакции, без коммита)"""
+        version = FileVersion(**version_data)
+        self.db.add(version)
+        return version
+
+    def get_for_file(self, file_id: str) -> List[FileVersion]:
+        """Прежние версии файла, новые первыми"""
+        return self.db.query(FileVersion).filter(
+            FileVersion.file_id == UUID(file_id)
+        ).order_by(FileVersion.version.desc()).all()
+
+    def get(self, file_id: str, version: int) -> Optional[FileVersion]:
+        """Прежняя версия файла по номеру"""
+        return self.db.query(FileVersion).filter(
+            FileVersion.file_id == UUID(file_id),
+            FileVersion.version == version
+        ).first()
+
+    def delete_expired(
+        self,
+        keep: int,
+        replaced_before: Optional[datetime],
+        file_id: Optional[str] = None,
+        limit: int = 500
+    ) -> List[tuple]:
+        """
+        Удалить версии сверх keep последних на файл и заменённые раньше
+        replaced_before (в текущей транзакции, без коммита); не больше limit строк.
+
+        Возвращает (stored_name, blob_hash) удалённых строк. Строку, которую
+        успел удалить параллельный запрос, DELETE ... RETURNING не вернёт,
+        поэтому ссылки на blob снимаются ровно один раз.
+        """
+        rank = func.row_number().over(
+            partition_by=FileVersion.file_id,
+            order_by=FileVersion.version.desc()
+        ).label("rank")
+        ranked = select(FileVersion.id, FileVersion.created_at, rank)
+        if file_id:
+            ranked = ranked.where(FileVersion.file_id == UUID(file_id))
+        ranked = ranked.subquery()
+
+        conditions = []
+        if keep:
+            conditions.append(ranked.c.rank > keep)
+        if replaced_before:
+            conditions.append(ranked.c.created_at < replaced_before)
+        if not conditions:
+            return []
+
+        expired = select(ranked.c.id).where(or_(*conditions)).limit(limit)
+        return self.db.execute(
+            delete(FileVersion)
+            .where(FileVersion.id.in_(expired.scalar_subquery()))
+            .returning(FileVersion.stored_name, FileVersion.blob_hash)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    def delete_for_files(self, file_ids: List[UUID]) -> List[tuple]:
+        """
+        Удалить все версии файлов (в текущей транзакции, без коммита).
+        Возвращает (stored_name, blob_hash) удалённых строк.
+        """
+        if not file_ids:
+            return []
+        return self.db.execute(
+            delete(FileVersion)
+            .where(FileVersion.file_id.in_(file_ids))
+            .returning(FileVersion.stored_name, FileVersion.blob_hash)
+            .execution_options(synchronize_session=False)
+        ).all()
@@ -0,0 +1,26 @@
+from sqlalchemy.orm import Session
+from app.schemas.gc_run import GcRun, GcRunStatus
+from datetime import datetime
+from typing import List, Optional
+
+class GcRunRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_unfinished(self) -> Optional[GcRun]:
+        """Последний незавершённый запуск сборщика (его продолжит следующий)"""
+        return self.db.query(GcRun).filter(
+            GcRun.status != GcRunStatus.FINISHED
+        ).order_by(GcRun.created_at.desc()).first()
+
+    def create(self, cutoff: datetime) -> GcRun:
+        """Начать новый запуск сборщика"""
+        run = GcRun(cutoff=cutoff, status=GcRunStatus.RUNNING)
+        self.db.add(run)
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+
+    def get_recent(self, limit: int = 20) -> List[GcRun]:
+        """Последние запуски сборщика, новые первыми"""
+        return self.db.query(GcRun).order_by(GcRun.created_at.desc()).limit(limit).all()
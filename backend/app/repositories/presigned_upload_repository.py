@@ -0,0 +1,52 @@
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.schemas.presigned_upload import PresignedUpload
+from datetime import datetime
+from uuid import UUID
+from typing import List, Optional
+
+class PresignedUploadRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, upload_id: str) -> Optional[PresignedUpload]:
+        """Получить загрузку по подписанной ссылке по ID"""
+        return self.db.query(PresignedUpload).filter(
+            PresignedUpload.id == UUID(upload_id)
+        ).first()
+
+    def create(self, upload_data: dict) -> PresignedUpload:
+        """Зарегистрировать выданную ссылку на загрузку"""
+        upload = PresignedUpload(**upload_data)
+        self.db.add(upload)
+        self.db.commit()
+        self.db.refresh(upload)
+        return upload
+
+    def update_status(self, upload_id: str, status: str, file_id: Optional[UUID] = None):
+        """Обновить статус загрузки"""
+        upload = self.get_by_id(upload_id)
+        if upload:
+            upload.status = status
+            if file_id is not None:
+                upload.file_id = file_id
+            self.db.commit()
+
+    def get_expired(self, cutoff: datetime, limit: int) -> List[PresignedUpload]:
+        """Загрузки, срок которых истёк раньше cutoff, в порядке истечения"""
+        return self.db.query(PresignedUpload).filter(
+            PresignedUpload.expires_at < cutoff
+        ).order_by(PresignedUpload.expires_at).limit(limit).all()
+
+    def count_expired(self, cutoff: datetime) -> int:
+        """Число загрузок, срок которых истёк раньше cutoff"""
+        return self.db.query(PresignedUpload).filter(PresignedUpload.expires_at < cutoff).count()
+
+    def delete_many(self, upload_ids: List[UUID]):
+        """Удалить записи загрузок (в текущей транзакции, без коммита)"""
+        if upload_ids:
+            self.db.execute(
+                delete(PresignedUpload)
+                .where(PresignedUpload.id.in_(upload_ids))
+                .execution_options(synchronize_session=False)
+            )
@@ -0,0 +1,103 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete
+from sqlalchemy.exc import IntegrityError
+from app.schemas.upload_session import UploadSession, UploadSessionPart
+from datetime import datetime
+from uuid import UUID
+from typing import Optional, List
+
+class UploadSessionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, session_id: str) -> Optional[UploadSession]:
+        """Получить сессию загрузки по ID"""
+        return self.db.query(UploadSession).filter(
+            UploadSession.id == UUID(session_id)
+        ).first()
+
+    def get_for_update(self, session_id: str) -> Optional[UploadSession]:
+        """Получить сессию с блокировкой строки до конца транзакции"""
+        return self.db.query(UploadSession).filter(
+            UploadSession.id == UUID(session_id)
+        ).with_for_update().first()
+
+    def create(self, session_data: dict) -> UploadSession:
+        """Создать сессию загрузки"""
+        upload_session = UploadSession(**session_data)
+        self.db.add(upload_session)
+        self.db.commit()
+        self.db.refresh(upload_session)
+        return upload_session
+
+    def get_parts(self, session_id: str) -> List[UploadSessionPart]:
+        """Полученные части сессии, по возрастанию номера"""
+        return self.db.query(UploadSessionPart).filter(
+            UploadSessionPart.session_id == UUID(session_id)
+        ).order_by(UploadSessionPart.part_number).all()
+
+    def save_part(self, session_id: str, part_number: int, etag: str, size: int) -> UploadSessionPart:
+        """Сохранить (или перезаписать) полученную часть"""
+        part = self._get_part(session_id, part_number)
+        if part is None:
+            part = UploadSessionPart(
+                session_id=UUID(session_id),
+                part_number=part_number,
+                etag=etag,
+                size=size
+            )
+            self.db.add(part)
+            try:
+                self.db.commit()
+                return part
+            except IntegrityError:
+                # Ту же часть параллельно записал другой запрос
+                self.db.rollback()
+                part = self._get_part(session_id, part_number)
+
+        part.etag = etag
+        part.size = size
+        self.db.commit()
+        return part
+
+    def update_status(self, session_id: str, status: str, file_id: Optional[UUID] = None):
+        """Обновить статус сессии"""
+        upload_session = self.get_by_id(session_id)
+        if upload_session:
+            upload_session.status = status
+            if file_id is not None:
+                upload_session.file_id = file_id
+            self.db.commit()
+
+    def get_expired(self, cutoff: datetime, limit: int) -> List[UploadSession]:
+        """Сессии, срок которых истёк раньше cutoff, в порядке истечения"""
+        return self.db.query(UploadSession).filter(
+            UploadSession.expires_at < cutoff
+        ).order_by(UploadSession.expires_at).limit(limit).all()
+
+    def count_expired(self, cutoff: datetime) -> int:
+        """Число сессий, срок которых истёк раньше cutoff"""
+        return self.db.query(UploadSession).filter(UploadSession.expires_at < cutoff).count()
+
+    def delete_many(self, session_ids: List[UUID]):
+        """Удалить сессии вместе с частями (в текущей транзакции, без коммита)"""
+        if not session_ids:
+            return
+        self.db.execute(
+            delete(UploadSessionPart)
+            .where(UploadSessionPart.session_id.in_(session_ids))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.execute(
+            delete(UploadSession)
+            .where(UploadSession.id.in_(session_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    def _get_part(self, session_id: str, part_number: int) -> Optional[UploadSessionPart]:
+        return self.db.query(UploadSessionPart).filter(
+            and_(
+                UploadSessionPart.session_id == UUID(session_id),
+                UploadSessionPart.part_number == part_number
+            )
+        ).first()
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, exists, select
+from app.schemas.file import File
+from app.schemas.presigned_upload import PresignedUpload
+from app.schemas.upload_session import UploadSession
 from app.schemas.user import User
+from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
 
 class UserRepository:
@@ -13,6 +17,10 @@ class UserRepository:
         """Получить пользователя по ID"""
         return self.db.query(User).filter(User.id == UUID(user_id)).first()
 
+    def get_existing(self, user_id: str) -> Optional[User]:
+        """Получить пользователя по ID (кроме удалённых)"""
+        return self.db.query(User).filter(User.id == UUID(user_id), User.deleted_at.is_(None)).first()
+
     def get_by_email(self, email: str) -> Optional[User]:
         """Получить пользователя по email"""
         return self.db.query(User).filter(User.email == email).first()
@@ -34,8 +42,33 @@ class UserRepository:
         return user
 
     def get_all(self, skip: int = 0, limit: int = 100):
-        """Получить всех пользователей"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+        """Получить всех пользователей (кроме удалённых)"""
+        return self.db.query(User).filter(User.deleted_at.is_(None)).offset(skip).limit(limit).all()
+
+    def get_deleted_ids(self, deleted_before: datetime, without_files: bool = True) -> List[UUID]:
+        """ID пользователей, удалённых до deleted_before (по умолчанию — уже без записей файлов)"""
+        statement = select(User.id).where(User.deleted_at < deleted_before)
+        if without_files:
+            statement = statement.where(~exists().where(File.owner_id == User.id))
+        return list(self.db.execute(statement).scalars().all())
+
+    def purge(self, user_ids: List[UUID]):
+        """Окончательно удалить пользователей вместе с их сессиями загрузки"""
+        if not user_ids:
+            return
+        try:
+            # Части сессий удаляются каскадно (ondelete=CASCADE)
+            for model in (UploadSession, PresignedUpload, User):
+                column = model.id if model is User else model.owner_id
+                self.db.execute(
+                    delete(model)
+                    .where(column.in_(user_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
 
     def update_last_login(self, user_id: str):
         """Обновить время последнего входа"""
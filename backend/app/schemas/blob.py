@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean
+from app.schemas.base import BaseModel
+from enum import Enum as PyEnum
+
+class ContentState(str, PyEnum):
+    # Строка заявлена, объект ещё записывается; ссылок нет
+    PENDING = "pending"
+    READY = "ready"
+    # Ссылок не осталось, объект удаляется
+    DELETING = "deleting"
+
+class Blob(BaseModel):
+    __tablename__ = "blobs"
+
+    # SHA-256 содержимого — он же ключ объекта в хранилище
+    hash = Column(String(64), primary_key=True)
+    stored_name = Column(String(255), unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # Сжатие при хранении (NULL — объект хранится как есть) и размер
+    # объекта в хранилище (NULL — совпадает с size)
+    codec = Column(String(16), nullable=True)
+    stored_size = Column(BigInteger, nullable=True)
+    # Содержимое хранится кусками (манифест в blob_chunks); stored_name
+    # тогда лишь уникальное имя, объекта под ним нет
+    chunked = Column(Boolean, default=False, nullable=False)
+
+    # Сколько записей files ссылается на объект
+    ref_count = Column(Integer, default=1, nullable=False)
+    # Ссылаться можно только на ready: пока объект пишется или удаляется,
+    # строка служит заявкой и не даёт другим запросам трогать тот же ключ
+    state = Column(String(16), default=ContentState.READY, nullable=False)
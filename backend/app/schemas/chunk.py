@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from app.schemas.base import BaseModel
+from app.schemas.blob import ContentState
+
+class Chunk(BaseModel):
+    __tablename__ = "chunks"
+
+    # SHA-256 куска — он же ключ объекта в хранилище (chunks/<sha256>)
+    hash = Column(String(64), primary_key=True)
+    stored_name = Column(String(255), unique=True, nullable=False)
+    size = Column(Integer, nullable=False)
+
+    # Сколько позиций в манифестах ссылается на кусок
+    ref_count = Column(Integer, default=1, nullable=False)
+    # Как и у blob: ссылаться можно только на ready
+    state = Column(String(16), default=ContentState.READY, nullable=False)
+
+class BlobChunk(BaseModel):
+    __tablename__ = "blob_chunks"
+
+    # Манифест blob, хранящегося кусками: куски по порядку
+    blob_hash = Column(String(64), ForeignKey("blobs.hash", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    chunk_hash = Column(String(64), ForeignKey("chunks.hash"), nullable=False, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, BigInteger
+from app.schemas.base import BaseModel
+
+class Derivative(BaseModel):
+    __tablename__ = "derivatives"
+
+    # Уменьшенная копия изображения; общая для всех файлов с одинаковым
+    # содержимым, поэтому ключ — хеш содержимого и параметры
+    file_hash = Column(String(64), primary_key=True)
+    width = Column(Integer, primary_key=True)
+    format = Column(String(8), primary_key=True)
+
+    stored_name = Column(String(255), unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Integer, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.schemas.base import BaseModel
+from app.schemas.blob import Blob
+from datetime import datetime
 import uuid
 
 class File(BaseModel):
@@ -12,10 +14,16 @@ class File(BaseModel):
 
     # Информация о файле
     original_name = Column(String(255), nullable=False)
-    stored_name = Column(String(255), unique=True, nullable=False)
+    stored_name = Column(String(255), nullable=False, index=True)
     file_size = Column(Integer, nullable=False)
     file_type = Column(String(100), nullable=False)
 
+    # Номер текущей версии; прежние версии — в file_versions
+    version = Column(Integer, default=1, nullable=False)
+    # Когда загружено текущее содержимое: updated_at меняет и переименование.
+    # NULL у записей, созданных до появления столбца, — тогда это created_at
+    uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+
     # Организация
     folder = Column(String(100), default="root", nullable=False)
     tags = Column(Text, nullable=True)
@@ -26,6 +34,15 @@ class File(BaseModel):
 
     # Хранилище
     s3_path = Column(String(500), nullable=False)
+    # Общий объект с дедупликацией по хешу (NULL — собственный объект файла)
+    blob_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True, index=True)
+    # Кодек сжатия объекта (NULL — без сжатия) и размер сжатого объекта;
+    # file_size — всегда размер исходного содержимого
+    codec = Column(String(16), nullable=True)
+    stored_size = Column(BigInteger, nullable=True)
+    # Содержимое собирается из кусков манифеста blob
+    chunked = Column(Boolean, default=False, nullable=False)
 
     # Relationships
     owner = relationship("User", back_populates="files")
+    blob = relationship(Blob)
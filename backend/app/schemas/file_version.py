@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.schemas.base import BaseModel
+import uuid
+
+class FileVersion(BaseModel):
+    __tablename__ = "file_versions"
+    __table_args__ = (UniqueConstraint("file_id", "version"),)
+
+    # Прежняя версия файла; текущая версия — сама запись files.
+    # created_at — момент, когда версию заменила следующая
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    uploaded_at = Column(DateTime, nullable=False)
+
+    # Содержимое версии — те же поля, что и у files. Одинаковое содержимое
+    # версий хранится один раз: каждая версия держит ссылку на blob
+    original_name = Column(String(255), nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    file_type = Column(String(100), nullable=False)
+    file_hash = Column(String(64), nullable=False)
+    stored_name = Column(String(255), nullable=False)
+    blob_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True, index=True)
+    codec = Column(String(16), nullable=True)
+    stored_size = Column(BigInteger, nullable=True)
+    chunked = Column(Boolean, default=False, nullable=False)
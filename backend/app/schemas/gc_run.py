@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from app.schemas.base import BaseModel
+from enum import Enum as PyEnum
+import uuid
+
+class GcRunStatus(str, PyEnum):
+    RUNNING = "running"
+    PAUSED = "paused"  # остановлен по лимиту или ошибке, следующий запуск продолжит с cursor
+    FINISHED = "finished"
+
+class GcRun(BaseModel):
+    __tablename__ = "gc_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), default=GcRunStatus.RUNNING, nullable=False, index=True)
+    # Записи, удалённые раньше этого момента, подлежат сборке
+    cutoff = Column(DateTime, nullable=False)
+    # Контрольная точка: ID последнего обработанного файла (обход по возрастанию ID)
+    cursor = Column(String(36), nullable=True)
+
+    files_deleted = Column(Integer, default=0, nullable=False)
+    objects_deleted = Column(Integer, default=0, nullable=False)
+    bytes_freed = Column(BigInteger, default=0, nullable=False)
+    blob_references = Column(Integer, default=0, nullable=False)
+    failed_objects = Column(Integer, default=0, nullable=False)
+    users_deleted = Column(Integer, default=0, nullable=False)
+    # Удалённые просроченные сессии загрузки и загрузки по подписанным ссылкам
+    uploads_expired = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
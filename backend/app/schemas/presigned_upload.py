@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.schemas.base import BaseModel
+from app.schemas.upload_session import UploadSessionStatus
+import uuid
+
+class PresignedUpload(BaseModel):
+    __tablename__ = "presigned_uploads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    # Будущий файл
+    original_name = Column(String(255), nullable=False)
+    file_type = Column(String(100), nullable=False)
+    folder = Column(String(100), default="root", nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+
+    # Объект, который клиент загружает напрямую в хранилище
+    stored_name = Column(String(255), unique=True, nullable=False)
+
+    status = Column(String(20), default=UploadSessionStatus.ACTIVE, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=True)
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from app.schemas.base import BaseModel
+from enum import Enum as PyEnum
+import uuid
+
+class UploadSessionStatus(str, PyEnum):
+    ACTIVE = "active"
+    # Файл собирается из частей; повторная сборка не допускается
+    COMPLETING = "completing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    ABORTED = "aborted"
+
+class UploadSession(BaseModel):
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    # Будущий файл
+    original_name = Column(String(255), nullable=False)
+    file_type = Column(String(100), nullable=False)
+    folder = Column(String(100), default="root", nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+
+    # Разбиение на куски
+    chunk_size = Column(Integer, nullable=False)
+    total_chunks = Column(Integer, nullable=False)
+
+    # Хранилище (MinIO multipart upload)
+    stored_name = Column(String(255), unique=True, nullable=False)
+    upload_id = Column(String(255), nullable=False)
+
+    status = Column(String(20), default=UploadSessionStatus.ACTIVE, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=True)
+
+    # Relationships
+    parts = relationship(
+        "UploadSessionPart",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="UploadSessionPart.part_number",
+    )
+
+class UploadSessionPart(BaseModel):
+    __tablename__ = "upload_session_parts"
+    __table_args__ = (UniqueConstraint("session_id", "part_number"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("upload_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    part_number = Column(Integer, nullable=False)
+    etag = Column(String(100), nullable=False)
+    size = Column(Integer, nullable=False)
+
+    session = relationship("UploadSession", back_populates="parts")
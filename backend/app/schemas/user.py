@@ -21,6 +21,9 @@ class User(BaseModel):
     is_verified = Column(Boolean, default=False)
 
     last_login = Column(DateTime, nullable=True)
+    # Пользователь удалён администратором; запись удаляет сборщик мусора
+    # вместе с последним файлом пользователя
+    deleted_at = Column(DateTime, nullable=True, index=True)
 
     files = relationship("File", back_populates="owner")
 
@@ -2,11 +2,22 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from app.repositories.user_repository import UserRepository
 from app.repositories.file_repository import FileRepository
+from app.repositories.chunk_repository import ChunkRepository
+from app.repositories.gc_run_repository import GcRunRepository
 from app.schemas.user import User
 from app.schemas.file import File
-from typing import List, Dict, Any
+from app.config import get_settings
+from app.jobs.factory import get_job_broker
+from app.jobs.tasks import enqueue
+from app.services.gc_service import GarbageCollector, run_summary
+from app.storage.factory import get_storage_backend
+from app.utils.cpu_executor import cpu_executor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from uuid import UUID
 
+settings = get_settings()
+
 
 class AdminService:
     def __init__(self, db: Session):
@@ -51,7 +62,7 @@ class AdminService:
 
     def get_user_details(self, user_id: str) -> Dict:
         """Детальная информация о пользователе"""
-        user = self.user_repo.get_by_id(user_id)
+        user = self.user_repo.get_existing(user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -91,7 +102,7 @@ class AdminService:
 
     def toggle_user_status(self, user_id: str) -> Dict:
         """Блокировка/Разблокировка пользователя"""
-        user = self.user_repo.get_by_id(user_id)
+        user = self.user_repo.get_existing(user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -109,7 +120,7 @@ class AdminService:
         if new_role not in ['user', 'admin']:
             raise ValueError("Invalid role. Must be 'user' or 'admin'")
 
-        user = self.user_repo.get_by_id(user_id)
+        user = self.user_repo.get_existing(user_id)
         if not user:
             raise ValueError("User not found")
 
@@ -124,22 +135,26 @@ class AdminService:
 
     def delete_user(self, user_id: str) -> Dict:
         """Удалить пользователя (полное удаление)"""
-        user = self.user_repo.get_by_id(user_id)
+        user = self.user_repo.get_existing(user_id)
         if not user:
             raise ValueError("User not found")
 
         # Мягкое удаление всех файлов пользователя
-        files = self.db.query(File).filter(File.owner_id == UUID(user_id)).all()
-        for file in files:
-            file.is_deleted = True
+        file_count = self.db.query(File).filter(
+            File.owner_id == UUID(user_id),
+            File.is_deleted == False
+        ).update({File.is_deleted: True}, synchronize_session=False)
 
-        # Удаление пользователя
-        self.db.delete(user)
+        # Записи файлов ссылаются на пользователя, поэтому его строку вместе
+        # с последним файлом удаляет сборщик мусора; войти он уже не может,
+        # а для администратора удалённый пользователь больше не существует
+        user.is_active = False
+        user.deleted_at = datetime.utcnow()
         self.db.commit()
 
         return {
             "user_id": user_id,
-            "message": f"User deleted along with {len(files)} files"
+            "message": f"User deleted along with {file_count} files"
         }
 
     # ================== УПРАВЛЕНИЕ ФАЙЛАМИ ==================
@@ -213,6 +228,10 @@ class AdminService:
         total_storage = self.db.query(func.sum(File.file_size)).filter(File.is_deleted == False).scalar() or 0
         total_storage_gb = round(total_storage / 1024 / 1024 / 1024, 2)
 
+        # Дедупликация кусками: место, которое занимают куски, против
+        # объёма содержимого, которое из них собирается
+        chunk_count, chunk_bytes, chunked_content = ChunkRepository(self.db).get_stats()
+
         # Распределение по типам файлов
         file_types = self.db.query(
             File.file_type,
@@ -236,6 +255,12 @@ class AdminService:
                 "total_gb": total_storage_gb,
                 "average_file_size_mb": round((total_storage / total_files / 1024 / 1024) if total_files > 0 else 0, 2)
             },
+            "chunks": {
+                "total": chunk_count,
+                "stored_bytes": chunk_bytes,
+                "content_bytes": chunked_content,
+                "dedup_ratio": round(chunked_content / chunk_bytes, 2) if chunk_bytes else 0
+            },
             "file_types": [
                 {"type": ft.file_type, "count": ft.count}
                 for ft in file_types
@@ -265,3 +290,38 @@ class AdminService:
             }
             for r in results
         ]
+
+    def get_cache_stats(self) -> Dict:
+        """Статистика кэшей чтения хранилища (попадания, промахи, объём)"""
+        return get_storage_backend().cache_stats()
+
+    async def get_job_stats(self) -> Dict:
+        """Глубина очередей фоновых задач, счётчики и среднее время ожидания и выполнения"""
+        return await get_job_broker().stats(list(settings.JOB_QUEUES))
+
+    def get_cpu_stats(self) -> Dict:
+        """Загрузка общих пулов CPU-задач: очереди, отказы, время ожидания и выполнения"""
+        return cpu_executor().stats()
+
+    # ================== СБОРКА МУСОРА ==================
+
+    async def collect_garbage(self, dry_run: bool = True, max_files: Optional[int] = None) -> Dict:
+        """Отчёт о том, что будет удалено, или запуск сборщика фоновой задачей"""
+        if dry_run:
+            return await GarbageCollector(self.db).dry_run(max_files)
+        job = await enqueue("collect_garbage", max_files=max_files)
+        return {"dry_run": False, "job_id": job.id, "message": "Garbage collection queued"}
+
+    def get_gc_runs(self, limit: int = 20) -> List[Dict]:
+        """Последние запуски сборщика мусора"""
+        return [run_summary(run) for run in GcRunRepository(self.db).get_recent(limit)]
+
+    async def prune_versions(self) -> Dict:
+        """Удаление прежних версий всех файлов по правилам хранения — фоновой задачей"""
+        job = await enqueue("prune_versions")
+        return {
+            "job_id": job.id,
+            "max_versions": settings.FILE_VERSIONS_MAX,
+            "retention_days": settings.FILE_VERSION_RETENTION_DAYS,
+            "message": "Version pruning queued"
+        }
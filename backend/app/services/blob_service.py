@@ -0,0 +1,199 @@
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from app.repositories.blob_repository import BlobRepository
+from app.repositories.derivative_repository import DerivativeRepository
+from app.schemas.blob import Blob
+from app.services.chunk_service import ChunkService
+from app.services.storage_service import StorageService
+from app.utils.compression import key_suffix
+from app.utils.concurrency import retry_intervals
+from app.config import get_settings
+
+settings = get_settings()
+
+BLOB_PREFIX = "blobs/"
+# Имя blob, хранящегося кусками: объекта под ним нет, содержимое — в манифесте
+MANIFEST_SUFFIX = ".chunks"
+
+
+class BlobService:
+    """
+    Хранилище с адресацией по содержимому.
+
+    Объект лежит в MinIO под ключом blobs/<sha256> в единственном экземпляре,
+    записи files ссылаются на него через blob_hash, а таблица blobs считает ссылки.
+    Сжатый объект хранится под ключом с суффиксом кодека (blobs/<sha256>.zst),
+    а содержимое, разбитое на куски, — манифестом кусков (blobs/<sha256>.chunks).
+    """
+
+    def __init__(self, db: Session, storage: StorageService):
+        self.db = db
+        self.blob_repo = BlobRepository(db)
+        self.derivative_repo = DerivativeRepository(db)
+        self.storage = storage
+        self.chunk_service = ChunkService(db, storage)
+
+    @staticmethod
+    def blob_key(file_hash: str, codec: Optional[str] = None) -> str:
+        return f"{BLOB_PREFIX}{file_hash}{key_suffix(codec)}"
+
+    @staticmethod
+    def manifest_key(file_hash: str) -> str:
+        return f"{BLOB_PREFIX}{file_hash}{MANIFEST_SUFFIX}"
+
+    @staticmethod
+    def is_blob_key(stored_name: str) -> bool:
+        return stored_name.startswith(BLOB_PREFIX)
+
+    @staticmethod
+    def is_manifest_key(stored_name: str) -> bool:
+        return stored_name.startswith(BLOB_PREFIX) and stored_name.endswith(MANIFEST_SUFFIX)
+
+    async def store(self, storage_info: dict) -> Blob:
+        """Превратить только что загруженный объект в ссылку на blob"""
+        staged_name = storage_info['stored_name']
+        file_hash = storage_info['file_hash']
+        codec = storage_info.get('codec')
+        key = self.blob_key(file_hash, codec)
+
+        async for _ in retry_intervals(settings.CONTENT_CLAIM_WAIT_SECONDS):
+            # Такое содержимое уже есть — загруженная копия не нужна
+            blob = self.blob_repo.add_reference(file_hash)
+            if blob:
+                await self.storage.delete_file(staged_name)
+                return blob
+            # Первая копия: объект переносится под ключ по хешу только под
+            # заявкой, поэтому параллельное удаление того же blob его не сотрёт
+            if self.blob_repo.claim(file_hash, key, storage_info['size'], codec, storage_info.get('stored_size')):
+                break
+            # Тот же blob сейчас записывает или удаляет другой запрос
+        else:
+            raise Exception("Upload failed: concurrent blob update, please retry")
+
+        try:
+            # Копирование на стороне MinIO
+            await self.storage.copy_file(staged_name, key)
+        except BaseException:
+            self.blob_repo.drop_claim(file_hash, key)
+            raise
+        blob = self.blob_repo.activate(file_hash, key)
+        if blob is None:
+            # Заявку сочли брошенной и сняли — объект мог быть удалён
+            raise Exception("Upload failed: concurrent blob update, please retry")
+        await self.storage.delete_file(staged_name)
+        return blob
+
+    async def store_chunked(self, storage_info: dict) -> Blob:
+        """Превратить только что загруженные куски (ChunkService.upload) в blob с манифестом"""
+        file_hash = storage_info['file_hash']
+        chunks = storage_info['chunks']
+
+        async for _ in retry_intervals(settings.CONTENT_CLAIM_WAIT_SECONDS):
+            # Такое содержимое уже есть (целиком или кусками) — ссылки,
+            # взятые при загрузке, не нужны
+            blob = self.blob_repo.add_reference(file_hash)
+            if blob:
+                await self.chunk_service.release(Counter(chunks))
+                return blob
+
+            # Объекта у такого blob нет: ссылки на куски сразу переходят к манифесту
+            blob = self.blob_repo.create(
+                file_hash,
+                self.manifest_key(file_hash),
+                storage_info['size'],
+                chunks=chunks
+            )
+            if blob:
+                return blob
+            # То же содержимое целиком сейчас записывает или удаляет другой запрос
+
+        await self.chunk_service.release(Counter(chunks))
+        raise Exception("Upload failed: concurrent blob update, please retry")
+
+    def reference_existing(self, file_hash: str, size: int) -> Optional[Blob]:
+        """Добавить ссылку на уже хранящееся содержимое, если хеш и размер совпали"""
+        blob = self.blob_repo.get_by_hash(file_hash)
+        if not blob or blob.size != size:
+            return None
+        return self.blob_repo.add_reference(file_hash)
+
+    async def release(self, file_hash: str):
+        """Снять одну ссылку; объект удаляется вместе с последней"""
+        await self.release_many({file_hash: 1})
+
+    async def release_many(self, counts: dict[str, int]):
+        """Снять ссылки с нескольких blob; объекты без ссылок удаляются пакетно"""
+        if not counts:
+            return
+        try:
+            released = self.blob_repo.remove_references(counts)
+            unreferenced = {
+                file_hash: stored_name
+                for file_hash, stored_name, ref_count in released
+                if ref_count <= 0
+            }
+            # У blob из кусков своего объекта нет — манифест удаляется сразу
+            chunked = [file_hash for file_hash, stored_name in unreferenced.items() if self.is_manifest_key(stored_name)]
+            chunks = self.chunk_service.chunk_repo.delete_manifests(chunked)
+            self.blob_repo.delete_unreferenced(chunked)
+            objects = {
+                file_hash: stored_name
+                for file_hash, stored_name in unreferenced.items()
+                if file_hash not in chunked
+            }
+            # Остальные переходят в удаление: пока объект удаляется, на blob
+            # нельзя сослаться и нельзя записать его заново
+            self.blob_repo.mark_deleting(list(objects))
+            # Коммит до удаления объектов: блокировки строк не держатся во
+            # время ввода-вывода, а вызывающий код фиксирует свою работу вместе со снятием ссылок
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        failed = set(await self.storage.delete_files(list(objects.values())))
+        deleted = [file_hash for file_hash, stored_name in objects.items() if stored_name not in failed]
+        try:
+            self.blob_repo.delete_unreferenced(deleted)
+            # Неудалённый объект остался в хранилище, поэтому строка
+            # возвращается в ready с нулём ссылок: следующая загрузка того же
+            # содержимого просто снова на неё сошлётся
+            self.blob_repo.restore([file_hash for file_hash, stored_name in objects.items() if stored_name in failed])
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+        # Куски снимаются отдельной транзакцией: если она не пройдёт,
+        # останутся лишь лишние ссылки, а не манифест без кусков
+        await self.chunk_service.release(chunks)
+        await self._drop_derivatives(chunked + deleted)
+
+    async def purge_stale_claims(self) -> int:
+        """
+        Удалить blob и куски, заявки на которые бросили упавшие запросы:
+        объект недописан или не удалён. Возвращает, сколько строк удалено.
+        """
+        claimed_before = datetime.utcnow() - timedelta(minutes=settings.CONTENT_CLAIM_STALE_MINUTES)
+        try:
+            stale = dict(self.blob_repo.take_stale_claims(claimed_before))
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        failed = set(await self.storage.delete_files(list(stale.values())))
+        deleted = [file_hash for file_hash, stored_name in stale.items() if stored_name not in failed]
+        try:
+            # Неудалённые остаются в удалении до следующего запуска
+            self.blob_repo.delete_unreferenced(deleted)
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+        return len(deleted) + await self.chunk_service.purge_stale_claims(claimed_before)
+
+    async def _drop_derivatives(self, hashes: list[str]):
+        # Миниатюры удалённого содержимого больше никому не отдаются
+        await self.storage.delete_files_later(self.derivative_repo.delete_for_hashes(hashes))
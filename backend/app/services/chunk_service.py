@@ -0,0 +1,131 @@
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime
+from fastapi import UploadFile
+from app.repositories.chunk_repository import ChunkRepository
+from app.services.storage_service import StorageService
+from app.utils.concurrency import retry_intervals
+from app.config import get_settings
+
+settings = get_settings()
+
+CHUNK_PREFIX = "chunks/"
+
+
+class ChunkService:
+    """
+    Хранилище кусков переменной длины.
+
+    Кусок лежит в хранилище под ключом chunks/<sha256> в единственном
+    экземпляре, манифесты blob (blob_chunks) перечисляют куски по порядку,
+    а таблица chunks считает ссылки из манифестов. Новая версия документа
+    добавляет в хранилище только куски, которых там ещё нет.
+    """
+
+    def __init__(self, db: Session, storage: StorageService):
+        self.db = db
+        self.chunk_repo = ChunkRepository(db)
+        self.storage = storage
+
+    @staticmethod
+    def chunk_key(chunk_hash: str) -> str:
+        return f"{CHUNK_PREFIX}{chunk_hash}"
+
+    async def upload(self, file: UploadFile, max_size: int = settings.MAX_FILE_SIZE) -> dict:
+        """
+        Загрузить файл кусками. На каждый кусок манифеста берётся ссылка:
+        их забирает созданный blob или снимает release().
+        """
+        taken = Counter()
+
+        async def store_chunk(chunk_hash: str, data: bytes):
+            await self._store_chunk(chunk_hash, data)
+            taken[chunk_hash] += 1
+
+        try:
+            return await self.storage.upload_chunked(file, store_chunk, max_size)
+        except BaseException:
+            # Файл не загружен — ссылки на уже сохранённые куски не нужны
+            try:
+                await self.release(taken)
+            except Exception as e:
+                print(f"Warning: Could not release chunks of a failed upload: {e}")
+            raise
+
+    async def _store_chunk(self, chunk_hash: str, data: bytes):
+        key = self.chunk_key(chunk_hash)
+        async for _ in retry_intervals(settings.CONTENT_CLAIM_WAIT_SECONDS):
+            # Такой кусок уже есть — записывать нечего
+            if self.chunk_repo.add_reference(chunk_hash):
+                return
+            # Объект пишется только под заявкой: параллельное удаление того же
+            # куска не сотрёт его между записью и созданием строки
+            if self.chunk_repo.claim(chunk_hash, key, len(data)):
+                break
+            # Тот же кусок сейчас записывает или удаляет другой запрос
+        else:
+            raise Exception("Upload failed: concurrent chunk update, please retry")
+
+        try:
+            await self.storage.write_object(key, data)
+        except BaseException:
+            self.chunk_repo.drop_claim(chunk_hash)
+            raise
+        if not self.chunk_repo.activate(chunk_hash):
+            # Заявку сочли брошенной и сняли — объект мог быть удалён
+            raise Exception("Upload failed: concurrent chunk update, please retry")
+
+    def get_manifest(self, blob_hash: str) -> list[tuple[str, int]]:
+        """Куски содержимого по порядку: (ключ объекта, размер)"""
+        return self.chunk_repo.get_manifest(blob_hash)
+
+    async def release(self, counts: dict[str, int]):
+        """Снять ссылки с кусков; объекты без ссылок удаляются пакетно"""
+        if not counts:
+            return
+        try:
+            released = self.chunk_repo.remove_references(counts)
+            unreferenced = {
+                chunk_hash: stored_name
+                for chunk_hash, stored_name, ref_count in released
+                if ref_count <= 0
+            }
+            # Как и у blob: куски без ссылок переходят в удаление, и коммит
+            # идёт до ввода-вывода — блокировки строк не держатся через await,
+            # во время которого общую сессию может закоммитить другая корутина
+            self.chunk_repo.mark_deleting(list(unreferenced))
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        failed = set(await self.storage.delete_files(list(unreferenced.values())))
+        try:
+            # Строка удаляется, только если ссылок на кусок по-прежнему нет
+            self.chunk_repo.delete_unreferenced(
+                [chunk_hash for chunk_hash, stored_name in unreferenced.items() if stored_name not in failed]
+            )
+            self.chunk_repo.restore([chunk_hash for chunk_hash, stored_name in unreferenced.items() if stored_name in failed])
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+    async def purge_stale_claims(self, claimed_before: datetime) -> int:
+        """Удалить куски, заявки на которые бросили упавшие запросы; возвращает число удалённых"""
+        try:
+            stale = dict(self.chunk_repo.take_stale_claims(claimed_before))
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        failed = set(await self.storage.delete_files(list(stale.values())))
+        deleted = [chunk_hash for chunk_hash, stored_name in stale.items() if stored_name not in failed]
+        try:
+            self.chunk_repo.delete_unreferenced(deleted)
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+        return len(deleted)
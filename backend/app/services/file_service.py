@@ -1,10 +1,44 @@
 from sqlalchemy.orm import Session
 from app.schemas.file import File
+from app.schemas.file_version import FileVersion
 from app.repositories.file_repository import FileRepository
+from app.repositories.file_version_repository import FileVersionRepository
+from app.repositories.presigned_upload_repository import PresignedUploadRepository
 from app.services.storage_service import StorageService
-from app.models.file import FileUploadResponse
+from app.services.blob_service import BlobService
+from app.services.chunk_service import ChunkService
+from app.services.version_service import VersionPruner
+from app.schemas.blob import Blob, ContentState
+from app.schemas.upload_session import UploadSessionStatus
+from app.models.file import (
+    BatchUploadItem,
+    BatchUploadResponse,
+    FileUploadResponse,
+    FileVersionListResponse,
+    FileVersionResponse,
+    HashChallenge,
+    PresignedDownloadResponse,
+    PresignedUploadCreate,
+    PresignedUploadResponse,
+    UploadByHashRequest,
+    UploadByHashResponse,
+)
+from app.jobs.base import JobQueueError
+from app.jobs.tasks import enqueue
+from app.utils.chunking import use_chunking
+from app.utils.compression import choose_codec
+from app.utils.validators import FileValidator
+from app.utils.zip_stream import ZipEntry, stream_zip
 from fastapi import UploadFile
 from app.config import get_settings
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, List, Optional, Union
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
 import uuid
 
 settings = get_settings()
@@ -14,7 +48,11 @@ class FileService:
     def __init__(self, db: Session):
         self.db = db
         self.file_repo = FileRepository(db)
+        self.version_repo = FileVersionRepository(db)
+        self.presigned_repo = PresignedUploadRepository(db)
         self.storage = StorageService()
+        self.blob_service = BlobService(db, self.storage)
+        self.chunk_service = ChunkService(db, self.storage)
 
     async def upload_file(
             self,
@@ -23,35 +61,284 @@ class FileService:
             folder: str = "root"
     ) -> FileUploadResponse:
         """Загрузка одного файла"""
-        # Проверка размера
-        file_data = await file.read()
-        if len(file_data) > settings.MAX_FILE_SIZE:
-            raise ValueError(f"File too large. Max size: {settings.MAX_FILE_SIZE / 1e9} GB")
-
-        # Проверка расширения
-        file_ext = file.filename.split('.')[-1].lower() if file.filename else ""
-        if file_ext not in settings.ALLOWED_EXTENSIONS:
-            raise ValueError(f"File type not allowed. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}")
-
-        # Загрузка в MinIO
-        storage_info = await self.storage.upload_file(
+        # Проверка расширения — до чтения содержимого
+        FileValidator.validate_extension(file.filename)
+
+        blob = await self._store_upload(user_id, file)
+
+        return self._create_file_record(
             user_id,
             file.filename or "unknown",
-            file_data
+            file.content_type,
+            folder,
+            blob
+        )
+
+    async def upload_files(
+            self,
+            user_id: str,
+            files: List[UploadFile],
+            folder: str = "root"
+    ) -> BatchUploadResponse:
+        """
+        Пакетная загрузка: файлы пишутся в хранилище параллельно
+        (не больше BATCH_UPLOAD_CONCURRENCY одновременно), записи в БД
+        создаются одним INSERT. Ошибка одного файла не мешает остальным.
+
+        Сессия БД у всех загрузок общая: коммит одной завершил бы чужую
+        транзакцию и снял её блокировки. Поэтому работа с БД идёт по одной
+        загрузке за раз (db_lock), параллельна только запись в хранилище.
+        """
+        if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+            raise ValueError(f"Too many files: max {settings.BATCH_UPLOAD_MAX_FILES} per request")
+
+        semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+        db_lock = asyncio.Lock()
+
+        async def store(file: UploadFile) -> Blob:
+            async with semaphore:
+                FileValidator.validate_extension(file.filename)
+                return await self._store_upload(user_id, file, db_lock)
+
+        outcomes = await asyncio.gather(*(store(file) for file in files), return_exceptions=True)
+
+        results = []
+        records = []
+        for file, outcome in zip(files, outcomes):
+            filename = file.filename or "unknown"
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                error = str(outcome) if isinstance(outcome, ValueError) else f"Upload failed: {outcome}"
+                results.append(BatchUploadItem(filename=filename, success=False, error=error))
+                continue
+            record = self._file_record(user_id, filename, file.content_type, folder, outcome)
+            record["id"] = uuid.uuid4()
+            record["created_at"] = record["updated_at"] = record["uploaded_at"] = datetime.utcnow()
+            records.append(record)
+            results.append(BatchUploadItem(
+                filename=filename,
+                success=True,
+                file=FileUploadResponse(
+                    id=str(record["id"]),
+                    filename=filename,
+                    size=record["file_size"],
+                    created_at=record["created_at"]
+                )
+            ))
+
+        try:
+            self.file_repo.create_many(records)
+        except Exception:
+            # Записи не созданы — ссылки на blob-объекты освобождаются
+            for record in records:
+                await self.blob_service.release(record["blob_hash"])
+            raise
+
+        uploaded = len(records)
+        return BatchUploadResponse(uploaded=uploaded, failed=len(results) - uploaded, results=results)
+
+    async def _store_upload(self, user_id: str, file: UploadFile, db_lock: Optional[asyncio.Lock] = None) -> Blob:
+        """
+        Записать загружаемый файл в хранилище и получить blob с его содержимым.
+        Шаги с БД выполняются под db_lock, если загрузки делят сессию.
+        """
+        db_lock = db_lock or asyncio.Lock()
+
+        # Документы, которые заново загружают после правок, хранятся
+        # кусками: совпадающие с прежними версиями куски не дублируются.
+        # Куски регистрируются в БД по ходу записи — такой файл целиком под db_lock
+        if use_chunking(file.filename, file.size):
+            async with db_lock:
+                storage_info = await self.chunk_service.upload(file, settings.MAX_FILE_SIZE)
+                return await self.blob_service.store_chunked(storage_info)
+
+        # Потоковая загрузка в MinIO, размер проверяется по ходу чтения;
+        # текстовые форматы сжимаются на лету
+        storage_info = await self.storage.upload_stream(
+            user_id,
+            file,
+            settings.MAX_FILE_SIZE,
+            choose_codec(file.filename, file.size)
+        )
+
+        # Дедупликация: одинаковое содержимое хранится одним объектом
+        async with db_lock:
+            return await self.blob_service.store(storage_info)
+
+    async def upload_by_hash(self, user_id: str, data: UploadByHashRequest) -> UploadByHashResponse:
+        """
+        Мгновенная загрузка: файл с таким содержимым уже хранится.
+
+        Хеш и размер — не доказательство того, что у клиента есть содержимое:
+        их можно узнать и не имея файла. Без проверки ссылка добавляется только
+        на содержимое, которое уже есть в собственных файлах пользователя.
+        Иначе сервер выбирает случайный диапазон, и клиент повторяет запрос
+        с хешем этих байтов. Диапазон выдаётся независимо от того, хранится
+        ли содержимое, поэтому ответ не раскрывает чужие файлы.
+        """
+        FileValidator.validate_extension(data.filename)
+        FileValidator.validate_size(data.size)
+        file_hash = data.sha256.lower()
+
+        if not self.file_repo.user_has_blob(user_id, file_hash):
+            if data.challenge is None:
+                return UploadByHashResponse(exists=False, challenge=self._hash_challenge(user_id, file_hash, data.size))
+            offset, length = self._check_hash_challenge(data.challenge, user_id, file_hash, data.size)
+            if not data.range_sha256 or not await self._proves_possession(
+                file_hash, data.size, offset, length, data.range_sha256.lower()
+            ):
+                return UploadByHashResponse(exists=False)
+
+        blob = self.blob_service.reference_existing(file_hash, data.size)
+        if not blob:
+            return UploadByHashResponse(exists=False)
+
+        return UploadByHashResponse(exists=True, file=self._create_file_record(
+            user_id,
+            data.filename,
+            data.content_type,
+            data.folder,
+            blob
+        ))
+
+    @staticmethod
+    def _challenge_signature(user_id: str, file_hash: str, size: int, offset: int, length: int, expires: int) -> str:
+        message = f"upload-by-hash:{user_id}:{file_hash}:{size}:{offset}:{length}:{expires}"
+        return hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+    def _hash_challenge(self, user_id: str, file_hash: str, size: int) -> HashChallenge:
+        """Случайный диапазон содержимого, хеш которого должен прислать клиент"""
+        length = min(settings.UPLOAD_BY_HASH_PROOF_SIZE, size)
+        offset = secrets.randbelow(size - length + 1)
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.UPLOAD_BY_HASH_CHALLENGE_MINUTES)
+        expires = int(expires_at.replace(tzinfo=timezone.utc).timestamp())
+        signature = self._challenge_signature(user_id, file_hash, size, offset, length, expires)
+        return HashChallenge(
+            token=f"{offset}.{length}.{expires}.{signature}",
+            offset=offset,
+            length=length,
+            expires_at=expires_at
         )
 
-        # Сохранение в БД
-        new_file = self.file_repo.create({
+    def _check_hash_challenge(self, token: str, user_id: str, file_hash: str, size: int) -> tuple[int, int]:
+        """Диапазон из выданного этому пользователю и этому содержимому токена"""
+        try:
+            offset, length, expires, signature = token.split(".")
+            offset, length, expires = int(offset), int(length), int(expires)
+        except ValueError:
+            raise ValueError("Invalid challenge")
+        expected = self._challenge_signature(user_id, file_hash, size, offset, length, expires)
+        if not hmac.compare_digest(signature, expected):
+            raise ValueError("Invalid challenge")
+        if expires < datetime.now(timezone.utc).timestamp():
+            raise ValueError("Challenge expired")
+        return offset, length
+
+    async def _proves_possession(self, file_hash: str, size: int, offset: int, length: int, range_hash: str) -> bool:
+        """Совпадает ли хеш диапазона с хранящимся содержимым"""
+        blob = self.blob_service.blob_repo.get_by_hash(file_hash)
+        if not blob or blob.size != size or blob.state != ContentState.READY:
+            return False
+        if blob.chunked:
+            stream = self.storage.stream_chunks(self.chunk_service.get_manifest(file_hash), offset, length)
+        else:
+            stream = self.storage.stream_file(blob.stored_name, offset, length, blob.codec)
+        hasher = hashlib.sha256()
+        if length:
+            async for piece in stream:
+                hasher.update(piece)
+        return hmac.compare_digest(hasher.hexdigest(), range_hash)
+
+    async def create_presigned_upload(self, user_id: str, data: PresignedUploadCreate) -> PresignedUploadResponse:
+        """Выдача ссылки для загрузки файла напрямую в хранилище"""
+        FileValidator.validate_extension(data.filename)
+        FileValidator.validate_size(data.size)
+        if data.size <= 0:
+            raise ValueError("File is empty")
+
+        stored_name = f"{user_id}/{uuid.uuid4()}"
+        expires = timedelta(minutes=settings.PRESIGNED_URL_EXPIRE_MINUTES)
+        url = self.storage.presigned_upload_url(stored_name, expires)
+        if url is None:
+            raise ValueError("Presigned URLs are not supported by the storage backend")
+
+        upload = self.presigned_repo.create({
             "owner_id": uuid.UUID(user_id),
-            "original_name": file.filename or "unknown",
-            "stored_name": storage_info['stored_name'],
-            "file_size": storage_info['size'],
-            "file_type": file.content_type or 'application/octet-stream',
-            "folder": folder,
-            "file_hash": storage_info['file_hash'],
-            "s3_path": f"s3://{settings.MINIO_BUCKET_NAME}/{storage_info['stored_name']}"
+            "original_name": data.filename,
+            "file_type": data.content_type or "application/octet-stream",
+            "folder": data.folder,
+            "total_size": data.size,
+            "stored_name": stored_name,
+            "expires_at": datetime.utcnow() + expires,
         })
 
+        return PresignedUploadResponse(
+            upload_id=str(upload.id),
+            url=url,
+            expires_at=upload.expires_at
+        )
+
+    async def complete_presigned_upload(self, upload_id: str, user_id: str) -> FileUploadResponse:
+        """Регистрация файла, загруженного клиентом по подписанной ссылке"""
+        upload = self.presigned_repo.get_by_id(upload_id)
+        if not upload or str(upload.owner_id) != user_id:
+            raise ValueError("Upload not found or access denied")
+        if upload.status != UploadSessionStatus.ACTIVE:
+            raise ValueError(f"Upload is {upload.status}")
+
+        # Байты прошли мимо API: размер сверяем с заявленным по хранилищу
+        size = await self.storage.object_size(upload.stored_name)
+        if size is None:
+            raise ValueError("Object has not been uploaded yet")
+        if size != upload.total_size:
+            await self.storage.delete_file(upload.stored_name)
+            self.presigned_repo.update_status(upload_id, UploadSessionStatus.ABORTED)
+            raise ValueError(f"Uploaded size {size} does not match declared size {upload.total_size}")
+
+        file_hash = await self.storage.compute_hash(upload.stored_name)
+        blob = await self.blob_service.store({
+            "stored_name": upload.stored_name,
+            "file_hash": file_hash,
+            "size": size
+        })
+
+        response = self._create_file_record(
+            user_id,
+            upload.original_name,
+            upload.file_type,
+            upload.folder,
+            blob
+        )
+        self.presigned_repo.update_status(upload_id, UploadSessionStatus.COMPLETED, uuid.UUID(response.id))
+        return response
+
+    def presigned_download(self, file: File) -> PresignedDownloadResponse:
+        """Временная ссылка на скачивание файла напрямую из хранилища"""
+        if file.codec:
+            # Хранилище отдало бы сжатые байты, которые клиент не ждёт
+            raise ValueError("Direct download is not available for compressed files")
+        if file.chunked:
+            raise ValueError("Direct download is not available for files stored in chunks")
+        expires = timedelta(minutes=settings.PRESIGNED_URL_EXPIRE_MINUTES)
+        url = self.storage.presigned_download_url(file.stored_name, expires, file.original_name)
+        if url is None:
+            raise ValueError("Presigned URLs are not supported by the storage backend")
+        return PresignedDownloadResponse(url=url, expires_at=datetime.utcnow() + expires)
+
+    def _create_file_record(
+            self,
+            user_id: str,
+            filename: str,
+            content_type: Optional[str],
+            folder: str,
+            blob: Blob
+    ) -> FileUploadResponse:
+        """Сохранение в БД записи о файле, ссылающейся на blob"""
+        new_file = self.file_repo.create(
+            self._file_record(user_id, filename, content_type, folder, blob)
+        )
+
         return FileUploadResponse(
             id=str(new_file.id),
             filename=new_file.original_name,
@@ -59,14 +346,137 @@ class FileService:
             created_at=new_file.created_at
         )
 
-    async def download_file(self, file_id: str, user_id: str) -> tuple[bytes, str]:
-        """Скачивание файла"""
+    def _file_record(
+            self,
+            user_id: str,
+            filename: str,
+            content_type: Optional[str],
+            folder: str,
+            blob: Blob
+    ) -> dict:
+        """Поля записи о файле, ссылающейся на blob"""
+        return {
+            "owner_id": uuid.UUID(user_id),
+            "original_name": filename,
+            "stored_name": blob.stored_name,
+            "file_size": blob.size,
+            "file_type": content_type or 'application/octet-stream',
+            "folder": folder,
+            "file_hash": blob.hash,
+            "blob_hash": blob.hash,
+            "codec": blob.codec,
+            "stored_size": blob.stored_size,
+            "chunked": blob.chunked,
+            "s3_path": self.storage.object_uri(blob.stored_name)
+        }
+
+    def get_file(self, file_id: str, user_id: str) -> File:
+        """Файл пользователя с проверкой владельца"""
         file = self.file_repo.get_by_id(file_id)
 
         if not file or str(file.owner_id) != user_id:
             raise ValueError("File not found or access denied")
 
-        file_data = await self.storage.download_file(file.stored_name)
+        return file
+
+    def local_path(self, file: File, encoded: bool = False) -> Optional[str]:
+        """
+        Путь к содержимому на локальном диске, если хранилище его даёт.
+        Сжатый объект подходит, только если он отдаётся как есть (encoded);
+        файла, хранящегося кусками, на диске целиком нет.
+        """
+        if file.chunked or (file.codec and not encoded):
+            return None
+        return self.storage.local_path(file.stored_name)
+
+    async def read_file(self, file: File) -> bytes:
+        """Содержимое файла из хранилища"""
+        if file.chunked:
+            return await self.storage.download_chunks(self.chunk_service.get_manifest(file.blob_hash))
+        return await self.storage.download_file(file.stored_name, file.codec)
+
+    def stream_file(
+            self,
+            file: File,
+            offset: int = 0,
+            length: Optional[int] = None,
+            encoded: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Содержимое файла (или его диапазона) потоком, без загрузки объекта в память.
+        encoded — отдать сжатый объект как есть, без распаковки.
+        """
+        if file.chunked:
+            return self.storage.stream_chunks(self.chunk_service.get_manifest(file.blob_hash), offset, length)
+        codec = None if encoded else file.codec
+        return self.storage.stream_file(file.stored_name, offset, length, codec)
+
+    def get_archive_files(
+            self,
+            user_id: str,
+            file_ids: Optional[List[str]] = None,
+            folder: Optional[str] = None
+    ) -> List[File]:
+        """Файлы пользователя для архива: по списку ID или вся папка"""
+        if file_ids:
+            file_ids = list(dict.fromkeys(file_ids))
+            if len(file_ids) > settings.ARCHIVE_MAX_FILES:
+                raise ValueError(f"Too many files: max {settings.ARCHIVE_MAX_FILES} per archive")
+            files = self.file_repo.get_user_files_by_ids(user_id, file_ids)
+            if len(files) != len(file_ids):
+                raise ValueError("File not found or access denied")
+            # Порядок в архиве — как в запросе
+            order = {file_id: index for index, file_id in enumerate(file_ids)}
+            files.sort(key=lambda f: order[str(f.id)])
+        elif folder:
+            files = self.file_repo.get_user_files(user_id, folder, 0, settings.ARCHIVE_MAX_FILES + 1)
+            if len(files) > settings.ARCHIVE_MAX_FILES:
+                raise ValueError(f"Too many files: max {settings.ARCHIVE_MAX_FILES} per archive")
+        else:
+            raise ValueError("Specify file_ids or folder")
+
+        if not files:
+            raise ValueError("No files to archive")
+        return files
+
+    def stream_archive(self, files: List[File]) -> AsyncIterator[bytes]:
+        """ZIP-архив с файлами, собираемый потоком по мере чтения из хранилища"""
+        used_names = set()
+        entries = []
+        for file in files:
+            entries.append(ZipEntry(
+                name=self._archive_name(file.original_name, used_names),
+                size=file.file_size,
+                modified=file.updated_at,
+                open_stream=self._archive_stream(file)
+            ))
+        return stream_zip(entries, settings.ARCHIVE_PREFETCH_FILES, settings.ARCHIVE_PREFETCH_CHUNKS)
+
+    def _archive_stream(self, file: File) -> Callable[[], AsyncIterator[bytes]]:
+        # Архив отдаётся уже после запроса, поэтому манифест кусков
+        # читается из БД сейчас, а не при открытии потока
+        if file.chunked:
+            chunks = self.chunk_service.get_manifest(file.blob_hash)
+            return lambda: self.storage.stream_chunks(chunks)
+        stored_name, codec = file.stored_name, file.codec
+        return lambda: self.storage.stream_file(stored_name, codec=codec)
+
+    @staticmethod
+    def _archive_name(filename: str, used_names: set) -> str:
+        """Имя внутри архива: без путей и без повторов"""
+        name = filename.replace("/", "_").replace("\\", "_") or "unnamed"
+        stem, extension = os.path.splitext(name)
+        counter = 1
+        while name.lower() in used_names:
+            name = f"{stem} ({counter}){extension}"
+            counter += 1
+        used_names.add(name.lower())
+        return name
+
+    async def download_file(self, file_id: str, user_id: str) -> tuple[bytes, str]:
+        """Скачивание файла"""
+        file = self.get_file(file_id, user_id)
+        file_data = await self.read_file(file)
         return file_data, file.original_name
 
     async def delete_file(self, file_id: str, user_id: str):
@@ -76,11 +486,50 @@ class FileService:
         if not file or str(file.owner_id) != user_id:
             raise ValueError("File not found or access denied")
 
-        await self.storage.delete_file(file.stored_name)
-        self.file_repo.soft_delete(file_id)
+        if file.blob_hash:
+            # Объект общий — удаляется только вместе с последней ссылкой
+            blob_hash = file.blob_hash
+            self.file_repo.soft_delete(file_id, detach_blob=True)
+            await self.blob_service.release(blob_hash)
+        else:
+            await self.storage.delete_file(file.stored_name)
+            self.file_repo.soft_delete(file_id)
 
         return {"message": "File deleted successfully"}
 
+    async def delete_files(
+            self,
+            user_id: str,
+            file_ids: Optional[List[str]] = None,
+            folder: Optional[str] = None
+    ) -> dict:
+        """Массовое удаление файлов пользователя: по списку ID или всей папки"""
+        if file_ids:
+            file_ids = list(dict.fromkeys(file_ids))
+            if len(file_ids) > settings.BULK_DELETE_MAX_FILES:
+                raise ValueError(f"Too many files: max {settings.BULK_DELETE_MAX_FILES} per request")
+            deleted = self.file_repo.soft_delete_many(user_id, file_ids=file_ids)
+        elif folder:
+            deleted = self.file_repo.soft_delete_many(user_id, folder=folder)
+        else:
+            raise ValueError("Specify file_ids or folder")
+
+        # Записи уже удалены; общие объекты убираются с последней ссылкой,
+        # собственные объекты файлов — фоновыми задачами
+        blob_refs = Counter(blob_hash for _, _, blob_hash in deleted if blob_hash)
+        await self.blob_service.release_many(blob_refs)
+        await self.storage.delete_files_later(
+            [stored_name for _, stored_name, blob_hash in deleted if not blob_hash]
+        )
+
+        deleted_ids = [str(file_id) for file_id, _, _ in deleted]
+        found = set(deleted_ids)
+        return {
+            "deleted": len(deleted_ids),
+            "file_ids": deleted_ids,
+            "not_found": [file_id for file_id in file_ids or [] if file_id not in found],
+        }
+
     async def rename_file(self, file_id: str, new_name: str, user_id: str):
         """Переименование файла"""
         file = self.file_repo.get_by_id(file_id)
@@ -92,6 +541,96 @@ class FileService:
 
         return {"filename": new_name}
 
+    async def upload_version(self, file_id: str, user_id: str, file: UploadFile) -> FileVersionResponse:
+        """
+        Новая версия файла: прежнее содержимое становится версией в истории,
+        запись файла указывает на новое. Ссылка на blob переходит к версии,
+        поэтому неизменное содержимое не копируется.
+        """
+        self.get_file(file_id, user_id)
+        FileValidator.validate_extension(file.filename)
+
+        blob = await self._store_upload(user_id, file)
+        try:
+            # Параллельные загрузки версий одного файла идут по очереди
+            current = self.file_repo.get_for_update(file_id)
+            if not current:
+                raise ValueError("File not found or access denied")
+            self.version_repo.add({
+                "file_id": current.id,
+                "version": current.version,
+                "uploaded_at": current.uploaded_at or current.created_at,
+                "original_name": current.original_name,
+                "file_size": current.file_size,
+                "file_type": current.file_type,
+                "file_hash": current.file_hash,
+                "stored_name": current.stored_name,
+                "blob_hash": current.blob_hash,
+                "codec": current.codec,
+                "stored_size": current.stored_size,
+                "chunked": current.chunked,
+            })
+            current.version += 1
+            if file.content_type:
+                current.file_type = file.content_type
+            current.file_size = blob.size
+            current.file_hash = blob.hash
+            current.blob_hash = blob.hash
+            current.stored_name = blob.stored_name
+            current.codec = blob.codec
+            current.stored_size = blob.stored_size
+            current.chunked = blob.chunked
+            current.s3_path = self.storage.object_uri(blob.stored_name)
+            current.uploaded_at = current.updated_at = datetime.utcnow()
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            await self.blob_service.release(blob.hash)
+            raise
+
+        if settings.FILE_VERSIONS_MAX and current.version - 1 > settings.FILE_VERSIONS_MAX:
+            await self._prune_versions_later(file_id)
+        return self._version_response(current, current=True)
+
+    async def _prune_versions_later(self, file_id: str):
+        """Лишние версии удаляются фоновой задачей; если очередь недоступна — сразу"""
+        try:
+            await enqueue("prune_versions", file_id=file_id)
+        except JobQueueError as e:
+            print(f"Warning: {e}; pruning versions inline")
+            await VersionPruner(self.db, self.storage).prune(file_id)
+
+    def get_versions(self, file_id: str, user_id: str) -> FileVersionListResponse:
+        """Текущая и прежние версии файла, новые первыми"""
+        file = self.get_file(file_id, user_id)
+        versions = [self._version_response(file, current=True)]
+        versions.extend(self._version_response(version) for version in self.version_repo.get_for_file(file_id))
+        return FileVersionListResponse(file_id=str(file.id), current_version=file.version, versions=versions)
+
+    def get_version(self, file_id: str, user_id: str, version: int) -> Union[File, FileVersion]:
+        """
+        Версия файла по номеру: текущая — сама запись файла. У прежней версии
+        те же поля содержимого, так что она читается теми же методами.
+        """
+        file = self.get_file(file_id, user_id)
+        if version == file.version:
+            return file
+        previous = self.version_repo.get(file_id, version)
+        if not previous:
+            raise ValueError("Version not found")
+        return previous
+
+    @staticmethod
+    def _version_response(version: Union[File, FileVersion], current: bool = False) -> FileVersionResponse:
+        return FileVersionResponse(
+            version=version.version,
+            filename=version.original_name,
+            size=version.file_size,
+            hash=version.file_hash,
+            uploaded_at=version.uploaded_at or version.created_at,
+            current=current
+        )
+
     def get_user_files(
             self,
             user_id: str,
@@ -117,11 +656,10 @@ class FileService:
 
     def get_file_metadata(self, file_id: str, user_id: str):
         """Получение метаданных файла"""
-        file = self.file_repo.get_by_id(file_id)
-
-        if not file or str(file.owner_id) != user_id:
-            raise ValueError("File not found or access denied")
+        return self.file_metadata(self.get_file(file_id, user_id))
 
+    def file_metadata(self, file: File) -> dict:
+        """Метаданные файла по записи из БД"""
         return {
             "id": str(file.id),
             "filename": file.original_name,
@@ -0,0 +1,245 @@
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from app.repositories.derivative_repository import DerivativeRepository
+from app.repositories.file_repository import FileRepository
+from app.repositories.file_version_repository import FileVersionRepository
+from app.repositories.gc_run_repository import GcRunRepository
+from app.repositories.presigned_upload_repository import PresignedUploadRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.gc_run import GcRun, GcRunStatus
+from app.schemas.upload_session import UploadSessionStatus
+from app.services.blob_service import BlobService
+from app.services.storage_service import StorageService
+from app.config import get_settings
+import asyncio
+
+settings = get_settings()
+
+
+class GarbageCollector:
+    """
+    Окончательное удаление мягко удалённых файлов.
+
+    Записи, удалённые раньше GC_GRACE_PERIOD_HOURS, обходятся пачками по
+    возрастанию ID: собственные объекты файлов удаляются пакетно, ссылки на
+    blob снимаются (общий объект уходит с последней ссылкой), строки files
+    удаляются вместе с прежними версиями файлов. Каждая пачка — одна транзакция вместе с контрольной точкой
+    в gc_runs, поэтому прерванный запуск продолжается с того же места.
+
+    Заодно удаляются просроченные сессии загрузки и загрузки по подписанным
+    ссылкам: их незавершённые multipart-загрузки отменяются, объекты удаляются,
+    а также blob и куски, брошенные упавшими запросами посреди записи или удаления.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageService] = None):
+        self.db = db
+        self.file_repo = FileRepository(db)
+        self.version_repo = FileVersionRepository(db)
+        self.user_repo = UserRepository(db)
+        self.derivative_repo = DerivativeRepository(db)
+        self.run_repo = GcRunRepository(db)
+        self.session_repo = UploadSessionRepository(db)
+        self.presigned_repo = PresignedUploadRepository(db)
+        self.storage = storage or StorageService()
+        self.blob_service = BlobService(db, self.storage)
+
+    @staticmethod
+    def cutoff() -> datetime:
+        return datetime.utcnow() - timedelta(hours=settings.GC_GRACE_PERIOD_HOURS)
+
+    @staticmethod
+    def upload_cutoff() -> datetime:
+        # Сборка, начатая до истечения срока, успевает закончиться
+        return datetime.utcnow() - timedelta(hours=settings.GC_EXPIRED_UPLOAD_GRACE_HOURS)
+
+    async def dry_run(self, max_files: Optional[int] = None) -> dict:
+        """Что удалил бы запуск сейчас; ничего не меняет и не блокирует"""
+        cutoff = self.cutoff()
+        report = Counter()
+        cursor = None
+        while not max_files or report["files"] < max_files:
+            rows = self.file_repo.get_deleted_batch(cutoff, cursor, self._batch_size(report["files"], max_files), lock=False)
+            if not rows:
+                break
+            for row in rows:
+                report["files"] += 1
+                if row.blob_hash:
+                    report["blob_references"] += 1
+                elif not BlobService.is_blob_key(row.stored_name):
+                    report["objects"] += 1
+                    report["bytes"] += row.stored_size or row.file_size
+            cursor = str(rows[-1].id)
+
+        report["users"] = len(self.user_repo.get_deleted_ids(cutoff, without_files=False))
+        upload_cutoff = self.upload_cutoff()
+        report["uploads"] = self.session_repo.count_expired(upload_cutoff) + self.presigned_repo.count_expired(upload_cutoff)
+        return {
+            "dry_run": True,
+            "cutoff": cutoff,
+            "files": report["files"],
+            "objects": report["objects"],
+            "bytes": report["bytes"],
+            "blob_references": report["blob_references"],
+            "users": report["users"],
+            "uploads": report["uploads"],
+        }
+
+    async def run(self, max_files: Optional[int] = None) -> GcRun:
+        """Запуск сборщика (продолжает незавершённый); возвращает запись о запуске"""
+        if max_files is None:
+            max_files = settings.GC_MAX_FILES_PER_RUN
+        cutoff = self.cutoff()
+        run = self.run_repo.get_unfinished()
+        if run:
+            run.cutoff = cutoff
+            run.status = GcRunStatus.RUNNING
+            run.error = None
+            self.db.commit()
+        else:
+            run = self.run_repo.create(cutoff)
+
+        processed = 0
+        try:
+            await self._sweep_uploads(run)
+            # blob и куски, которые упавший запрос не дописал или не удалил
+            await self.blob_service.purge_stale_claims()
+            # Файлы, загруженные удалёнными пользователями уже после удаления:
+            # без этого запись пользователя никогда не будет удалена
+            self.file_repo.soft_delete_of_deleted_users()
+            self.db.commit()
+            while not max_files or processed < max_files:
+                rows = self.file_repo.get_deleted_batch(cutoff, run.cursor, self._batch_size(processed, max_files))
+                if not rows:
+                    break
+                await self._collect(run, rows)
+                processed += len(rows)
+                # Пауза между пачками: сборка идёт фоном и не должна мешать запросам
+                await asyncio.sleep(settings.GC_BATCH_DELAY)
+            else:
+                # Лимит исчерпан — следующий запуск продолжит с контрольной точки
+                run.status = GcRunStatus.PAUSED
+                self.db.commit()
+                return run
+
+            removed_users = self.user_repo.get_deleted_ids(cutoff)
+            self.user_repo.purge(removed_users)
+            run.users_deleted += len(removed_users)
+            run.status = GcRunStatus.FINISHED
+            run.finished_at = datetime.utcnow()
+            self.db.commit()
+            return run
+        except Exception as e:
+            self.db.rollback()
+            run.status = GcRunStatus.PAUSED
+            run.error = str(e)
+            self.db.commit()
+            raise
+
+    async def _collect(self, run: GcRun, rows: list):
+        # Объекты общего содержимого удаляет BlobService, а под ключами blobs/
+        # у отвязанных от blob записей лежит чужой объект
+        own = [
+            row for row in rows
+            if not row.blob_hash and not BlobService.is_blob_key(row.stored_name)
+        ]
+        # Объекты удаляются до коммита: если транзакция не пройдёт, записи
+        # останутся удалёнными и следующий запуск удалит объекты повторно
+        failed = set(await self.storage.delete_files([row.stored_name for row in own]))
+        # Запись с неудалённым объектом остаётся до следующего запуска
+        collected = [row for row in rows if row.blob_hash or row.stored_name not in failed]
+
+        try:
+            # Прежние версии уходят вместе с файлом
+            versions = self.version_repo.delete_for_files([row.id for row in collected])
+            self.file_repo.hard_delete([row.id for row in collected])
+            blob_refs = Counter(row.blob_hash for row in collected if row.blob_hash)
+            blob_refs.update(blob_hash for _, blob_hash in versions if blob_hash)
+
+            run.cursor = str(rows[-1].id)
+            run.files_deleted += len(collected)
+            run.objects_deleted += len(own) - len(failed)
+            run.bytes_freed += sum(row.stored_size or row.file_size for row in own if row.stored_name not in failed)
+            run.blob_references += sum(blob_refs.values())
+            run.failed_objects += len(failed)
+
+            # Снятие ссылок коммитит транзакцию вместе с удалением строк
+            # и контрольной точкой
+            await self.blob_service.release_many(blob_refs)
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        # Собственные объекты версий, загруженных до дедупликации
+        await self.storage.delete_files_later([
+            stored_name for stored_name, blob_hash in versions
+            if not blob_hash and not BlobService.is_blob_key(stored_name)
+        ])
+        # Миниатюры содержимого, на которое больше никто не ссылается
+        hashes = list({row.file_hash for row in collected if not row.blob_hash})
+        await self.storage.delete_files_later(self.derivative_repo.delete_orphaned(hashes))
+
+    async def _sweep_uploads(self, run: GcRun):
+        """Удалить просроченные загрузки вместе с их частями и объектами"""
+        cutoff = self.upload_cutoff()
+        batch_size = settings.GC_BATCH_SIZE
+        unfinished = (UploadSessionStatus.ACTIVE, UploadSessionStatus.COMPLETING, UploadSessionStatus.FAILED)
+
+        while sessions := self.session_repo.get_expired(cutoff, batch_size):
+            pending = [s for s in sessions if s.status in unfinished]
+            for upload_session in pending:
+                # Ошибка отмены (загрузка уже собрана) только выводится
+                await self.storage.abort_multipart_upload(upload_session.stored_name, upload_session.upload_id)
+            failed = set(await self.storage.delete_files([s.stored_name for s in pending]))
+            removed = [s.id for s in sessions if s.stored_name not in failed]
+            self._commit_sweep(run, self.session_repo, removed)
+            if not removed or len(sessions) < batch_size:
+                break
+
+        while uploads := self.presigned_repo.get_expired(cutoff, batch_size):
+            # Объект незавершённой загрузки клиент мог успеть записать
+            failed = set(await self.storage.delete_files(
+                [u.stored_name for u in uploads if u.status == UploadSessionStatus.ACTIVE]
+            ))
+            removed = [u.id for u in uploads if u.stored_name not in failed]
+            self._commit_sweep(run, self.presigned_repo, removed)
+            if not removed or len(uploads) < batch_size:
+                break
+
+    def _commit_sweep(self, run: GcRun, repo, removed: list):
+        try:
+            repo.delete_many(removed)
+            run.uploads_expired += len(removed)
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+    @staticmethod
+    def _batch_size(processed: int, max_files: Optional[int]) -> int:
+        if not max_files:
+            return settings.GC_BATCH_SIZE
+        return min(settings.GC_BATCH_SIZE, max_files - processed)
+
+
+def run_summary(run: GcRun) -> dict:
+    """Запуск сборщика в виде ответа API"""
+    return {
+        "id": str(run.id),
+        "status": run.status,
+        "cutoff": run.cutoff,
+        "cursor": run.cursor,
+        "files_deleted": run.files_deleted,
+        "objects_deleted": run.objects_deleted,
+        "bytes_freed": run.bytes_freed,
+        "blob_references": run.blob_references,
+        "failed_objects": run.failed_objects,
+        "users_deleted": run.users_deleted,
+        "uploads_expired": run.uploads_expired,
+        "error": run.error,
+        "started_at": run.created_at,
+        "finished_at": run.finished_at,
+    }
@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Optional
+from app.database import SessionLocal
+from app.repositories.chunk_repository import ChunkRepository
+from app.repositories.derivative_repository import DerivativeRepository
+from app.repositories.file_repository import FileRepository
+from app.schemas.derivative import Derivative
+from app.schemas.file import File
+from app.services.storage_service import StorageService
+from app.utils.cpu_executor import cpu_executor
+from app.utils.images import render_derivative
+from app.utils.validators import FileValidator
+from app.config import get_settings
+import asyncio
+
+settings = get_settings()
+
+DERIVATIVE_PREFIX = "derivatives/"
+
+# Генерации, идущие в этом процессе: параллельные запросы одной и той же
+# миниатюры ждут одну задачу, а не запускают декодирование заново
+_inflight: dict[str, asyncio.Future] = {}
+
+
+class ImageService:
+    """
+    Уменьшенные копии изображений (миниатюры для галерей).
+
+    Копия генерируется при первом запросе в пуле процессов и сохраняется
+    в хранилище под ключом derivatives/<sha256>/w<ширина>.<формат>;
+    следующие запросы отдают готовый объект.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageService] = None):
+        self.db = db
+        self.derivative_repo = DerivativeRepository(db)
+        self.storage = storage or StorageService()
+
+    @staticmethod
+    def is_image(filename: Optional[str]) -> bool:
+        return FileValidator.get_extension(filename) in settings.IMAGE_EXTENSIONS
+
+    @staticmethod
+    def snap_width(width: int) -> int:
+        """Ближайшая не меньшая ширина из IMAGE_WIDTHS (или наибольшая из них)"""
+        widths = sorted(settings.IMAGE_WIDTHS)
+        return next((allowed for allowed in widths if allowed >= width), widths[-1])
+
+    @staticmethod
+    def derivative_key(file_hash: str, width: int, image_format: str) -> str:
+        return f"{DERIVATIVE_PREFIX}{file_hash}/w{width}.{image_format}"
+
+    async def get_derivative(self, file: File, width: int, image_format: str) -> Derivative:
+        """Уменьшенная копия изображения: из хранилища или сгенерированная сейчас"""
+        if not self.is_image(file.original_name):
+            raise ValueError("File is not an image")
+        if file.file_size > settings.IMAGE_MAX_SOURCE_SIZE:
+            raise ValueError(f"Image too large to resize. Max size: {settings.IMAGE_MAX_SOURCE_SIZE / 1e6} MB")
+        width = self.snap_width(width)
+
+        derivative = self.derivative_repo.get(file.file_hash, width, image_format)
+        if derivative:
+            return derivative
+
+        key = self.derivative_key(file.file_hash, width, image_format)
+        task = _inflight.get(key)
+        if task is None:
+            chunks = ChunkRepository(self.db).get_manifest(file.blob_hash) if file.chunked else None
+            task = asyncio.ensure_future(self._render(file.stored_name, file.codec, chunks, width, image_format, key))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # Обрыв одного запроса не отменяет генерацию, которую ждут другие
+        size = await asyncio.shield(task)
+
+        return self.derivative_repo.create(file.file_hash, width, image_format, key, size)
+
+    def local_path(self, derivative: Derivative) -> Optional[str]:
+        return self.storage.local_path(derivative.stored_name)
+
+    def stream(self, derivative: Derivative, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        return self.storage.stream_file(derivative.stored_name, offset, length)
+
+    async def _render(
+            self,
+            stored_name: str,
+            codec: Optional[str],
+            chunks: Optional[list[tuple[str, int]]],
+            width: int,
+            image_format: str,
+            key: str
+    ) -> int:
+        # Задача не трогает сессию БД: её может пережить запрос, который её начал
+        if chunks is not None:
+            data = await self.storage.download_chunks(chunks)
+        else:
+            data = await self.storage.download_file(stored_name, codec)
+        output = await cpu_executor().run(
+            "image",
+            render_derivative,
+            data,
+            width,
+            image_format,
+            settings.IMAGE_QUALITY,
+            settings.IMAGE_MAX_PIXELS
+        )
+        await self.storage.write_object(key, output)
+        return len(output)
+
+
+async def generate_standard_derivatives(file_id: str):
+    """Фоновая генерация миниатюр стандартных размеров сразу после загрузки"""
+    db = SessionLocal()
+    try:
+        file = FileRepository(db).get_by_id(file_id)
+        if not file:
+            return
+        service = ImageService(db)
+        for width in settings.IMAGE_EAGER_WIDTHS:
+            try:
+                await service.get_derivative(file, width, settings.IMAGE_EAGER_FORMAT)
+            except ValueError as e:
+                # Не изображение или битый файл — миниатюра будет недоступна и по запросу
+                print(f"Warning: Could not generate thumbnail for {file_id}: {e}")
+                return
+    finally:
+        db.close()
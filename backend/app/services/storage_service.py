@@ -1,31 +1,49 @@
-from minio import Minio
-from minio.error import S3Error
+from fastapi import UploadFile
+from collections import deque
+from datetime import timedelta
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from app.config import get_settings
-import io
+from app.jobs.base import JobQueueError
+from app.jobs.tasks import enqueue
+from app.storage.base import StorageBackend, ObjectWriter, StorageError, storage_executor
+from app.storage.factory import get_storage_backend
+from app.utils.chunking import find_chunks
+from app.utils.compression import compressor, decompressing_reader
+from app.utils.concurrency import close_after, run_blocking
+from app.utils.cpu_executor import cpu_executor
+import asyncio
 import hashlib
 import uuid
 
 settings = get_settings()
 
 class StorageService:
-    def __init__(self):
-        self.client = Minio(
-            settings.MINIO_URL.replace("http://", "").replace("https://", ""),
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=False
-        )
-        self.bucket_name = settings.MINIO_BUCKET_NAME
-        self._ensure_bucket_exists()
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_storage_backend()
 
-    def _ensure_bucket_exists(self):
-        """Создание bucket если его нет"""
-        try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
-                print(f"✓ Bucket '{self.bucket_name}' created")
-        except S3Error as e:
-            print(f"Warning: Could not ensure bucket exists: {e}")
+    def open_writer(self, stored_name: str) -> ObjectWriter:
+        """Писатель для потоковой (в MinIO — параллельной multipart) загрузки объекта"""
+        return self.backend.open_writer(stored_name)
+
+    def object_uri(self, stored_name: str) -> str:
+        """Адрес объекта для поля s3_path"""
+        return self.backend.object_uri(stored_name)
+
+    def local_path(self, stored_name: str) -> Optional[str]:
+        """Путь к объекту на локальном диске (только для локального бэкенда)"""
+        return self.backend.local_path(stored_name)
+
+    def presigned_download_url(self, stored_name: str, expires: timedelta, filename: str) -> Optional[str]:
+        """Временная ссылка на скачивание мимо API (None — бэкенд не поддерживает)"""
+        return self.backend.presigned_get_url(stored_name, expires, filename)
+
+    def presigned_upload_url(self, stored_name: str, expires: timedelta) -> Optional[str]:
+        """Временная ссылка на загрузку мимо API (None — бэкенд не поддерживает)"""
+        return self.backend.presigned_put_url(stored_name, expires)
+
+    async def object_size(self, stored_name: str) -> Optional[int]:
+        """Размер объекта в хранилище или None, если его нет"""
+        return await self.backend.stat(stored_name)
 
     async def upload_file(
         self,
@@ -33,43 +51,353 @@ class StorageService:
         filename: str,
         file_data: bytes
     ) -> dict:
-        """Загрузка файла в MinIO"""
+        """Загрузка файла в хранилище"""
+        # Генерация уникального имени
+        unique_name = str(uuid.uuid4())
+        stored_name = f"{user_id}/{unique_name}"
+
+        # Вычисление хеша (вне event loop: для больших файлов это секунды)
+        file_hash = await cpu_executor().run("hash", lambda: hashlib.sha256(file_data).hexdigest())
+
+        # Загрузка (большие данные в MinIO — параллельными частями)
+        writer = self.open_writer(stored_name)
+        try:
+            await writer.write(file_data)
+            await writer.complete()
+        except BaseException:
+            await writer.abort()
+            raise
+
+        return {
+            "stored_name": stored_name,
+            "file_hash": file_hash,
+            "size": len(file_data)
+        }
+
+    async def write_object(self, stored_name: str, data: bytes):
+        """Записать объект под заданным ключом"""
+        writer = self.open_writer(stored_name)
         try:
-            # Генерация уникального имени
-            unique_name = str(uuid.uuid4())
-            stored_name = f"{user_id}/{unique_name}"
-
-            # Вычисление хеша
-            file_hash = hashlib.sha256(file_data).hexdigest()
-
-            # Загрузка в MinIO
-            self.client.put_object(
-                self.bucket_name,
-                stored_name,
-                io.BytesIO(file_data),
-                len(file_data),
-                content_type="application/octet-stream"
+            await writer.write(data)
+            await writer.complete()
+        except BaseException:
+            await writer.abort()
+            raise
+
+    async def upload_stream(
+        self,
+        user_id: str,
+        file: UploadFile,
+        max_size: int = settings.MAX_FILE_SIZE,
+        codec: Optional[str] = None
+    ) -> dict:
+        """
+        Потоковая загрузка файла в хранилище кусками.
+
+        С codec содержимое сжимается по ходу загрузки; хеш и размер
+        считаются по исходным байтам, stored_size — размер сжатого объекта.
+        """
+        stored_name = f"{user_id}/{uuid.uuid4()}"
+        cpu = cpu_executor()
+        hasher = hashlib.sha256()
+        encoder = compressor(codec) if codec else None
+        writer = self.open_writer(stored_name)
+        size = 0
+
+        try:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"File too large. Max size: {max_size / 1e9} GB")
+                if encoder:
+                    # Хеш и сжатие одного куска считаются параллельно в разных потоках
+                    _, chunk = await asyncio.gather(
+                        cpu.run("hash", hasher.update, chunk),
+                        cpu.run("compress", encoder.compress, chunk)
+                    )
+                    if not chunk:
+                        continue
+                else:
+                    await cpu.run("hash", hasher.update, chunk)
+                await writer.write(chunk)
+            if encoder:
+                await writer.write(encoder.flush())
+            await writer.complete()
+        except BaseException:
+            # Ошибка хранилища, превышение лимита, обрыв соединения клиента и т.п.
+            await writer.abort()
+            raise
+
+        return {
+            "stored_name": stored_name,
+            "file_hash": hasher.hexdigest(),
+            "size": size,
+            "codec": codec,
+            "stored_size": writer.size if codec else None
+        }
+
+    async def upload_chunked(
+        self,
+        file: UploadFile,
+        store_chunk: Callable[[str, bytes], Awaitable[None]],
+        max_size: int = settings.MAX_FILE_SIZE
+    ) -> dict:
+        """
+        Потоковая загрузка с разбиением на куски переменной длины.
+
+        Границы кусков зависят только от содержимого, поэтому после правки
+        в середине файла остальные куски совпадают с кусками прежней версии.
+        Каждый кусок передаётся store_chunk(sha256, данные): записывать ли его
+        в хранилище, решает вызывающий код. Возвращает хеш и размер файла
+        и хеши кусков по порядку.
+        """
+        cpu = cpu_executor()
+        hasher = hashlib.sha256()
+        pending = b""
+        chunks = []
+        size = 0
+
+        while True:
+            data = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            size += len(data)
+            if size > max_size:
+                raise ValueError(f"File too large. Max size: {max_size / 1e9} GB")
+            final = not data
+            pending += data
+            # Хеш файла (поток) и поиск границ с хешами кусков (процесс) параллельно
+            _, found = await asyncio.gather(
+                cpu.run("hash", hasher.update, data),
+                cpu.run(
+                    "chunk",
+                    find_chunks,
+                    pending,
+                    final,
+                    settings.CHUNK_MIN_SIZE,
+                    settings.CHUNK_AVG_SIZE,
+                    settings.CHUNK_MAX_SIZE
+                )
             )
 
-            return {
-                "stored_name": stored_name,
-                "file_hash": file_hash,
-                "size": len(file_data)
-            }
-        except S3Error as e:
-            raise Exception(f"Upload failed: {e}")
+            start = 0
+            pieces = []
+            for end, chunk_hash in found:
+                pieces.append((chunk_hash, pending[start:end]))
+                start = end
+            # Куски одного прочитанного фрагмента записываются параллельно;
+            # ошибка пробрасывается, когда завершатся все записи
+            outcomes = await asyncio.gather(
+                *(store_chunk(chunk_hash, piece) for chunk_hash, piece in pieces),
+                return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            chunks.extend(chunk_hash for chunk_hash, _ in pieces)
+            pending = pending[start:]
+            if final:
+                break
+
+        return {
+            "file_hash": hasher.hexdigest(),
+            "size": size,
+            "chunks": chunks
+        }
+
+    async def create_multipart_upload(self, stored_name: str) -> str:
+        """Начать multipart-загрузку, возвращает upload_id"""
+        return await self.backend.create_multipart_upload(stored_name)
+
+    async def upload_part(
+        self,
+        stored_name: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes
+    ) -> str:
+        """Загрузить одну часть multipart-загрузки, возвращает ETag"""
+        return await self.backend.upload_part(stored_name, upload_id, part_number, data)
+
+    async def complete_multipart_upload(
+        self,
+        stored_name: str,
+        upload_id: str,
+        parts: list[tuple[int, str]]
+    ):
+        """Собрать объект из загруженных частей (номер части, ETag)"""
+        await self.backend.complete_multipart_upload(stored_name, upload_id, parts)
+
+    async def abort_multipart_upload(self, stored_name: str, upload_id: str):
+        """Отмена незавершённой multipart-загрузки"""
+        try:
+            await self.backend.abort_multipart_upload(stored_name, upload_id)
+        except StorageError as e:
+            print(f"Warning: Could not abort multipart upload {upload_id}: {e}")
+
+    async def compute_hash(self, stored_name: str) -> str:
+        """
+        SHA-256 объекта, вычисляется потоковым чтением из хранилища.
 
-    async def download_file(self, stored_name: str) -> bytes:
-        """Скачивание файла"""
+        Следующий кусок читается (пул ввода-вывода), пока хешируется
+        текущий (пул CPU-задач).
+        """
+        cpu = cpu_executor()
+        hasher = hashlib.sha256()
+        reader = await run_blocking(storage_executor, self.backend.open_reader, stored_name)
+        pending = storage_executor.submit(reader.read, settings.UPLOAD_CHUNK_SIZE)
         try:
-            response = self.client.get_object(self.bucket_name, stored_name)
-            return response.read()
-        except S3Error as e:
-            raise Exception(f"Download failed: {e}")
+            while chunk := await asyncio.wrap_future(pending):
+                pending = storage_executor.submit(reader.read, settings.UPLOAD_CHUNK_SIZE)
+                await cpu.run("hash", hasher.update, chunk)
+        finally:
+            close_after(storage_executor, reader.close, pending)
+        return hasher.hexdigest()
+
+    async def download_file(self, stored_name: str, codec: Optional[str] = None) -> bytes:
+        """Скачивание файла (сжатый объект распаковывается)"""
+        if codec:
+            return await run_blocking(storage_executor, self._read_decoded, stored_name, codec)
+        return await self.backend.read(stored_name)
+
+    def stream_file(
+        self,
+        stored_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        codec: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """Потоковое скачивание файла (или диапазона) кусками; смещения — в исходном содержимом"""
+        if codec:
+            return self._stream_decoded(stored_name, codec, offset, length)
+        return self.backend.stream(stored_name, offset, length)
+
+    async def _stream_decoded(
+        self,
+        stored_name: str,
+        codec: str,
+        offset: int,
+        length: Optional[int]
+    ) -> AsyncIterator[bytes]:
+        # Распаковка идёт в пуле потоков кусками по DOWNLOAD_CHUNK_SIZE,
+        # следующий кусок — только после того, как потребитель забрал предыдущий
+        reader = await run_blocking(storage_executor, self._open_decoded, stored_name, codec, offset)
+        remaining = length
+        pending = None
+        try:
+            while remaining is None or remaining > 0:
+                size = settings.DOWNLOAD_CHUNK_SIZE if remaining is None else min(settings.DOWNLOAD_CHUNK_SIZE, remaining)
+                pending = storage_executor.submit(reader.read, size)
+                chunk = await asyncio.wrap_future(pending)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            close_after(storage_executor, reader.close, pending)
+
+    async def stream_chunks(
+        self,
+        chunks: list[tuple[str, int]],
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Содержимое, собранное из кусков (ключ, размер), потоком.
+
+        Из хранилища читаются только куски, попадающие в диапазон; следующие
+        CHUNK_PREFETCH кусков читаются заранее, пока отдаётся текущий.
+        """
+        end = sum(size for _, size in chunks) if length is None else offset + length
+        parts = []
+        position = 0
+        for stored_name, size in chunks:
+            if position >= end:
+                break
+            start, stop = max(offset - position, 0), min(end - position, size)
+            if start < stop:
+                parts.append((stored_name, start, stop - start))
+            position += size
+
+        parts = iter(parts)
+        prefetched = deque()
+        try:
+            while True:
+                while len(prefetched) < settings.CHUNK_PREFETCH and (part := next(parts, None)):
+                    prefetched.append(asyncio.ensure_future(
+                        run_blocking(storage_executor, self._read_range, *part)
+                    ))
+                if not prefetched:
+                    break
+                data = await prefetched.popleft()
+                for start in range(0, len(data), settings.DOWNLOAD_CHUNK_SIZE):
+                    yield data[start:start + settings.DOWNLOAD_CHUNK_SIZE]
+        finally:
+            # Обрыв соединения: незачем ждать куски, которые никто не заберёт
+            for task in prefetched:
+                task.cancel()
+
+    async def download_chunks(self, chunks: list[tuple[str, int]]) -> bytes:
+        """Содержимое, собранное из кусков, целиком"""
+        return b"".join([piece async for piece in self.stream_chunks(chunks)])
+
+    def _read_range(self, stored_name: str, offset: int, length: int) -> bytes:
+        reader = self.backend.open_reader(stored_name, offset, length)
+        try:
+            parts = []
+            remaining = length
+            while remaining > 0 and (data := reader.read(remaining)):
+                parts.append(data)
+                remaining -= len(data)
+        finally:
+            reader.close()
+        if remaining:
+            raise StorageError(f"Chunk {stored_name} is shorter than expected")
+        return b"".join(parts)
+
+    def _open_decoded(self, stored_name: str, codec: str, offset: int = 0):
+        reader = decompressing_reader(
+            codec,
+            self.backend.open_reader(stored_name),
+            settings.DOWNLOAD_CHUNK_SIZE
+        )
+        try:
+            if offset:
+                # Сжатый поток нельзя начать с середины: начало распаковывается и отбрасывается
+                reader.seek(offset)
+        except BaseException:
+            reader.close()
+            raise
+        return reader
+
+    def _read_decoded(self, stored_name: str, codec: str) -> bytes:
+        reader = self._open_decoded(stored_name, codec)
+        try:
+            return reader.read()
+        finally:
+            reader.close()
+
+    async def copy_file(self, source_name: str, target_name: str):
+        """Копирование объекта внутри хранилища без передачи данных через API"""
+        await self.backend.copy(source_name, target_name)
 
     async def delete_file(self, stored_name: str):
         """Удаление файла"""
-        try:
-            self.client.remove_object(self.bucket_name, stored_name)
-        except S3Error as e:
-            raise Exception(f"Delete failed: {e}")
+        await self.backend.delete(stored_name)
+
+    async def delete_files(self, stored_names: list[str]) -> list[str]:
+        """Пакетное удаление файлов; возвращает имена, которые удалить не удалось"""
+        if not stored_names:
+            return []
+        return await self.backend.delete_many(stored_names)
+
+    async def delete_files_later(self, stored_names: list[str]):
+        """Удаление объектов фоновыми задачами; если очередь недоступна — сразу"""
+        batch_size = settings.STORAGE_DELETE_BATCH_SIZE
+        for start in range(0, len(stored_names), batch_size):
+            batch = stored_names[start:start + batch_size]
+            try:
+                await enqueue("purge_objects", keys=batch)
+            except JobQueueError as e:
+                print(f"Warning: {e}; deleting objects inline")
+                await self.delete_files(stored_names[start:])
+                return
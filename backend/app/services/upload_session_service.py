@@ -0,0 +1,235 @@
+from sqlalchemy.orm import Session
+from app.repositories.file_repository import FileRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
+from app.schemas.upload_session import UploadSession, UploadSessionStatus
+from app.services.storage_service import StorageService
+from app.services.blob_service import BlobService
+from app.models.file import (
+    FileUploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    UploadSessionStatusResponse,
+)
+from app.utils.validators import FileValidator
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+import math
+import uuid
+
+settings = get_settings()
+
+# Ограничение S3 на количество частей в одной multipart-загрузке
+MAX_PARTS = 10_000
+
+
+class UploadSessionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.session_repo = UploadSessionRepository(db)
+        self.file_repo = FileRepository(db)
+        self.storage = StorageService()
+        self.blob_service = BlobService(db, self.storage)
+
+    async def create_session(self, user_id: str, data: UploadSessionCreate) -> UploadSessionResponse:
+        """Создание сессии возобновляемой загрузки"""
+        FileValidator.validate_extension(data.filename)
+        FileValidator.validate_size(data.size)
+        if data.size <= 0:
+            raise ValueError("File is empty")
+
+        chunk_size = settings.UPLOAD_CHUNK_SIZE
+        total_chunks = math.ceil(data.size / chunk_size)
+        if total_chunks > MAX_PARTS:
+            raise ValueError(f"Too many chunks: {total_chunks} (max {MAX_PARTS})")
+
+        stored_name = f"{user_id}/{uuid.uuid4()}"
+        upload_id = await self.storage.create_multipart_upload(stored_name)
+
+        upload_session = self.session_repo.create({
+            "owner_id": uuid.UUID(user_id),
+            "original_name": data.filename,
+            "file_type": data.content_type or "application/octet-stream",
+            "folder": data.folder,
+            "total_size": data.size,
+            "chunk_size": chunk_size,
+            "total_chunks": total_chunks,
+            "stored_name": stored_name,
+            "upload_id": upload_id,
+            "expires_at": datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+        })
+
+        return UploadSessionResponse(
+            session_id=str(upload_session.id),
+            chunk_size=chunk_size,
+            total_chunks=total_chunks,
+            expires_at=upload_session.expires_at
+        )
+
+    async def upload_chunk(
+            self,
+            session_id: str,
+            user_id: str,
+            index: int,
+            body: AsyncIterator[bytes]
+    ) -> dict:
+        """Приём одного куска (номера с 0, в любом порядке)"""
+        upload_session = self._get_active_session(session_id, user_id)
+
+        if index < 0 or index >= upload_session.total_chunks:
+            raise ValueError(f"Chunk index out of range: 0..{upload_session.total_chunks - 1}")
+        expected_size = self._expected_chunk_size(upload_session, index)
+
+        # Кусок ограничен chunk_size, поэтому его можно собрать в памяти
+        data = bytearray()
+        async for piece in body:
+            data += piece
+            if len(data) > expected_size:
+                raise ValueError(f"Chunk {index} too large: expected {expected_size} bytes")
+        if len(data) != expected_size:
+            raise ValueError(f"Chunk {index} size mismatch: expected {expected_size}, got {len(data)}")
+
+        part_number = index + 1
+        etag = await self.storage.upload_part(
+            upload_session.stored_name,
+            upload_session.upload_id,
+            part_number,
+            bytes(data)
+        )
+        self.session_repo.save_part(session_id, part_number, etag, len(data))
+
+        return {"index": index, "size": len(data)}
+
+    def get_status(self, session_id: str, user_id: str) -> UploadSessionStatusResponse:
+        """Какие куски уже получены"""
+        upload_session = self._get_session(session_id, user_id)
+        received = [p.part_number - 1 for p in self.session_repo.get_parts(session_id)]
+        received_set = set(received)
+
+        return UploadSessionStatusResponse(
+            session_id=str(upload_session.id),
+            status=upload_session.status,
+            chunk_size=upload_session.chunk_size,
+            total_chunks=upload_session.total_chunks,
+            received_chunks=received,
+            missing_chunks=[i for i in range(upload_session.total_chunks) if i not in received_set],
+            expires_at=upload_session.expires_at
+        )
+
+    async def complete_session(self, session_id: str, user_id: str) -> FileUploadResponse:
+        """Сборка файла из полученных кусков"""
+        upload_session = self._claim_session(session_id, user_id)
+
+        completed = False
+        blob = None
+        try:
+            await self.storage.complete_multipart_upload(
+                upload_session.stored_name,
+                upload_session.upload_id,
+                [(p.part_number, p.etag) for p in upload_session.parts]
+            )
+            completed = True
+            file_hash = await self.storage.compute_hash(upload_session.stored_name)
+            blob = await self.blob_service.store({
+                "stored_name": upload_session.stored_name,
+                "file_hash": file_hash,
+                "size": upload_session.total_size
+            })
+
+            new_file = self.file_repo.create({
+                "owner_id": upload_session.owner_id,
+                "original_name": upload_session.original_name,
+                "stored_name": blob.stored_name,
+                "file_size": upload_session.total_size,
+                "file_type": upload_session.file_type,
+                "folder": upload_session.folder,
+                "file_hash": blob.hash,
+                "blob_hash": blob.hash,
+                "codec": blob.codec,
+                "stored_size": blob.stored_size,
+                "chunked": blob.chunked,
+                "s3_path": self.storage.object_uri(blob.stored_name)
+            })
+        except BaseException:
+            self.db.rollback()
+            await self._fail_session(upload_session, completed, blob)
+            raise
+        self.session_repo.update_status(session_id, UploadSessionStatus.COMPLETED, new_file.id)
+
+        return FileUploadResponse(
+            id=str(new_file.id),
+            filename=new_file.original_name,
+            size=new_file.file_size,
+            created_at=new_file.created_at
+        )
+
+    def _claim_session(self, session_id: str, user_id: str) -> UploadSession:
+        """
+        Перевести сессию в сборку. Строка блокируется, поэтому из параллельных
+        запросов на сборку одной сессии проходит только один.
+        """
+        try:
+            upload_session = self.session_repo.get_for_update(session_id)
+            self._check_active(upload_session, user_id)
+
+            received = {p.part_number - 1 for p in upload_session.parts}
+            if len(received) != upload_session.total_chunks:
+                missing = [i for i in range(upload_session.total_chunks) if i not in received]
+                raise ValueError(f"Missing chunks: {missing}")
+
+            upload_session.status = UploadSessionStatus.COMPLETING
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+        return upload_session
+
+    async def _fail_session(self, upload_session: UploadSession, completed: bool, blob):
+        """Неудавшаяся сборка: повторить её нельзя, загруженные данные удаляются"""
+        try:
+            self.session_repo.update_status(str(upload_session.id), UploadSessionStatus.FAILED)
+            if blob:
+                # Объект уже перенесён в blob — снимается взятая на него ссылка
+                await self.blob_service.release(blob.hash)
+            elif completed:
+                await self.storage.delete_file(upload_session.stored_name)
+            else:
+                await self.storage.abort_multipart_upload(upload_session.stored_name, upload_session.upload_id)
+        except Exception as e:
+            # Остатки удалит очистка просроченных загрузок
+            print(f"Warning: Could not clean up failed upload session {upload_session.id}: {e}")
+
+    async def abort_session(self, session_id: str, user_id: str) -> dict:
+        """Отмена сессии и удаление уже загруженных частей"""
+        upload_session = self._get_active_session(session_id, user_id)
+
+        await self.storage.abort_multipart_upload(upload_session.stored_name, upload_session.upload_id)
+        self.session_repo.update_status(session_id, UploadSessionStatus.ABORTED)
+
+        return {"message": "Upload session aborted"}
+
+    def _get_session(self, session_id: str, user_id: str) -> UploadSession:
+        upload_session = self.session_repo.get_by_id(session_id)
+        if not upload_session or str(upload_session.owner_id) != user_id:
+            raise ValueError("Upload session not found or access denied")
+        return upload_session
+
+    def _get_active_session(self, session_id: str, user_id: str) -> UploadSession:
+        upload_session = self.session_repo.get_by_id(session_id)
+        self._check_active(upload_session, user_id)
+        return upload_session
+
+    @staticmethod
+    def _check_active(upload_session: Optional[UploadSession], user_id: str):
+        if not upload_session or str(upload_session.owner_id) != user_id:
+            raise ValueError("Upload session not found or access denied")
+        if upload_session.status != UploadSessionStatus.ACTIVE:
+            raise ValueError(f"Upload session is {upload_session.status}")
+        if upload_session.expires_at < datetime.utcnow():
+            raise ValueError("Upload session expired")
+
+    @staticmethod
+    def _expected_chunk_size(upload_session: UploadSession, index: int) -> int:
+        if index == upload_session.total_chunks - 1:
+            return upload_session.total_size - upload_session.chunk_size * index
+        return upload_session.chunk_size
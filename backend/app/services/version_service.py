@@ -0,0 +1,69 @@
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+from app.repositories.file_version_repository import FileVersionRepository
+from app.services.blob_service import BlobService
+from app.services.storage_service import StorageService
+from app.config import get_settings
+import asyncio
+
+settings = get_settings()
+
+
+class VersionPruner:
+    """
+    Удаление прежних версий файлов по правилам хранения.
+
+    Версии сверх FILE_VERSIONS_MAX последних на файл и заменённые раньше
+    FILE_VERSION_RETENTION_DAYS удаляются пачками: строки и ссылки на blob
+    снимаются в одной транзакции, а содержимое удаляется, только когда
+    на него не ссылается больше ни одна версия и ни один файл.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageService] = None):
+        self.db = db
+        self.version_repo = FileVersionRepository(db)
+        self.storage = storage or StorageService()
+        self.blob_service = BlobService(db, self.storage)
+
+    @staticmethod
+    def cutoff() -> Optional[datetime]:
+        if not settings.FILE_VERSION_RETENTION_DAYS:
+            return None
+        return datetime.utcnow() - timedelta(days=settings.FILE_VERSION_RETENTION_DAYS)
+
+    async def prune(self, file_id: Optional[str] = None) -> dict:
+        """Удалить лишние версии одного файла или всех файлов; возвращает счётчики"""
+        cutoff = self.cutoff()
+        batch_size = settings.VERSION_PRUNE_BATCH_SIZE
+        report = Counter()
+        while True:
+            rows = self.version_repo.delete_expired(settings.FILE_VERSIONS_MAX, cutoff, file_id, batch_size)
+            if not rows:
+                break
+            blob_refs = Counter(blob_hash for _, blob_hash in rows if blob_hash)
+            try:
+                # Снятие ссылок коммитит транзакцию вместе с удалением строк
+                await self.blob_service.release_many(blob_refs)
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+            # Собственные объекты версий, загруженных до дедупликации
+            await self.storage.delete_files_later([
+                stored_name for stored_name, blob_hash in rows
+                if not blob_hash and not BlobService.is_blob_key(stored_name)
+            ])
+
+            report["versions"] += len(rows)
+            report["blob_references"] += sum(blob_refs.values())
+            if len(rows) < batch_size:
+                break
+            # Полная очистка идёт фоном и не должна мешать запросам
+            await asyncio.sleep(settings.VERSION_PRUNE_BATCH_DELAY)
+
+        return {
+            "versions_deleted": report["versions"],
+            "blob_references": report["blob_references"],
+        }
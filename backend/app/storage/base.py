@@ -0,0 +1,170 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import asyncio
+from typing import AsyncIterator, Iterator, Optional, Protocol
+from app.config import get_settings
+from app.utils.concurrency import close_after, run_blocking
+
+settings = get_settings()
+
+# Отдельный пул для блокирующего ввода-вывода хранилища: event loop не ждёт
+# сеть и диск, а размер пула ограничивает число одновременных операций
+storage_executor = ThreadPoolExecutor(
+    max_workers=settings.STORAGE_IO_WORKERS,
+    thread_name_prefix="storage-io",
+)
+
+
+class StorageError(Exception):
+    """Ошибка хранилища, не зависящая от конкретного бэкенда"""
+
+
+class ObjectReader(Protocol):
+    """Блокирующее чтение одного объекта (вызывать в пуле потоков)"""
+
+    def read(self, size: int) -> bytes: ...
+
+    def close(self): ...
+
+
+class ObjectWriter(Protocol):
+    """Потоковая запись одного объекта"""
+
+    size: int
+
+    async def write(self, data: bytes): ...
+
+    async def complete(self): ...
+
+    async def abort(self): ...
+
+
+class StorageBackend(ABC):
+    """
+    Бэкенд объектного хранилища.
+
+    Ключи — внутренние имена объектов (user_id/uuid, blobs/<sha256>);
+    ошибки бэкенда пробрасываются как StorageError.
+    """
+
+    def ensure_ready(self):
+        """Подготовить хранилище к работе (bucket, каталоги)"""
+
+    def close(self):
+        """Освободить ресурсы бэкенда (пулы соединений)"""
+
+    def cache_stats(self) -> dict:
+        """Счётчики кэшей чтения (пусто, если бэкенд не кэширует)"""
+        return {}
+
+    @abstractmethod
+    def open_writer(self, key: str) -> ObjectWriter:
+        """Писатель для потоковой записи объекта"""
+
+    @abstractmethod
+    async def create_multipart_upload(self, key: str) -> str:
+        """Начать составную загрузку, возвращает upload_id"""
+
+    @abstractmethod
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Записать часть составной загрузки, возвращает ETag"""
+
+    @abstractmethod
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        """Собрать объект из частей (номер части, ETag)"""
+
+    @abstractmethod
+    async def abort_multipart_upload(self, key: str, upload_id: str):
+        """Отменить составную загрузку"""
+
+    @abstractmethod
+    def open_reader(self, key: str, offset: int = 0, length: Optional[int] = None) -> ObjectReader:
+        """Открыть объект (или его диапазон) на чтение; блокирующий вызов"""
+
+    @abstractmethod
+    async def copy(self, source_key: str, target_key: str):
+        """Копирование объекта внутри хранилища"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Удаление объекта; отсутствие объекта ошибкой не считается"""
+
+    async def delete_many(self, keys: list[str]) -> list[str]:
+        """
+        Удаление нескольких объектов; возвращает ключи, которые удалить не удалось.
+
+        Ошибка по отдельному объекту не прерывает удаление остальных.
+        """
+        failed = []
+        for key in keys:
+            try:
+                await self.delete(key)
+            except StorageError:
+                failed.append(key)
+        return failed
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[int]:
+        """Размер объекта в байтах или None, если объекта нет"""
+
+    @abstractmethod
+    def object_uri(self, key: str) -> str:
+        """Адрес объекта для поля s3_path"""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Путь к объекту на локальном диске, если бэкенд его даёт"""
+        return None
+
+    def presigned_get_url(self, key: str, expires: timedelta, filename: Optional[str] = None) -> Optional[str]:
+        """Временная ссылка на скачивание напрямую из хранилища (None — не поддерживается)"""
+        return None
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> Optional[str]:
+        """Временная ссылка на загрузку объекта напрямую в хранилище (None — не поддерживается)"""
+        return None
+
+    def iter_object(self, key: str, chunk_size: int) -> Iterator[bytes]:
+        """Блокирующее чтение объекта кусками (вызывать в пуле потоков)"""
+        reader = self.open_reader(key)
+        try:
+            while chunk := reader.read(chunk_size):
+                yield chunk
+        finally:
+            reader.close()
+
+    async def read(self, key: str) -> bytes:
+        """Прочитать объект целиком"""
+        return await self._run(lambda: b"".join(self.iter_object(key, settings.UPLOAD_CHUNK_SIZE)))
+
+    async def stream(
+        self,
+        key: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = settings.DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Потоковое чтение объекта.
+
+        Следующий кусок читается только после того, как потребитель забрал
+        предыдущий, поэтому в памяти не больше одного куска, а медленный
+        клиент притормаживает чтение из хранилища.
+        """
+        reader = await self._run(self.open_reader, key, offset, length)
+        pending = None
+        try:
+            while True:
+                pending = storage_executor.submit(reader.read, chunk_size)
+                chunk = await asyncio.wrap_future(pending)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            # При обрыве соединения чтение может ещё идти в пуле —
+            # закрываем объект (и отдаём соединение в пул) после него
+            close_after(storage_executor, reader.close, pending)
+
+    @staticmethod
+    async def _run(func, *args, **kwargs):
+        return await run_blocking(storage_executor, func, *args, **kwargs)
@@ -0,0 +1,230 @@
+from datetime import timedelta
+from typing import AsyncIterator, Optional
+import asyncio
+import io
+import os
+from app.config import get_settings
+from app.storage.base import ObjectReader, ObjectWriter, StorageBackend
+from app.storage.disk_cache import DiskCache
+from app.storage.local_backend import LocalObjectReader
+from app.storage.memory_cache import MemoryCache
+
+settings = get_settings()
+
+
+class CachedBackend(StorageBackend):
+    """
+    Обёртка над удалённым хранилищем с read-through кэшами.
+
+    Небольшие объекты держатся в памяти процесса (memory_cache), горячие
+    объекты — на локальном диске (disk_cache); любой из уровней может быть
+    выключен. Полное скачивание объекта, которого нет в кэше, отдаётся
+    клиенту из исходного хранилища и одновременно записывается в кэши;
+    следующие скачивания идут из памяти или с диска (через local_path —
+    sendfile). Одновременные промахи по одному ключу не читают исходное
+    хранилище каждый сам: они ждут заполнение, начатое первым, и отдают
+    уже опубликованный файл. Запись и служебные операции передаются
+    исходному бэкенду без изменений.
+    """
+
+    def __init__(
+        self,
+        origin: StorageBackend,
+        disk_cache: Optional[DiskCache] = None,
+        memory_cache: Optional[MemoryCache] = None
+    ):
+        self.origin = origin
+        self.disk_cache = disk_cache
+        self.memory_cache = memory_cache
+        # Заполнения диска, идущие в этом процессе: их ждут промахи по тому же ключу
+        self._fills: dict[str, asyncio.Future] = {}
+
+    def ensure_ready(self):
+        self.origin.ensure_ready()
+        if self.disk_cache:
+            self.disk_cache.load()
+
+    def close(self):
+        self.origin.close()
+
+    def cache_stats(self) -> dict:
+        stats = self.origin.cache_stats()
+        if self.memory_cache:
+            stats["memory"] = self.memory_cache.stats()
+        if self.disk_cache:
+            stats["disk"] = self.disk_cache.stats()
+        return stats
+
+    def open_writer(self, key: str) -> ObjectWriter:
+        return self.origin.open_writer(key)
+
+    async def create_multipart_upload(self, key: str) -> str:
+        return await self.origin.create_multipart_upload(key)
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return await self.origin.upload_part(key, upload_id, part_number, data)
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        await self.origin.complete_multipart_upload(key, upload_id, parts)
+
+    async def abort_multipart_upload(self, key: str, upload_id: str):
+        await self.origin.abort_multipart_upload(key, upload_id)
+
+    def open_reader(self, key: str, offset: int = 0, length: Optional[int] = None) -> ObjectReader:
+        if self.memory_cache:
+            data = self.memory_cache.get(key)
+            if data is not None:
+                end = None if length is None else offset + length
+                return io.BytesIO(data[offset:end])
+        if self.disk_cache:
+            path = self.disk_cache.lookup(key)
+            if path:
+                try:
+                    return LocalObjectReader(os.open(path, os.O_RDONLY), offset, length)
+                except FileNotFoundError:
+                    # Вытеснен между проверкой и открытием
+                    pass
+            self.disk_cache.record_miss()
+        return self.origin.open_reader(key, offset, length)
+
+    async def copy(self, source_key: str, target_key: str):
+        await self.origin.copy(source_key, target_key)
+
+    async def delete(self, key: str):
+        self._invalidate(key)
+        await self.origin.delete(key)
+
+    async def delete_many(self, keys: list[str]) -> list[str]:
+        for key in keys:
+            self._invalidate(key)
+        return await self.origin.delete_many(keys)
+
+    async def stat(self, key: str) -> Optional[int]:
+        return await self.origin.stat(key)
+
+    def object_uri(self, key: str) -> str:
+        return self.origin.object_uri(key)
+
+    def local_path(self, key: str) -> Optional[str]:
+        origin_path = self.origin.local_path(key)
+        if origin_path or not self.disk_cache:
+            return origin_path
+        # Объекты из памяти отдаются через stream(), без обращения к диску
+        if self.memory_cache and self.memory_cache.contains(key):
+            return None
+        return self.disk_cache.lookup(key)
+
+    def presigned_get_url(self, key: str, expires: timedelta, filename: Optional[str] = None) -> Optional[str]:
+        return self.origin.presigned_get_url(key, expires, filename)
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> Optional[str]:
+        return self.origin.presigned_put_url(key, expires)
+
+    async def read(self, key: str) -> bytes:
+        if self.memory_cache:
+            data = self.memory_cache.get(key)
+            if data is not None:
+                return data
+            self.memory_cache.record_miss()
+            generation = self.memory_cache.begin_fill()
+        data = await super().read(key)
+        if self.memory_cache:
+            self.memory_cache.put(key, data, generation)
+        return data
+
+    async def stream(
+        self,
+        key: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = settings.DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        if self.memory_cache:
+            data = self.memory_cache.get(key)
+            if data is not None:
+                # Попадание обслуживается без перехода в пул потоков
+                end = len(data) if length is None else min(offset + length, len(data))
+                for position in range(offset, end, chunk_size):
+                    yield data[position:min(position + chunk_size, end)]
+                return
+
+        # Кэши заполняются только полным чтением; ключ, который уже на диске,
+        # читается обычным путём, а заполняемый другим запросом — после него
+        full_read = offset == 0 and length is None
+        fill = None
+        if full_read and self.disk_cache:
+            if key in self._fills:
+                await self._wait_for_fill(key)
+            else:
+                # Заполнение отмечается до перехода в пул: одновременные
+                # промахи по этому ключу увидят его и будут ждать
+                self._fills[key] = asyncio.get_running_loop().create_future()
+                try:
+                    fill = await self._run(self.disk_cache.begin_fill, key)
+                finally:
+                    if fill is None:
+                        self._finish_fill(key)
+        buffered, buffered_size, generation = None, 0, None
+        if full_read and self.memory_cache:
+            self.memory_cache.record_miss()
+            buffered, generation = [], self.memory_cache.begin_fill()
+
+        if fill is not None:
+            self.disk_cache.record_miss()
+            source = self.origin.stream(key, chunk_size=chunk_size)
+        else:
+            source = super().stream(key, offset, length, chunk_size)
+
+        published = False
+        try:
+            async for chunk in source:
+                if fill is not None:
+                    await self._run(fill.write, chunk)
+                    if fill.size > self.disk_cache.max_object_size:
+                        fill.abort()
+                        fill = None
+                        # Ждущие промахи идут в исходное хранилище, не дожидаясь конца
+                        self._finish_fill(key)
+                if buffered is not None:
+                    buffered_size += len(chunk)
+                    if buffered_size > self.memory_cache.max_object_size:
+                        buffered = None
+                    else:
+                        buffered.append(chunk)
+                yield chunk
+            if fill is not None:
+                await self._run(fill.commit)
+                published = True
+        except BaseException:
+            # Обрыв или ошибка: недописанный файл в кэш не попадает
+            if fill is not None and not published:
+                fill.abort()
+            raise
+        finally:
+            if fill is not None:
+                self._finish_fill(key)
+        if buffered is not None:
+            self.memory_cache.put(key, b"".join(buffered), generation)
+
+    async def _wait_for_fill(self, key: str):
+        """Дождаться заполнения ключа другим запросом (не дольше DISK_CACHE_FILL_WAIT_SECONDS)"""
+        pending = self._fills.get(key)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            return
+        try:
+            # Отмена ждущего запроса не должна отменять чужое заполнение
+            await asyncio.wait_for(asyncio.shield(pending), settings.DISK_CACHE_FILL_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    def _finish_fill(self, key: str):
+        # Опубликован файл или нет, ждущие читают обычным путём: с диска или из хранилища
+        pending = self._fills.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(None)
+
+    def _invalidate(self, key: str):
+        if self.memory_cache:
+            self.memory_cache.invalidate(key)
+        if self.disk_cache:
+            self.disk_cache.invalidate(key)
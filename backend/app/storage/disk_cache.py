@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import os
+import threading
+import uuid
+
+
+class DiskCacheFill:
+    """Заполнение одной записи кэша: пишется во временный файл, публикуется атомарно"""
+
+    def __init__(self, cache: "DiskCache", key: str):
+        self.cache = cache
+        self.key = key
+        self.size = 0
+        self.temp_path = os.path.join(cache.temp_dir, uuid.uuid4().hex)
+        self.fd = os.open(self.temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self.fd, view, self.size)
+            self.size += written
+            view = view[written:]
+
+    def commit(self):
+        os.close(self.fd)
+        self.cache._publish(self)
+
+    def abort(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+        self.cache._discard(self)
+
+
+class DiskCache:
+    """
+    Кэш объектов на локальном диске с вытеснением LRU по суммарному объёму.
+
+    Файлы называются по SHA-256 ключа; запись появляется в кэше только
+    целиком (os.replace из временного файла). Одновременно один ключ
+    заполняет только один поток (single-flight). Индекс ведётся в памяти
+    процесса и восстанавливается сканированием каталога при старте.
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_object_size: int):
+        self.root = os.path.abspath(root)
+        self.temp_dir = os.path.join(self.root, ".tmp")
+        self.max_bytes = max_bytes
+        self.max_object_size = min(max_object_size, max_bytes)
+
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._filling: set[str] = set()
+        # Удалены во время заполнения — публиковать нельзя
+        self._cancelled: set[str] = set()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.evictions = 0
+
+    def load(self):
+        """Подготовка каталога и восстановление индекса по уже лежащим файлам"""
+        os.makedirs(self.temp_dir, exist_ok=True)
+        for name in os.listdir(self.temp_dir):
+            os.unlink(os.path.join(self.temp_dir, name))
+
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != ".tmp"]
+            for name in filenames:
+                stat = os.stat(os.path.join(dirpath, name))
+                found.append((stat.st_atime, name, stat.st_size))
+
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            for _, name, size in sorted(found):
+                self._entries[name] = size
+                self.current_bytes += size
+            evicted = self._evict_locked()
+        for victim in evicted:
+            self._unlink(victim)
+
+    def path_for(self, key: str) -> str:
+        name = self._name(key)
+        return os.path.join(self.root, name[:2], name)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Путь к закэшированному объекту (считается попаданием) или None"""
+        name = self._name(key)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+        return self.path_for(key)
+
+    def record_miss(self):
+        """Учесть чтение, ушедшее мимо кэша в исходное хранилище"""
+        with self._lock:
+            self.misses += 1
+
+    def begin_fill(self, key: str, size: Optional[int] = None) -> Optional[DiskCacheFill]:
+        """
+        Начать заполнение записи. None — объект слишком большой, уже
+        в кэше или его прямо сейчас заполняет другой запрос.
+        """
+        if size is not None and size > self.max_object_size:
+            return None
+        name = self._name(key)
+        with self._lock:
+            if name in self._entries or name in self._filling:
+                return None
+            self._filling.add(name)
+        try:
+            return DiskCacheFill(self, key)
+        except OSError:
+            with self._lock:
+                self._filling.discard(name)
+            return None
+
+    def invalidate(self, key: str):
+        """Удалить запись (объект удалён из хранилища)"""
+        name = self._name(key)
+        with self._lock:
+            if name in self._filling:
+                self._cancelled.add(name)
+            size = self._entries.pop(name, None)
+            if size is None:
+                return
+            self.current_bytes -= size
+        self._unlink(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "fills": self.fills,
+                "evictions": self.evictions,
+            }
+
+    def _publish(self, fill: DiskCacheFill):
+        name = self._name(fill.key)
+        try:
+            if fill.size > self.max_object_size:
+                os.unlink(fill.temp_path)
+                return
+            target = self.path_for(fill.key)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(fill.temp_path, target)
+            with self._lock:
+                stale = name in self._cancelled
+                if not stale:
+                    self._entries[name] = fill.size
+                    self.current_bytes += fill.size
+                    self.fills += 1
+                evicted = [] if stale else self._evict_locked(keep=name)
+            if stale:
+                evicted = [name]
+            for victim in evicted:
+                self._unlink(victim)
+        finally:
+            with self._lock:
+                self._filling.discard(name)
+                self._cancelled.discard(name)
+
+    def _discard(self, fill: DiskCacheFill):
+        try:
+            os.unlink(fill.temp_path)
+        except FileNotFoundError:
+            pass
+        name = self._name(fill.key)
+        with self._lock:
+            self._filling.discard(name)
+            self._cancelled.discard(name)
+
+    def _evict_locked(self, keep: Optional[str] = None) -> list[str]:
+        evicted = []
+        while self.current_bytes > self.max_bytes and self._entries:
+            name, size = next(iter(self._entries.items()))
+            if name == keep and len(self._entries) == 1:
+                break
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            del self._entries[name]
+            self.current_bytes -= size
+            self.evictions += 1
+            evicted.append(name)
+        return evicted
+
+    def _unlink(self, name: str):
+        try:
+            os.unlink(os.path.join(self.root, name[:2], name))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
@@ -0,0 +1,44 @@
+from functools import lru_cache
+from app.config import get_settings
+from app.storage.base import StorageBackend
+
+settings = get_settings()
+
+
+def create_storage_backend() -> StorageBackend:
+    """Бэкенд хранилища по настройке STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        from app.storage.local_backend import LocalBackend
+        return LocalBackend()
+    if settings.STORAGE_BACKEND != "minio":
+        raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+    from app.storage.minio_backend import MinioBackend
+    backend = MinioBackend()
+
+    # Кэши чтения перед удалённым хранилищем: мелкие объекты — в памяти,
+    # горячие — на локальном диске
+    disk_cache = memory_cache = None
+    if settings.DISK_CACHE_PATH:
+        from app.storage.disk_cache import DiskCache
+        disk_cache = DiskCache(
+            settings.DISK_CACHE_PATH,
+            settings.DISK_CACHE_MAX_BYTES,
+            settings.DISK_CACHE_MAX_OBJECT_SIZE
+        )
+    if settings.MEMORY_CACHE_MAX_BYTES > 0:
+        from app.storage.memory_cache import MemoryCache
+        memory_cache = MemoryCache(
+            settings.MEMORY_CACHE_MAX_BYTES,
+            settings.MEMORY_CACHE_MAX_OBJECT_SIZE
+        )
+    if disk_cache or memory_cache:
+        from app.storage.cached_backend import CachedBackend
+        backend = CachedBackend(backend, disk_cache, memory_cache)
+    return backend
+
+
+@lru_cache
+def get_storage_backend() -> StorageBackend:
+    """Общий для процесса бэкенд; готовится и закрывается в lifespan приложения"""
+    return create_storage_backend()
@@ -0,0 +1,261 @@
+from typing import Optional
+from app.config import get_settings
+from app.storage.base import StorageBackend, StorageError
+import hashlib
+import os
+import shutil
+import uuid
+
+settings = get_settings()
+
+
+def _fsync_dir(path: str):
+    """fsync каталога, чтобы переименование пережило сбой питания"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_fd(source_fd: int, target_fd: int, offset: int, count: int):
+    """Копирование между файлами в ядре, без прохода данных через Python"""
+    copied = 0
+    while copied < count:
+        sent = os.sendfile(target_fd, source_fd, offset + copied, count - copied)
+        if sent == 0:
+            break
+        copied += sent
+    if copied != count:
+        raise OSError(f"Short copy: {copied} of {count} bytes")
+
+
+class LocalFileWriter:
+    """
+    Запись объекта во временный файл через os.pwrite.
+
+    fsync выполняется не на каждую запись, а пачками по LOCAL_FSYNC_BYTES
+    и в complete(); готовый файл атомарно переименовывается в итоговый путь.
+    """
+
+    def __init__(self, backend: "LocalBackend", key: str):
+        self.backend = backend
+        self.key = key
+        self.size = 0
+        self._unsynced = 0
+        self._tmp_path = backend.tmp_path()
+        self._fd: Optional[int] = None
+
+    async def write(self, data: bytes):
+        try:
+            await self.backend._run(self._write, data)
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def complete(self):
+        try:
+            await self.backend._run(self._complete)
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def abort(self):
+        await self.backend._run(self._abort)
+
+    def _write(self, data: bytes):
+        if self._fd is None:
+            self._fd = os.open(self._tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self._fd, view, self.size)
+            self.size += written
+            view = view[written:]
+        self._unsynced += len(data)
+        if self._unsynced >= settings.LOCAL_FSYNC_BYTES:
+            os.fsync(self._fd)
+            self._unsynced = 0
+
+    def _complete(self):
+        if self._fd is None:
+            self._fd = os.open(self._tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self.backend.commit_file(self._tmp_path, self.key)
+
+    def _abort(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class LocalObjectReader:
+    """Чтение файла через os.pread с заданного смещения"""
+
+    def __init__(self, fd: int, offset: int = 0, length: Optional[int] = None):
+        self.fd = fd
+        self.position = offset
+        self.remaining = length
+
+    def read(self, size: int) -> bytes:
+        if self.remaining is not None:
+            size = min(size, self.remaining)
+            if size <= 0:
+                return b""
+        chunk = os.pread(self.fd, size, self.position)
+        self.position += len(chunk)
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LocalBackend(StorageBackend):
+    """
+    Хранилище на локальном диске — для однонодовых edge-инсталляций,
+    тестов и бенчмарков без объектного хранилища.
+
+    Объект лежит в файле root/<key>; все записи идут через временный файл
+    в root/.tmp и атомарный rename. Скачивания могут отдаваться
+    напрямую с диска (см. local_path).
+    """
+
+    def __init__(self, root: str = settings.LOCAL_STORAGE_PATH):
+        self.root = os.path.abspath(root)
+        self._tmp_dir = os.path.join(self.root, ".tmp")
+        self._multipart_dir = os.path.join(self.root, ".multipart")
+
+    def ensure_ready(self):
+        """Создание каталогов хранилища"""
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        os.makedirs(self._multipart_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError(f"Invalid object key: {key}")
+        return path
+
+    def tmp_path(self) -> str:
+        return os.path.join(self._tmp_dir, str(uuid.uuid4()))
+
+    def commit_file(self, tmp_path: str, key: str):
+        """Атомарно поставить готовый временный файл на место объекта"""
+        target = self.path_for(key)
+        target_dir = os.path.dirname(target)
+        os.makedirs(target_dir, exist_ok=True)
+        os.replace(tmp_path, target)
+        _fsync_dir(target_dir)
+
+    def open_writer(self, key: str) -> LocalFileWriter:
+        return LocalFileWriter(self, key)
+
+    async def create_multipart_upload(self, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        try:
+            await self._run(os.makedirs, self._upload_dir(upload_id))
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}")
+        return upload_id
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        try:
+            return await self._run(self._write_part, upload_id, part_number, data)
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        try:
+            await self._run(self._assemble_parts, key, upload_id, sorted(parts))
+        except OSError as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str):
+        await self._run(shutil.rmtree, self._upload_dir(upload_id), True)
+
+    def open_reader(self, key: str, offset: int = 0, length: Optional[int] = None) -> "LocalObjectReader":
+        try:
+            fd = os.open(self.path_for(key), os.O_RDONLY)
+        except OSError as e:
+            raise StorageError(f"Download failed: {e}")
+        return LocalObjectReader(fd, offset, length)
+
+    async def copy(self, source_key: str, target_key: str):
+        try:
+            await self._run(self._copy, source_key, target_key)
+        except OSError as e:
+            raise StorageError(f"Copy failed: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self._run(self._delete, key)
+        except OSError as e:
+            raise StorageError(f"Delete failed: {e}")
+
+    async def stat(self, key: str) -> Optional[int]:
+        try:
+            return (await self._run(os.stat, self.path_for(key))).st_size
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise StorageError(f"Stat failed: {e}")
+
+    def object_uri(self, key: str) -> str:
+        return f"file://{self.path_for(key)}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self.path_for(key)
+
+    def _upload_dir(self, upload_id: str) -> str:
+        if not upload_id.isalnum():
+            raise StorageError(f"Invalid upload id: {upload_id}")
+        return os.path.join(self._multipart_dir, upload_id)
+
+    def _write_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        upload_dir = self._upload_dir(upload_id)
+        if not os.path.isdir(upload_dir):
+            raise OSError(f"No such upload: {upload_id}")
+        tmp_path = os.path.join(upload_dir, f"{part_number}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(upload_dir, str(part_number)))
+        return hashlib.md5(data).hexdigest()
+
+    def _assemble_parts(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        upload_dir = self._upload_dir(upload_id)
+        tmp_path = self.tmp_path()
+        target_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            for part_number, _ in parts:
+                with open(os.path.join(upload_dir, str(part_number)), "rb") as part:
+                    _copy_fd(part.fileno(), target_fd, 0, os.fstat(part.fileno()).st_size)
+            os.fsync(target_fd)
+        except BaseException:
+            os.close(target_fd)
+            os.unlink(tmp_path)
+            raise
+        os.close(target_fd)
+        self.commit_file(tmp_path, key)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def _copy(self, source_key: str, target_key: str):
+        # Объекты неизменяемы, поэтому копия — это жёсткая ссылка на тот же inode
+        tmp_path = self.tmp_path()
+        try:
+            os.link(self.path_for(source_key), tmp_path)
+        except OSError:
+            shutil.copyfile(self.path_for(source_key), tmp_path)
+        self.commit_file(tmp_path, target_key)
+
+    def _delete(self, key: str):
+        try:
+            os.unlink(self.path_for(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from typing import Optional
+import threading
+
+
+class MemoryCache:
+    """
+    Кэш небольших объектов в памяти процесса: LRU с общим бюджетом в байтах.
+
+    Объекты крупнее max_object_size не кэшируются. Заполнение помечается
+    поколением (begin_fill): если во время чтения из хранилища что-то
+    было удалено, результат не сохраняется, чтобы не вернуть удалённое.
+    """
+
+    def __init__(self, max_bytes: int, max_object_size: int):
+        self.max_bytes = max_bytes
+        self.max_object_size = min(max_object_size, max_bytes)
+
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Содержимое объекта (считается попаданием) или None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def record_miss(self):
+        """Учесть полное чтение объекта, которого не было в памяти"""
+        with self._lock:
+            self.misses += 1
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def begin_fill(self) -> int:
+        """Поколение кэша на момент начала чтения объекта"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: str, data: bytes, generation: Optional[int] = None):
+        """Сохранить объект, если он достаточно мал и с начала чтения ничего не удалялось"""
+        if len(data) > self.max_object_size:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, victim = self._entries.popitem(last=False)
+                self.current_bytes -= len(victim)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        """Удалить объект из кэша"""
+        with self._lock:
+            self._generation += 1
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self.current_bytes -= len(data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "max_object_size": self.max_object_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,198 @@
+from minio import Minio
+from minio.commonconfig import CopySource
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+from datetime import timedelta
+from typing import Optional
+from urllib3.response import BaseHTTPResponse
+from urllib3.connection import HTTPConnection
+import socket
+import urllib3
+from app.config import get_settings
+from app.storage.base import StorageBackend, StorageError
+from app.storage.multipart_writer import MultipartWriter
+from app.utils.http_cache import content_disposition
+
+settings = get_settings()
+
+
+def _create_http_client() -> urllib3.PoolManager:
+    """Пул HTTP-соединений к MinIO, общий для всего процесса"""
+    socket_options = list(HTTPConnection.default_socket_options)
+    if settings.MINIO_TCP_KEEPALIVE:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(
+            connect=settings.MINIO_CONNECT_TIMEOUT,
+            read=settings.MINIO_READ_TIMEOUT
+        ),
+        maxsize=settings.MINIO_POOL_SIZE,
+        # Лишние запросы ждут свободное соединение, а не открывают новые
+        block=True,
+        socket_options=socket_options,
+        retries=urllib3.Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+
+
+class MinioObjectReader:
+    """Чтение тела ответа get_object без буферизации всего объекта"""
+
+    def __init__(self, response: BaseHTTPResponse):
+        self.response = response
+
+    def read(self, size: int) -> bytes:
+        return self.response.read(size)
+
+    def close(self):
+        self.response.close()
+        self.response.release_conn()
+
+
+class MinioBackend(StorageBackend):
+    def __init__(self):
+        self._http = _create_http_client()
+        self.client = Minio(
+            settings.MINIO_URL.replace("http://", "").replace("https://", ""),
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=False,
+            http_client=self._http
+        )
+        # Подписанные ссылки выдаются на адрес, доступный клиентам; регион
+        # задан явно, чтобы подпись считалась локально, без запроса к MinIO
+        public_url = settings.MINIO_PUBLIC_URL or settings.MINIO_URL
+        self.presign_client = Minio(
+            public_url.replace("http://", "").replace("https://", ""),
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=public_url.startswith("https://"),
+            region=settings.MINIO_REGION,
+            http_client=self._http
+        )
+        self.bucket_name = settings.MINIO_BUCKET_NAME
+
+    def close(self):
+        """Закрыть соединения пула"""
+        self._http.clear()
+
+    def ensure_ready(self):
+        """Создание bucket если его нет"""
+        try:
+            if not self.client.bucket_exists(self.bucket_name):
+                self.client.make_bucket(self.bucket_name)
+                print(f"✓ Bucket '{self.bucket_name}' created")
+        except S3Error as e:
+            print(f"Warning: Could not ensure bucket exists: {e}")
+
+    def open_writer(self, key: str) -> MultipartWriter:
+        return MultipartWriter(self.client, self.bucket_name, key)
+
+    async def create_multipart_upload(self, key: str) -> str:
+        try:
+            return await self._run(
+                self.client._create_multipart_upload,
+                self.bucket_name,
+                key,
+                {"Content-Type": "application/octet-stream"}
+            )
+        except S3Error as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        try:
+            return await self._run(
+                self.client._upload_part,
+                self.bucket_name, key, data, None, upload_id, part_number
+            )
+        except S3Error as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        try:
+            await self._run(
+                self.client._complete_multipart_upload,
+                self.bucket_name,
+                key,
+                upload_id,
+                [Part(part_number, etag) for part_number, etag in sorted(parts)]
+            )
+        except S3Error as e:
+            raise StorageError(f"Upload failed: {e}")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str):
+        try:
+            await self._run(self.client._abort_multipart_upload, self.bucket_name, key, upload_id)
+        except S3Error as e:
+            raise StorageError(f"Abort failed: {e}")
+
+    def open_reader(self, key: str, offset: int = 0, length: Optional[int] = None) -> "MinioObjectReader":
+        try:
+            response = self.client.get_object(self.bucket_name, key, offset=offset, length=length or 0)
+        except S3Error as e:
+            raise StorageError(f"Download failed: {e}")
+        return MinioObjectReader(response)
+
+    async def copy(self, source_key: str, target_key: str):
+        try:
+            await self._run(
+                self.client.copy_object,
+                self.bucket_name,
+                target_key,
+                CopySource(self.bucket_name, source_key)
+            )
+        except S3Error as e:
+            raise StorageError(f"Copy failed: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self._run(self.client.remove_object, self.bucket_name, key)
+        except S3Error as e:
+            raise StorageError(f"Delete failed: {e}")
+
+    async def delete_many(self, keys: list[str]) -> list[str]:
+        # DeleteObjects принимает до 1000 ключей за запрос
+        page_size = max(1, min(settings.STORAGE_DELETE_BATCH_SIZE, 1000))
+        failed = []
+        for start in range(0, len(keys), page_size):
+            page = keys[start:start + page_size]
+            try:
+                errors = await self._run(self._remove_objects, page)
+            except S3Error:
+                failed.extend(page)
+                continue
+            failed.extend(error.name for error in errors)
+        return failed
+
+    def _remove_objects(self, keys: list[str]) -> list:
+        # remove_objects ленивый: запрос уходит только при чтении результата
+        return list(self.client.remove_objects(self.bucket_name, [DeleteObject(key) for key in keys]))
+
+    async def stat(self, key: str) -> Optional[int]:
+        try:
+            return (await self._run(self.client.stat_object, self.bucket_name, key)).size
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise StorageError(f"Stat failed: {e}")
+
+    def object_uri(self, key: str) -> str:
+        return f"s3://{self.bucket_name}/{key}"
+
+    def presigned_get_url(self, key: str, expires: timedelta, filename: Optional[str] = None) -> Optional[str]:
+        response_headers = None
+        if filename:
+            response_headers = {
+                "response-content-disposition": content_disposition(filename)
+            }
+        return self.presign_client.presigned_get_object(
+            self.bucket_name, key, expires=expires, response_headers=response_headers
+        )
+
+    def presigned_put_url(self, key: str, expires: timedelta) -> Optional[str]:
+        return self.presign_client.presigned_put_object(self.bucket_name, key, expires=expires)
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from minio import Minio
+from minio.datatypes import Part
+from minio.error import S3Error
+from app.config import get_settings
+from app.storage.base import StorageError
+from app.utils.concurrency import run_blocking
+import asyncio
+import io
+
+settings = get_settings()
+
+# Общий ограниченный пул: суммарное число одновременных PUT частей на процесс
+_executor = ThreadPoolExecutor(
+    max_workers=settings.MULTIPART_MAX_WORKERS,
+    thread_name_prefix="multipart-upload",
+)
+
+
+class MultipartWriter:
+    """
+    Запись объекта в MinIO частями, которые загружаются параллельно.
+
+    Данные копятся в буфере до part_size и уходят в пул потоков; одновременно
+    в полёте не больше parallelism частей, поэтому память на одну загрузку
+    ограничена примерно part_size * (parallelism + 1).
+    Если до complete() не набралось ни одной полной части, объект
+    загружается одним put_object без multipart.
+    """
+
+    def __init__(
+        self,
+        client: Minio,
+        bucket_name: str,
+        object_name: str,
+        part_size: int = settings.MULTIPART_PART_SIZE,
+        parallelism: int = settings.MULTIPART_PARALLELISM,
+        content_type: str = "application/octet-stream"
+    ):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.part_size = part_size
+        self.parallelism = max(1, parallelism)
+        self.content_type = content_type
+
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: str | None = None
+        self._next_part_number = 1
+        self._parts: list[tuple[int, str]] = []
+        self._pending: set[asyncio.Task] = set()
+
+    async def write(self, data: bytes):
+        """Добавить данные; полные части отправляются в фоне"""
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            await self._submit(part)
+
+    async def complete(self):
+        """Дописать остаток и собрать объект"""
+        if self._upload_id is None:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._run(
+                self.client.put_object,
+                self.bucket_name,
+                self.object_name,
+                io.BytesIO(data),
+                len(data),
+                content_type=self.content_type
+            )
+            return
+
+        if self._buffer:
+            part = bytes(self._buffer)
+            self._buffer.clear()
+            await self._submit(part)
+        await self._wait(asyncio.ALL_COMPLETED)
+
+        await self._run(
+            self.client._complete_multipart_upload,
+            self.bucket_name,
+            self.object_name,
+            self._upload_id,
+            [Part(part_number, etag) for part_number, etag in sorted(self._parts)]
+        )
+
+    async def abort(self):
+        """Отменить загрузку: дождаться частей в полёте и удалить multipart upload"""
+        self._buffer.clear()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+            self._pending.clear()
+        if self._upload_id is None:
+            return
+        try:
+            await self._run(
+                self.client._abort_multipart_upload,
+                self.bucket_name,
+                self.object_name,
+                self._upload_id
+            )
+        except Exception as e:
+            print(f"Warning: Could not abort multipart upload {self._upload_id}: {e}")
+
+    async def _submit(self, data: bytes):
+        if self._upload_id is None:
+            self._upload_id = await self._run(
+                self.client._create_multipart_upload,
+                self.bucket_name,
+                self.object_name,
+                {"Content-Type": self.content_type}
+            )
+
+        while len(self._pending) >= self.parallelism:
+            await self._wait(asyncio.FIRST_COMPLETED)
+
+        part_number = self._next_part_number
+        self._next_part_number += 1
+        self._pending.add(asyncio.ensure_future(self._upload_part(part_number, data)))
+
+    async def _upload_part(self, part_number: int, data: bytes):
+        etag = await self._run(
+            self.client._upload_part,
+            self.bucket_name,
+            self.object_name,
+            data,
+            None,
+            self._upload_id,
+            part_number
+        )
+        self._parts.append((part_number, etag))
+
+    async def _wait(self, return_when: str):
+        if not self._pending:
+            return
+        done, self._pending = await asyncio.wait(self._pending, return_when=return_when)
+        for task in done:
+            # Пробрасываем первую ошибку загрузки части
+            task.result()
+
+    @staticmethod
+    async def _run(func, *args, **kwargs):
+        try:
+            return await run_blocking(_executor, func, *args, **kwargs)
+        except S3Error as e:
+            raise StorageError(f"Upload failed: {e}")
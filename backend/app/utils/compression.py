@@ -0,0 +1,67 @@
+from typing import Optional
+import zstandard
+from app.config import get_settings
+from app.utils.validators import FileValidator
+
+settings = get_settings()
+
+CODEC_ZSTD = "zstd"
+
+# Суффикс ключа объекта, который хранится в сжатом виде
+_KEY_SUFFIXES = {CODEC_ZSTD: ".zst"}
+
+
+def choose_codec(filename: Optional[str], size: Optional[int] = None) -> Optional[str]:
+    """Кодек для хранения файла или None — хранить как есть"""
+    if settings.COMPRESSION_CODEC != CODEC_ZSTD:
+        return None
+    if FileValidator.get_extension(filename) not in settings.COMPRESSIBLE_EXTENSIONS:
+        return None
+    # Размер известен не всегда; мелкие файлы почти не сжимаются
+    if size is not None and size < settings.COMPRESSION_MIN_SIZE:
+        return None
+    return CODEC_ZSTD
+
+
+def key_suffix(codec: Optional[str]) -> str:
+    return _KEY_SUFFIXES[codec] if codec else ""
+
+
+def compressor(codec: str):
+    """Потоковый компрессор: compress() на каждый кусок, flush() в конце"""
+    _check(codec)
+    return zstandard.ZstdCompressor(level=settings.COMPRESSION_LEVEL).compressobj()
+
+
+def decompressing_reader(codec: str, reader, read_size: int):
+    """
+    Блокирующий reader с распакованным содержимым поверх reader сжатого объекта.
+
+    read(n) отдаёт не больше n байт, поэтому хорошо сжатые данные не
+    распаковываются в память целиком; seek() возможен только вперёд.
+    """
+    _check(codec)
+    return zstandard.ZstdDecompressor().stream_reader(reader, read_size=read_size)
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """Клиент принимает ответ с Content-Encoding: coding (Accept-Encoding, q > 0)"""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() != coding:
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _check(codec: str):
+    if codec != CODEC_ZSTD:
+        raise ValueError(f"Unsupported codec: {codec}")
@@ -0,0 +1,38 @@
+from concurrent.futures import Executor, Future
+from functools import partial
+from typing import AsyncIterator, Callable, Optional
+import asyncio
+
+async def run_blocking(executor: Executor, func, *args, **kwargs):
+    """Выполнить блокирующий вызов в пуле потоков, не занимая event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+def close_after(executor: Executor, close: Callable[[], None], pending: Optional[Future] = None):
+    """
+    Закрыть объект в пуле, когда завершится начатый на нём вызов pending.
+
+    Ждать нужно future из executor.submit, а не asyncio-обёртку над ним:
+    при отмене обёртка сразу считается завершённой, хотя поток ещё читает.
+    """
+    if pending is None:
+        executor.submit(close)
+    else:
+        pending.add_done_callback(lambda _: executor.submit(close))
+
+async def retry_intervals(timeout: float, first_delay: float = 0.05, max_delay: float = 1.0) -> AsyncIterator[int]:
+    """
+    Попытки с растущей паузой между ними, пока не истечёт timeout.
+    Первая попытка — сразу; если все неудачны, цикл просто заканчивается.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = first_delay
+    attempt = 0
+    while True:
+        yield attempt
+        attempt += 1
+        if loop.time() + delay > deadline:
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
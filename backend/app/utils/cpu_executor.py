@@ -0,0 +1,183 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+import asyncio
+import multiprocessing
+import time
+from app.config import get_settings
+
+settings = get_settings()
+
+THREAD = "thread"
+PROCESS = "process"
+
+# Тип задачи -> пул. sha256 и zstd отпускают GIL и идут в потоках;
+# Pillow и поиск границ кусков большую часть времени держат GIL,
+# поэтому они — в процессах
+TASK_POOLS = {
+    "hash": THREAD,
+    "compress": THREAD,
+    "chunk": PROCESS,
+    "image": PROCESS,
+}
+
+
+class CpuBusyError(Exception):
+    """Очередь задач этого типа заполнена — запрос стоит повторить позже"""
+
+
+@dataclass
+class _TaskStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    running: int = 0
+    waiting: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class CpuExecutor:
+    """
+    Общие пулы для CPU-задач конвейера загрузки и скачивания.
+
+    У каждого типа задач свой предел одновременно выполняемых задач
+    (CPU_TASK_LIMITS), поэтому генерация миниатюр не занимает потоки,
+    нужные для хеширования загрузок, а в очереди пула никогда не больше
+    суммы пределов. Ожидающих своей очереди задач тоже не больше
+    CPU_QUEUE_LIMITS — сверх этого сразу CpuBusyError.
+    """
+
+    def __init__(
+            self,
+            thread_workers: Optional[int] = None,
+            process_workers: Optional[int] = None,
+            limits: Optional[dict[str, int]] = None,
+            queue_limits: Optional[dict[str, int]] = None
+    ):
+        self.thread_workers = thread_workers or settings.CPU_THREAD_WORKERS
+        self.process_workers = process_workers or settings.CPU_PROCESS_WORKERS
+        self.limits = {**settings.CPU_TASK_LIMITS, **(limits or {})}
+        self.queue_limits = {**settings.CPU_QUEUE_LIMITS, **(queue_limits or {})}
+        self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="cpu")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._stats = {kind: _TaskStats() for kind in TASK_POOLS}
+        # Семафоры привязываются к event loop; в процессе он обычно один,
+        # но тестовые клиенты создают свой на каждый запуск приложения
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _pool(self, kind: str) -> Executor:
+        if TASK_POOLS[kind] == THREAD:
+            return self._threads
+        if self._processes is None:
+            # spawn — дочерний процесс не наследует потоки и соединения родителя
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._processes
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(self.limits.get(kind, self.thread_workers))
+        return self._semaphores[kind]
+
+    async def run(self, kind: str, func, *args, **kwargs):
+        """Выполнить func в пуле своего типа; для процессов func и аргументы должны сериализоваться"""
+        stats = self._stats[kind]
+        semaphore = self._semaphore(kind)
+        queue_limit = self.queue_limits.get(kind)
+        if semaphore.locked() and queue_limit is not None and stats.waiting >= queue_limit:
+            stats.rejected += 1
+            raise CpuBusyError("Server is busy, please retry later")
+
+        stats.submitted += 1
+        queued_at = time.perf_counter()
+        stats.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+
+        started = time.perf_counter()
+        stats.wait_seconds += started - queued_at
+        stats.max_wait_seconds = max(stats.max_wait_seconds, started - queued_at)
+        stats.running += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool(kind), partial(func, *args, **kwargs))
+        except BaseException:
+            stats.running -= 1
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda done: self._finish(kind, semaphore, started, done))
+        # Отмена вызывающего не останавливает задачу в пуле, поэтому её место
+        # освобождается только по завершении
+        return await asyncio.shield(future)
+
+    def _finish(self, kind: str, semaphore: asyncio.Semaphore, started: float, future: asyncio.Future):
+        stats = self._stats[kind]
+        stats.running -= 1
+        stats.run_seconds += time.perf_counter() - started
+        if future.cancelled() or future.exception() is not None:
+            stats.failed += 1
+        else:
+            stats.completed += 1
+        semaphore.release()
+
+    def stats(self) -> dict:
+        """Загрузка пулов и счётчики по типам задач"""
+        tasks = {}
+        for kind, stats in self._stats.items():
+            finished = stats.completed + stats.failed
+            started = stats.submitted - stats.waiting
+            tasks[kind] = {
+                "pool": TASK_POOLS[kind],
+                "limit": self.limits.get(kind, self.thread_workers),
+                "queue_limit": self.queue_limits.get(kind),
+                "running": stats.running,
+                "waiting": stats.waiting,
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "rejected": stats.rejected,
+                "avg_wait_ms": round(stats.wait_seconds * 1000 / started, 2) if started else 0,
+                "max_wait_ms": round(stats.max_wait_seconds * 1000, 2),
+                "avg_run_ms": round(stats.run_seconds * 1000 / finished, 2) if finished else 0,
+            }
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "tasks": tasks,
+        }
+
+    def shutdown(self):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(cancel_futures=True)
+
+
+_executor: Optional[CpuExecutor] = None
+
+
+def cpu_executor() -> CpuExecutor:
+    """Общий для процесса исполнитель; создаётся при старте приложения или первом обращении"""
+    global _executor
+    if _executor is None:
+        _executor = CpuExecutor()
+    return _executor
+
+
+def shutdown_cpu_executor():
+    """Остановить пулы (при остановке приложения или worker'а)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
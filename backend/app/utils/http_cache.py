@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+from urllib.parse import quote
+import re
+import unicodedata
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """Значение заголовка ETag"""
+    return f'{"W/" if weak else ""}"{value}"'
+
+
+def http_date(value: datetime) -> str:
+    """Дата в формате HTTP (IMF-fixdate); наивные даты считаются UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    """
+    Заголовок Content-Disposition с именем файла (RFC 6266).
+
+    Полное имя передаётся в filename* (RFC 5987, UTF-8 с процентным
+    кодированием), для старых клиентов — ASCII-вариант в filename:
+    где кавычки, обратная косая черта, управляющие символы и % заменены.
+    """
+    # Диакритика отбрасывается (é -> e), остальные символы вне ASCII заменяются на _
+    stripped = "".join(c for c in unicodedata.normalize("NFKD", filename) if not unicodedata.combining(c))
+    fallback = re.sub(r'[^\x20-\x7e]|["\\%]', "_", stripped).strip() or "download"
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _seconds(value: datetime) -> datetime:
+    # Last-Modified передаётся с точностью до секунды
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(header: str, etag: str, strong: bool) -> bool:
+    """
+    Есть ли etag в списке заголовка If-Match / If-None-Match.
+
+    strong=True — строгое сравнение (If-Match, If-Range): слабые теги не совпадают.
+    """
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if strong:
+            if candidate == etag and not etag.startswith("W/"):
+                return True
+        elif _opaque(candidate) == _opaque(etag):
+            return True
+    return False
+
+
+def evaluate_preconditions(
+    headers: Mapping[str, str],
+    etag: str,
+    last_modified: datetime,
+) -> Optional[int]:
+    """
+    Проверка условных заголовков GET-запроса (RFC 9110, раздел 13.2.2).
+
+    Возвращает 412, 304 или None, если нужно отдать обычный ответ.
+    """
+    if_match = headers.get("if-match")
+    if if_match is not None:
+        if not etag_matches(if_match, etag, strong=True):
+            return 412
+    else:
+        since = _parse_http_date(headers.get("if-unmodified-since"))
+        if since is not None and _seconds(last_modified) > since:
+            return 412
+
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag, strong=False):
+            return 304
+    else:
+        since = _parse_http_date(headers.get("if-modified-since"))
+        if since is not None and _seconds(last_modified) <= since:
+            return 304
+    return None
+
+
+def if_range_allows(headers: Mapping[str, str], etag: str, last_modified: datetime) -> bool:
+    """Можно ли выполнять Range: If-Range отсутствует или представление не изменилось"""
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', 'W/"')):
+        return etag_matches(if_range, etag, strong=True)
+    since = _parse_http_date(if_range)
+    return since is not None and _seconds(last_modified) == since
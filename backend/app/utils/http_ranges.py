@@ -0,0 +1,65 @@
+from typing import Optional
+
+# Больше диапазонов в одном запросе не обслуживаем — отдаём файл целиком
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiableError(Exception):
+    """Ни один из запрошенных диапазонов не попадает в файл (HTTP 416)"""
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[list[tuple[int, int]]]:
+    """
+    Разбор заголовка Range (RFC 9110) в список диапазонов (start, end) включительно.
+
+    None — заголовка нет или он некорректен, отдаётся весь файл;
+    пересекающиеся и соседние диапазоны склеиваются.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, dash, end_text = part.partition("-")
+        if not dash:
+            return None
+        try:
+            if start_text == "":
+                # bytes=-N — последние N байт
+                suffix = int(end_text)
+                if suffix < 0:
+                    return None
+                if suffix == 0 or size == 0:
+                    continue
+                ranges.append((max(size - suffix, 0), size - 1))
+                continue
+            start = int(start_text)
+            end = int(end_text) if end_text else None
+        except ValueError:
+            return None
+        if start < 0 or (end is not None and end < start):
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, size - 1 if end is None else min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    if not ranges:
+        raise RangeNotSatisfiableError()
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,56 @@
+from io import BytesIO
+from PIL import Image, ImageOps
+from app.config import get_settings
+
+settings = get_settings()
+
+# Формат в запросе -> (формат Pillow, Content-Type)
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+_EXIF_ORIENTATION = 0x0112
+# Значения ориентации EXIF, при которых изображение повёрнуто на 90°
+_ROTATED = {5, 6, 7, 8}
+
+
+def render_derivative(data: bytes, width: int, image_format: str, quality: int, max_pixels: int) -> bytes:
+    """
+    Уменьшенная до width по ширине копия изображения (выполняется в пуле процессов).
+
+    Изображение не увеличивается; поворот из EXIF применяется. ValueError —
+    содержимое не удалось прочитать как изображение.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    pil_format = IMAGE_FORMATS[image_format][0]
+    try:
+        with Image.open(BytesIO(data)) as image:
+            rotated = image.getexif().get(_EXIF_ORIENTATION) in _ROTATED
+            # thumbnail() для JPEG декодирует сразу в уменьшенном масштабе;
+            # ограничивается ширина после поворота, высота — по пропорциям
+            bounds = (image.width, width) if rotated else (width, image.height)
+            image.thumbnail(bounds)
+            image = ImageOps.exif_transpose(image)
+
+            if pil_format == "JPEG" and image.mode != "RGB":
+                image = _flatten(image)
+            elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+
+            output = BytesIO()
+            image.save(output, format=pil_format, quality=quality)
+            return output.getvalue()
+    except Image.DecompressionBombError:
+        raise ValueError("Image resolution is too large")
+    except (OSError, SyntaxError):
+        raise ValueError("Unsupported or corrupt image")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    # JPEG без прозрачности: прозрачные области становятся белыми
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
@@ -1,7 +1,26 @@
 import re
+from typing import Optional
+from app.config import get_settings
+
+settings = get_settings()
 
 class EmailValidator:
     @staticmethod
     def validate(email: str) -> bool:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
+
+class FileValidator:
+    @staticmethod
+    def get_extension(filename: Optional[str]) -> str:
+        return filename.split('.')[-1].lower() if filename else ""
+
+    @staticmethod
+    def validate_extension(filename: Optional[str]):
+        if FileValidator.get_extension(filename) not in settings.ALLOWED_EXTENSIONS:
+            raise ValueError(f"File type not allowed. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}")
+
+    @staticmethod
+    def validate_size(size: int):
+        if size > settings.MAX_FILE_SIZE:
+            raise ValueError(f"File too large. Max size: {settings.MAX_FILE_SIZE / 1e9} GB")
@@ -0,0 +1,115 @@
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable
+import asyncio
+import io
+import zipfile
+
+
+@dataclass
+class ZipEntry:
+    """Файл архива: имя, размер, дата изменения и открытие потока содержимого"""
+    name: str
+    size: int
+    modified: datetime
+    open_stream: Callable[[], AsyncIterator[bytes]]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Приёмник без seek для zipfile: копит записанные байты до выдачи клиенту"""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def _prefetch(stream: AsyncIterator[bytes], queue: asyncio.Queue):
+    try:
+        async for chunk in stream:
+            await queue.put(chunk)
+        await queue.put(None)
+    except Exception as e:
+        await queue.put(e)
+
+
+async def stream_zip(
+    entries: list[ZipEntry],
+    parallelism: int = 4,
+    prefetch_chunks: int = 4,
+) -> AsyncIterator[bytes]:
+    """
+    Потоковая сборка ZIP-архива (без сжатия, с ZIP64 для больших файлов).
+
+    Архив не собирается ни в памяти, ни на диске: заголовки и данные
+    уходят клиенту по мере чтения. Содержимое следующих parallelism
+    файлов читается из хранилища заранее, но не больше prefetch_chunks
+    кусков на файл — медленный клиент ограничивает и чтение.
+    """
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True)
+    pending = deque()
+    remaining = iter(entries)
+
+    def start_next():
+        entry = next(remaining, None)
+        if entry is not None:
+            queue = asyncio.Queue(maxsize=prefetch_chunks)
+            task = asyncio.create_task(_prefetch(entry.open_stream(), queue))
+            pending.append((entry, queue, task))
+
+    try:
+        for _ in range(max(parallelism, 1)):
+            start_next()
+
+        while pending:
+            entry, queue, task = pending.popleft()
+            info = zipfile.ZipInfo(entry.name, date_time=_zip_time(entry.modified))
+            info.compress_type = zipfile.ZIP_STORED
+            # Известный заранее размер позволяет zipfile решить, нужен ли ZIP64
+            info.file_size = entry.size
+            with archive.open(info, mode="w") as member:
+                while (chunk := await queue.get()) is not None:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    member.write(chunk)
+                    yield sink.drain()
+            await task
+            start_next()
+            # Дескриптор данных (CRC и размеры) записывается после содержимого
+            yield sink.drain()
+
+        archive.close()
+        yield sink.drain()
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+        # При обрыве центральный каталог уходит в приёмник и отбрасывается
+        if archive.fp is not None:
+            try:
+                archive.close()
+            except (ValueError, RuntimeError):
+                pass
+
+
+def _zip_time(value: datetime) -> tuple:
+    # Формат ZIP не умеет даты раньше 1980 года
+    if value.year < 1980:
+        value = datetime(1980, 1, 1)
+    return value.timetuple()[:6]
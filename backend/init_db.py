@@ -3,8 +3,16 @@
 """
 from app.database import engine, SessionLocal
 from app.schemas.base import Base
-from app.schemas.user import User
-from app.schemas.file import File
+# Модели импортируются ради регистрации таблиц в Base.metadata
+from app.schemas.user import User  # noqa: F401
+from app.schemas.file import File  # noqa: F401
+from app.schemas.file_version import FileVersion  # noqa: F401
+from app.schemas.blob import Blob  # noqa: F401
+from app.schemas.chunk import Chunk, BlobChunk  # noqa: F401
+from app.schemas.upload_session import UploadSession, UploadSessionPart  # noqa: F401
+from app.schemas.presigned_upload import PresignedUpload  # noqa: F401
+from app.schemas.derivative import Derivative  # noqa: F401
+from app.schemas.gc_run import GcRun  # noqa: F401
 from app.repositories.user_repository import UserRepository
 from app.utils.password_utils import PasswordUtils
 
@@ -16,7 +24,7 @@ def init_database():
 
     print("📊 Создание таблиц...")
     Base.metadata.create_all(bind=engine)
-    print("✅ Таблицы созданы: users, files")
+    print("✅ Таблицы созданы: users, files, file_versions, blobs, chunks, blob_chunks, upload_sessions, upload_session_parts, presigned_uploads, derivatives, gc_runs")
 
 
 def create_admin():
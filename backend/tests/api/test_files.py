@@ -86,3 +86,642 @@ def test_delete_other_user_file(client, user_token, admin_token):
     )
     # API возвращает 404 чтобы скрыть существование файла
     assert response.status_code in [403, 404]
+
+
+def test_bulk_delete(client, user_token, admin_token):
+    """Тест массового удаления: свои файлы удаляются, чужие попадают в not_found"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    own_ids = []
+    for i in range(3):
+        upload_response = client.post(
+            "/api/v1/files/upload",
+            files={"file": (f"bulk{i}.txt", io.BytesIO(b"Bulk content"), "text/plain")},
+            headers=headers,
+        )
+        own_ids.append(upload_response.json()["id"])
+    foreign_id = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("foreign.txt", io.BytesIO(b"Bulk content"), "text/plain")},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    ).json()["id"]
+
+    response = client.post(
+        "/api/v1/files/bulk-delete",
+        json={"file_ids": own_ids + [foreign_id]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["deleted"] == 3
+    assert sorted(data["file_ids"]) == sorted(own_ids)
+    assert data["not_found"] == [foreign_id]
+
+    # Содержимое общее с чужим файлом — оно должно остаться доступным
+    response = client.get(
+        f"/api/v1/files/{foreign_id}/download",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.content == b"Bulk content"
+
+
+def test_upload_file_too_large(client, user_token, monkeypatch):
+    """Тест: лимит размера проверяется по ходу потоковой загрузки"""
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "MAX_FILE_SIZE", 10)
+
+    file = io.BytesIO(b"x" * 100)
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("big.txt", file, "text/plain")},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
+
+
+def test_upload_rejected_before_body(client, user_token, monkeypatch):
+    """Тест: Content-Length больше лимита отклоняется без чтения тела"""
+    from app.config import get_settings
+    settings = get_settings()
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD", 1000)
+
+    file = io.BytesIO(b"x" * 5000)
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("big.txt", file, "text/plain")},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+
+
+def test_upload_cap_without_content_length(client, user_token, monkeypatch):
+    """Тест: тело без Content-Length обрывается на лимите"""
+    from app.config import get_settings
+    settings = get_settings()
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+    monkeypatch.setattr(settings, "UPLOAD_FORM_OVERHEAD", 1000)
+    boundary = "limit-test"
+
+    def body():
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.txt"\r\n\r\n'.encode()
+        yield b"x" * 5000
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/api/v1/files/upload",
+        content=body(),
+        headers={
+            "Authorization": f"Bearer {user_token}",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        },
+    )
+    assert response.status_code == 413
+    assert client.get("/api/v1/files/", headers={"Authorization": f"Bearer {user_token}"}).json() == []
+
+
+def test_upload_rejects_extension_early(client, user_token):
+    """Тест: недопустимое расширение отклоняется по заголовкам части формы"""
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("script.exe", io.BytesIO(b"binary"), "application/octet-stream")},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 400
+    assert "not allowed" in response.json()["detail"]
+    assert response.headers["connection"] == "close"
+
+
+def test_duplicate_content_shares_storage(client, user_token):
+    """Тест: одинаковое содержимое хранится один раз и переживает удаление копии"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ids = []
+    for name in ("first.txt", "second.txt"):
+        response = client.post(
+            "/api/v1/files/upload",
+            files={"file": (name, io.BytesIO(b"Duplicate content"), "text/plain")},
+            headers=headers,
+        )
+        ids.append(response.json()["id"])
+
+    first = client.get(f"/api/v1/files/{ids[0]}/metadata", headers=headers).json()
+    second = client.get(f"/api/v1/files/{ids[1]}/metadata", headers=headers).json()
+    assert first["hash"] == second["hash"]
+
+    # Удаление одной копии не трогает общий объект
+    client.delete(f"/api/v1/files/{ids[0]}", headers=headers)
+    response = client.get(f"/api/v1/files/{ids[1]}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.content == b"Duplicate content"
+
+
+def test_upload_by_hash(client, user_token):
+    """Тест: повторная загрузка известного содержимого без передачи байтов"""
+    import hashlib
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"Content known to the server"
+    payload = {
+        "filename": "copy.txt",
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+    # Пока содержимого нет — клиент должен загрузить файл обычным способом
+    response = client.post("/api/v1/files/upload/by-hash", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["exists"] is False
+
+    client.post(
+        "/api/v1/files/upload",
+        files={"file": ("original.txt", io.BytesIO(content), "text/plain")},
+        headers=headers,
+    )
+
+    response = client.post("/api/v1/files/upload/by-hash", json=payload, headers=headers)
+    data = response.json()
+    assert data["exists"] is True
+    assert data["file"]["filename"] == "copy.txt"
+
+    download = client.get(f"/api/v1/files/{data['file']['id']}/download", headers=headers)
+    assert download.content == content
+
+
+def test_upload_rejected_for_deleted_user(client, user_token, db):
+    """Тест: токен удалённого пользователя ещё действителен, но загружать файлы нельзя"""
+    from datetime import datetime
+    from app.repositories.user_repository import UserRepository
+    headers = {"Authorization": f"Bearer {user_token}"}
+    user = UserRepository(db).get_by_email("test@example.com")
+    user.deleted_at = datetime.utcnow()
+    db.commit()
+
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("late.txt", io.BytesIO(b"late"), "text/plain")},
+        headers=headers,
+    )
+    assert response.status_code == 403
+
+    response = client.post("/api/v1/files/uploads", json={"filename": "late.bin", "size": 4}, headers=headers)
+    assert response.status_code == 403
+
+
+def test_upload_by_hash_other_user(client, user_token, admin_token):
+    """Тест: чужое содержимое по одному хешу не выдаётся — нужен хеш диапазона"""
+    import hashlib
+    content = b"Private content of the first user"
+    client.post(
+        "/api/v1/files/upload",
+        files={"file": ("secret.txt", io.BytesIO(content), "text/plain")},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {
+        "filename": "stolen.txt",
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    response = client.post("/api/v1/files/upload/by-hash", json=payload, headers=headers)
+    data = response.json()
+    assert data["exists"] is False
+    assert data["file"] is None
+    challenge = data["challenge"]
+
+    # Тот же ответ для содержимого, которого на сервере нет
+    unknown = dict(payload, sha256=hashlib.sha256(b"missing").hexdigest())
+    response = client.post("/api/v1/files/upload/by-hash", json=unknown, headers=headers)
+    assert response.json()["exists"] is False
+    assert response.json()["challenge"] is not None
+
+    wrong = dict(payload, challenge=challenge["token"], range_sha256=hashlib.sha256(b"guess").hexdigest())
+    response = client.post("/api/v1/files/upload/by-hash", json=wrong, headers=headers)
+    assert response.json()["exists"] is False
+    assert client.get("/api/v1/files/", headers=headers).json() == []
+
+    start, end = challenge["offset"], challenge["offset"] + challenge["length"]
+    proof = dict(payload, challenge=challenge["token"], range_sha256=hashlib.sha256(content[start:end]).hexdigest())
+    response = client.post("/api/v1/files/upload/by-hash", json=proof, headers=headers)
+    assert response.json()["exists"] is True
+
+
+def test_download_range(client, user_token):
+    """Тест: частичное скачивание по заголовку Range"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"0123456789abcdefghij"
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("range.txt", io.BytesIO(content), "text/plain")},
+        headers=headers,
+    )
+    url = f"/api/v1/files/{upload.json()['id']}/download"
+
+    response = client.get(url, headers={**headers, "Range": "bytes=5-9"})
+    assert response.status_code == 206
+    assert response.content == b"56789"
+    assert response.headers["content-range"] == f"bytes 5-9/{len(content)}"
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = client.get(url, headers={**headers, "Range": "bytes=0-1,-2"})
+    assert response.status_code == 206
+    assert response.headers["content-type"].startswith("multipart/byteranges")
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert b"Content-Range: bytes 0-1/20\r\n\r\n01\r\n" in response.content
+    assert b"Content-Range: bytes 18-19/20\r\n\r\nij\r\n" in response.content
+
+    response = client.get(url, headers={**headers, "Range": "bytes=100-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+
+def test_download_conditional_get(client, user_token):
+    """Тест: повторное скачивание с If-None-Match отвечает 304 без тела"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("cached.txt", io.BytesIO(b"Cached content"), "text/plain")},
+        headers=headers,
+    )
+    file_id = upload.json()["id"]
+    file_hash = client.get(f"/api/v1/files/{file_id}/metadata", headers=headers).json()["hash"]
+
+    response = client.get(f"/api/v1/files/{file_id}/download", headers=headers)
+    etag = response.headers["etag"]
+    assert etag == f'"{file_hash}"'
+    assert "last-modified" in response.headers
+
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        headers={**headers, "If-Match": '"other"'},
+    )
+    assert response.status_code == 412
+
+    # Ссылка, закреплённая за хешем, кэшируется как неизменяемая
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        params={"v": file_hash},
+        headers=headers,
+    )
+    assert "immutable" in response.headers["cache-control"]
+
+    metadata = client.get(f"/api/v1/files/{file_id}/metadata", headers=headers)
+    response = client.get(
+        f"/api/v1/files/{file_id}/metadata",
+        headers={**headers, "If-None-Match": metadata.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_download_compressed_file(client, user_token):
+    """Тест: текстовый файл хранится сжатым, но скачивается как исходный"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"".join(b"%d;line of a log file\n" % i for i in range(2000))
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("app.log.txt", io.BytesIO(content), "text/plain")},
+        headers=headers,
+    )
+    file_id = upload.json()["id"]
+    assert upload.json()["size"] == len(content)
+
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        headers={**headers, "Accept-Encoding": "gzip"},
+    )
+    assert response.content == content
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    # Клиент, принимающий zstd, получает сжатый объект как есть и с другим ETag
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        headers={**headers, "Accept-Encoding": "zstd"},
+    )
+    assert response.headers["content-encoding"] == "zstd"
+    assert int(response.headers["content-length"]) < len(content)
+
+    response = client.get(
+        f"/api/v1/files/{file_id}/download",
+        headers={**headers, "Accept-Encoding": "zstd", "Range": "bytes=10-19"},
+    )
+    assert response.status_code == 206
+    assert response.content == content[10:20]
+
+
+def test_chunked_versions_share_chunks(client, db, user_token, monkeypatch):
+    """Тест: правленая версия документа хранит только изменившиеся куски"""
+    import os
+    from app.config import get_settings
+    from app.schemas.chunk import Chunk
+    settings = get_settings()
+    monkeypatch.setattr(settings, "CHUNKING_ENABLED", True)
+    monkeypatch.setattr(settings, "CHUNKING_MIN_FILE_SIZE", 0)
+    monkeypatch.setattr(settings, "CHUNK_MIN_SIZE", 1024)
+    monkeypatch.setattr(settings, "CHUNK_AVG_SIZE", 4096)
+    monkeypatch.setattr(settings, "CHUNK_MAX_SIZE", 16384)
+    headers = {"Authorization": f"Bearer {user_token}"}
+    original = os.urandom(200_000)
+    edited = original[:100_000] + b"inserted paragraph" + original[100_000:]
+
+    ids = []
+    for content in (original, edited):
+        response = client.post(
+            "/api/v1/files/upload",
+            files={"file": ("report.docx", io.BytesIO(content), "application/octet-stream")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+
+    stored = sum(chunk.size for chunk in db.query(Chunk).all())
+    assert len(original) < stored < len(original) * 1.2
+
+    response = client.get(f"/api/v1/files/{ids[1]}/download", headers=headers)
+    assert response.content == edited
+    response = client.get(
+        f"/api/v1/files/{ids[1]}/download",
+        headers={**headers, "Range": "bytes=99990-100029"},
+    )
+    assert response.status_code == 206
+    assert response.content == edited[99990:100030]
+
+    # Удаление версии освобождает только её собственные куски
+    client.delete(f"/api/v1/files/{ids[1]}", headers=headers)
+    assert sum(chunk.size for chunk in db.query(Chunk).all()) == len(original)
+    response = client.get(f"/api/v1/files/{ids[0]}/download", headers=headers)
+    assert response.content == original
+
+
+def test_file_versions(client, db, user_token, monkeypatch):
+    """Тест: новая версия заменяет содержимое, прежние версии доступны и делят blob"""
+    import asyncio
+    from app.config import get_settings
+    from app.schemas.blob import Blob
+    from app.services.version_service import VersionPruner
+    settings = get_settings()
+    monkeypatch.setattr(settings, "FILE_VERSIONS_MAX", 0)
+    headers = {"Authorization": f"Bearer {user_token}"}
+    contents = [b"first draft", b"second draft", b"first draft"]
+
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("notes.txt", io.BytesIO(contents[0]), "text/plain")},
+        headers=headers,
+    )
+    file_id = upload.json()["id"]
+    for number, content in enumerate(contents[1:], start=2):
+        response = client.post(
+            f"/api/v1/files/{file_id}/versions",
+            files={"file": ("notes.txt", io.BytesIO(content), "text/plain")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] == number
+        assert response.json()["current"] is True
+
+    response = client.get(f"/api/v1/files/{file_id}/versions", headers=headers)
+    assert response.json()["current_version"] == 3
+    assert [item["version"] for item in response.json()["versions"]] == [3, 2, 1]
+
+    response = client.get(f"/api/v1/files/{file_id}/download", headers=headers)
+    assert response.content == contents[2]
+    for number, content in enumerate(contents, start=1):
+        response = client.get(f"/api/v1/files/{file_id}/versions/{number}/download", headers=headers)
+        assert response.content == content
+    response = client.get(f"/api/v1/files/{file_id}/versions/7/download", headers=headers)
+    assert response.status_code == 404
+
+    # Одинаковое содержимое версий 1 и 3 хранится один раз
+    blobs = {blob.hash: blob.ref_count for blob in db.query(Blob).all()}
+    assert sorted(blobs.values()) == [1, 2]
+
+    # Останется одна прежняя версия: ссылка версии 1 снимается, blob живёт
+    monkeypatch.setattr(settings, "FILE_VERSIONS_MAX", 1)
+    report = asyncio.run(VersionPruner(db).prune(file_id))
+    assert report == {"versions_deleted": 1, "blob_references": 1}
+    db.expire_all()
+    assert sorted(blob.ref_count for blob in db.query(Blob).all()) == [1, 1]
+    response = client.get(f"/api/v1/files/{file_id}/versions", headers=headers)
+    assert [item["version"] for item in response.json()["versions"]] == [3, 2]
+    response = client.get(f"/api/v1/files/{file_id}/versions/1/download", headers=headers)
+    assert response.status_code == 404
+
+
+def test_version_keeps_upload_time_after_rename(client, db, user_token):
+    """Тест: время загрузки версии не сдвигается переименованием файла"""
+    from datetime import datetime
+    from app.schemas.file import File as FileModel
+    headers = {"Authorization": f"Bearer {user_token}"}
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("notes.txt", io.BytesIO(b"first draft"), "text/plain")},
+        headers=headers,
+    )
+    file_id = upload.json()["id"]
+    uploaded_at = datetime(2026, 1, 1)
+    db.query(FileModel).update({FileModel.uploaded_at: uploaded_at}, synchronize_session=False)
+    db.commit()
+
+    response = client.patch(f"/api/v1/files/{file_id}", params={"new_name": "renamed.txt"}, headers=headers)
+    assert response.status_code == 200
+    versions = client.get(f"/api/v1/files/{file_id}/versions", headers=headers).json()["versions"]
+    assert versions[0]["uploaded_at"] == uploaded_at.isoformat()
+
+    client.post(
+        f"/api/v1/files/{file_id}/versions",
+        files={"file": ("notes.txt", io.BytesIO(b"second draft"), "text/plain")},
+        headers=headers,
+    )
+    versions = client.get(f"/api/v1/files/{file_id}/versions", headers=headers).json()["versions"]
+    assert versions[1]["version"] == 1
+    assert versions[1]["uploaded_at"] == uploaded_at.isoformat()
+    assert versions[0]["uploaded_at"] > uploaded_at.isoformat()
+
+
+def test_download_thumbnail(client, user_token):
+    """Тест: уменьшенная копия изображения генерируется и отдаётся повторно"""
+    from PIL import Image
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    image = io.BytesIO()
+    Image.new("RGB", (640, 480), (30, 60, 90)).save(image, format="PNG")
+    upload = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("photo.png", io.BytesIO(image.getvalue()), "image/png")},
+        headers=headers,
+    )
+    file_id = upload.json()["id"]
+
+    response = client.get(
+        f"/api/v1/files/{file_id}/thumbnail",
+        params={"width": 160},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    # Ширина округляется вверх до стандартной (256)
+    assert Image.open(io.BytesIO(response.content)).size == (256, 192)
+
+    # Другая ширина из того же диапазона — та же копия
+    again = client.get(
+        f"/api/v1/files/{file_id}/thumbnail",
+        params={"width": 200},
+        headers={**headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert again.status_code == 304
+
+    text = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("notes.txt", io.BytesIO(b"text"), "text/plain")},
+        headers=headers,
+    )
+    response = client.get(f"/api/v1/files/{text.json()['id']}/thumbnail", headers=headers)
+    assert response.status_code == 400
+
+
+def test_presigned_upload_and_download(client, user_token):
+    """Тест: загрузка и скачивание по подписанным ссылкам мимо API"""
+    import httpx
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"Uploaded straight to object storage"
+
+    response = client.post(
+        "/api/v1/files/presigned/upload",
+        json={"filename": "direct.txt", "size": len(content), "content_type": "text/plain"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    upload = response.json()
+
+    # Пока объекта нет, регистрация файла невозможна
+    response = client.post(f"/api/v1/files/presigned/upload/{upload['upload_id']}/complete", headers=headers)
+    assert response.status_code == 400
+
+    assert httpx.put(upload["url"], content=content).status_code == 200
+
+    response = client.post(f"/api/v1/files/presigned/upload/{upload['upload_id']}/complete", headers=headers)
+    assert response.status_code == 200
+    file_id = response.json()["id"]
+    assert response.json()["size"] == len(content)
+
+    response = client.get(f"/api/v1/files/{file_id}/download-url", headers=headers)
+    assert response.status_code == 200
+    assert httpx.get(response.json()["url"]).content == content
+
+
+def test_download_archive(client, user_token):
+    """Тест: несколько файлов одним ZIP-архивом"""
+    import zipfile
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ids = []
+    for name, content in (("one.txt", b"first"), ("two.txt", b"second"), ("one.txt", b"third")):
+        response = client.post(
+            "/api/v1/files/upload",
+            files={"file": (name, io.BytesIO(content), "text/plain")},
+            params={"folder": "archive"},
+            headers=headers,
+        )
+        ids.append(response.json()["id"])
+
+    response = client.get("/api/v1/files/archive", params={"file_ids": ids[:2]}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["one.txt", "two.txt"]
+    assert archive.read("two.txt") == b"second"
+
+    # Вся папка; одинаковые имена получают суффикс
+    response = client.get("/api/v1/files/archive", params={"folder": "archive"}, headers=headers)
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == ["one (1).txt", "one.txt", "two.txt"]
+
+    assert response.headers["content-disposition"] == "attachment; filename=\"archive.zip\"; filename*=UTF-8''archive.zip"
+
+    response = client.get("/api/v1/files/archive", headers=headers)
+    assert response.status_code == 400
+
+
+def test_archive_unicode_folder_name(client, user_token):
+    """Тест: имя папки вне latin-1 передаётся в filename* и не ломает заголовок"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.post(
+        "/api/v1/files/upload",
+        files={"file": ("one.txt", io.BytesIO(b"first"), "text/plain")},
+        params={"folder": "Документы"},
+        headers=headers,
+    )
+
+    response = client.get("/api/v1/files/archive", params={"folder": "Документы"}, headers=headers)
+    assert response.status_code == 200
+    disposition = response.headers["content-disposition"]
+    assert disposition.endswith("filename*=UTF-8''%D0%94%D0%BE%D0%BA%D1%83%D0%BC%D0%B5%D0%BD%D1%82%D1%8B.zip")
+
+
+def test_upload_batch(client, user_token):
+    """Тест: пакетная загрузка с отчётом по каждому файлу"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    files = [
+        ("files", (f"photo{i}.png", io.BytesIO(b"image %d" % i), "image/png"))
+        for i in range(5)
+    ]
+    files.append(("files", ("script.exe", io.BytesIO(b"binary"), "application/octet-stream")))
+
+    response = client.post("/api/v1/files/upload/batch", files=files, params={"folder": "batch"}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["uploaded"] == 5
+    assert data["failed"] == 1
+    assert data["results"][-1]["success"] is False
+    assert "not allowed" in data["results"][-1]["error"]
+
+    listed = client.get("/api/v1/files/", params={"folder": "batch"}, headers=headers).json()
+    assert len(listed) == 5
+
+    file_id = data["results"][2]["file"]["id"]
+    download = client.get(f"/api/v1/files/{file_id}/download", headers=headers)
+    assert download.content == b"image 2"
+
+
+def test_upload_batch_serializes_db_steps(client, user_token, monkeypatch):
+    """Тест: загрузки пакета пишут в хранилище параллельно, но не работают с общей сессией одновременно"""
+    import asyncio
+    from app.services.blob_service import BlobService
+    from app.services.storage_service import StorageService
+
+    active = {"storage": 0, "db": 0}
+    peak = {"storage": 0, "db": 0}
+
+    def tracked(kind, func):
+        async def wrapper(*args, **kwargs):
+            active[kind] += 1
+            peak[kind] = max(peak[kind], active[kind])
+            try:
+                await asyncio.sleep(0.01)
+                return await func(*args, **kwargs)
+            finally:
+                active[kind] -= 1
+        return wrapper
+
+    monkeypatch.setattr(StorageService, "upload_stream", tracked("storage", StorageService.upload_stream))
+    monkeypatch.setattr(BlobService, "store", tracked("db", BlobService.store))
+
+    files = [
+        ("files", (f"photo{i}.png", io.BytesIO(b"image %d" % i), "image/png"))
+        for i in range(4)
+    ]
+    response = client.post(
+        "/api/v1/files/upload/batch",
+        files=files,
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.json()["uploaded"] == 4
+    assert peak["storage"] > 1
+    assert peak["db"] == 1
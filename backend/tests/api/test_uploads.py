@@ -0,0 +1,113 @@
+
+def test_resumable_upload_flow(client, user_token):
+    """Тест: сессия загрузки -> кусок -> статус -> завершение -> скачивание"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"Resumable upload content"
+
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"filename": "resumable.txt", "size": len(content), "content_type": "text/plain"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    session = response.json()
+    assert session["total_chunks"] == 1
+
+    status_response = client.get(f"/api/v1/files/uploads/{session['session_id']}", headers=headers)
+    assert status_response.json()["missing_chunks"] == [0]
+
+    chunk_response = client.put(
+        f"/api/v1/files/uploads/{session['session_id']}/chunks/0",
+        content=content,
+        headers=headers,
+    )
+    assert chunk_response.status_code == 200
+
+    status_response = client.get(f"/api/v1/files/uploads/{session['session_id']}", headers=headers)
+    assert status_response.json()["received_chunks"] == [0]
+
+    complete_response = client.post(
+        f"/api/v1/files/uploads/{session['session_id']}/complete",
+        headers=headers,
+    )
+    assert complete_response.status_code == 200
+    file_id = complete_response.json()["id"]
+
+    download_response = client.get(f"/api/v1/files/{file_id}/download", headers=headers)
+    assert download_response.content == content
+
+
+def test_failed_complete_cannot_be_retried(client, db, user_token, monkeypatch):
+    """Тест: сбой после сборки частей переводит сессию в failed и удаляет объект"""
+    import asyncio
+    from app.schemas.upload_session import UploadSession
+    from app.services.storage_service import StorageService
+    headers = {"Authorization": f"Bearer {user_token}"}
+    content = b"content that fails to hash"
+
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"filename": "broken.txt", "size": len(content)},
+        headers=headers,
+    )
+    session_id = response.json()["session_id"]
+    client.put(f"/api/v1/files/uploads/{session_id}/chunks/0", content=content, headers=headers)
+
+    async def broken_hash(self, stored_name):
+        raise RuntimeError("storage read failed")
+
+    monkeypatch.setattr(StorageService, "compute_hash", broken_hash)
+    response = client.post(f"/api/v1/files/uploads/{session_id}/complete", headers=headers)
+    assert response.status_code == 500
+
+    status = client.get(f"/api/v1/files/uploads/{session_id}", headers=headers).json()["status"]
+    assert status == "failed"
+    response = client.post(f"/api/v1/files/uploads/{session_id}/complete", headers=headers)
+    assert response.status_code == 400
+    assert "failed" in response.json()["detail"]
+
+    stored_name = db.query(UploadSession).one().stored_name
+    assert asyncio.run(StorageService().object_size(stored_name)) is None
+
+
+def test_complete_with_missing_chunks(client, user_token):
+    """Тест: нельзя завершить сессию, пока не получены все куски"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"filename": "partial.txt", "size": 10},
+        headers=headers,
+    )
+    session_id = response.json()["session_id"]
+
+    response = client.post(f"/api/v1/files/uploads/{session_id}/complete", headers=headers)
+    assert response.status_code == 400
+    assert "Missing chunks" in response.json()["detail"]
+
+
+def test_upload_chunk_wrong_size(client, user_token):
+    """Тест: размер куска должен совпадать с ожидаемым"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"filename": "partial.txt", "size": 10},
+        headers=headers,
+    )
+    session_id = response.json()["session_id"]
+
+    response = client.put(
+        f"/api/v1/files/uploads/{session_id}/chunks/0",
+        content=b"short",
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_upload_session_disallowed_extension(client, user_token):
+    """Тест: расширение проверяется при создании сессии"""
+    response = client.post(
+        "/api/v1/files/uploads",
+        json={"filename": "script.exe", "size": 10},
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+"""
+Unit tests for AdminService
+User management for accounts that were deleted by an admin
+"""
+import pytest
+from app.repositories.user_repository import UserRepository
+from app.services.admin_service import AdminService
+
+
+@pytest.fixture
+def user(db):
+    return UserRepository(db).create(
+        email="managed@test.com",
+        username="managed",
+        hashed_password="hashed_pass"
+    )
+
+
+class TestAdminService:
+    """Test suite for AdminService"""
+
+    def test_deleted_user_cannot_be_changed(self, db, user):
+        """Test that a deleted account cannot be unblocked, promoted or deleted again"""
+        service = AdminService(db)
+        user_id = str(user.id)
+        service.delete_user(user_id)
+
+        for action in (
+            lambda: service.toggle_user_status(user_id),
+            lambda: service.change_user_role(user_id, "admin"),
+            lambda: service.get_user_details(user_id),
+            lambda: service.delete_user(user_id),
+        ):
+            with pytest.raises(ValueError, match="User not found"):
+                action()
+
+        db.refresh(user)
+        assert user.is_active is False
+        assert user.role == "user"
@@ -0,0 +1,77 @@
+"""
+Unit tests for BlobService
+Claims that keep concurrent store and release of the same content apart
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+import pytest
+from app.repositories.blob_repository import BlobRepository
+from app.schemas.blob import Blob, ContentState
+from app.services.blob_service import BlobService
+from app.services.storage_service import StorageService
+from app.storage.local_backend import LocalBackend
+
+DATA = b"shared content"
+FILE_HASH = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.ensure_ready()
+    return StorageService(backend)
+
+
+async def stage(storage, name):
+    await storage.write_object(name, DATA)
+    return {"stored_name": name, "file_hash": FILE_HASH, "size": len(DATA)}
+
+
+class TestBlobService:
+    """Test suite for BlobService"""
+
+    @pytest.mark.asyncio
+    async def test_store_waits_for_concurrent_delete(self, db, storage):
+        """Test that storing content whose last reference is being released does not lose the object"""
+        service = BlobService(db, storage)
+        await service.store(await stage(storage, "staged/first"))
+        second = await stage(storage, "staged/second")
+
+        delete_files = storage.delete_files
+        stores = []
+
+        async def delete_slowly(stored_names):
+            # Пока объект удаляется, строка в состоянии deleting: загрузка ждёт
+            assert db.get(Blob, FILE_HASH).state == ContentState.DELETING
+            stores.append(asyncio.ensure_future(service.store(second)))
+            await asyncio.sleep(0.1)
+            assert not stores[0].done()
+            return await delete_files(stored_names)
+
+        storage.delete_files = delete_slowly
+        await service.release(FILE_HASH)
+        storage.delete_files = delete_files
+
+        blob = await stores[0]
+        assert blob.ref_count == 1
+        assert blob.state == ContentState.READY
+        assert await storage.object_size(blob.stored_name) == len(DATA)
+        assert await storage.object_size("staged/second") is None
+
+    @pytest.mark.asyncio
+    async def test_stale_claim_is_purged(self, db, storage):
+        """Test that a claim abandoned mid-write blocks nothing once purged"""
+        service = BlobService(db, storage)
+        key = service.blob_key(FILE_HASH)
+        assert BlobRepository(db).claim(FILE_HASH, key, len(DATA))
+        await storage.write_object(key, DATA[:3])
+        db.get(Blob, FILE_HASH).updated_at = datetime.utcnow() - timedelta(days=1)
+        db.commit()
+
+        assert await service.purge_stale_claims() == 1
+        assert db.get(Blob, FILE_HASH) is None
+
+        blob = await service.store(await stage(storage, "staged/retry"))
+        assert blob.ref_count == 1
+        assert await storage.object_size(key) == len(DATA)
@@ -0,0 +1,64 @@
+"""
+Unit tests for ChunkService
+Releasing chunks without holding row locks across storage I/O
+"""
+import hashlib
+import pytest
+from app.schemas.blob import ContentState
+from app.schemas.chunk import Chunk
+from app.services.chunk_service import ChunkService
+from app.services.storage_service import StorageService
+from app.storage.local_backend import LocalBackend
+
+DATA = b"chunk content"
+CHUNK_HASH = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.ensure_ready()
+    return StorageService(backend)
+
+
+class TestChunkService:
+    """Test suite for ChunkService"""
+
+    @pytest.mark.asyncio
+    async def test_release_commits_before_deleting_objects(self, db, storage):
+        """Test that the reference change is committed before the object is deleted"""
+        service = ChunkService(db, storage)
+        await service._store_chunk(CHUNK_HASH, DATA)
+        key = service.chunk_key(CHUNK_HASH)
+
+        delete_files = storage.delete_files
+
+        async def check_then_delete(stored_names):
+            # Другая корутина с той же сессией может закоммитить её во время
+            # удаления — незавершённой транзакции с блокировками быть не должно
+            assert not db.in_transaction()
+            assert db.get(Chunk, CHUNK_HASH).state == ContentState.DELETING
+            return await delete_files(stored_names)
+
+        storage.delete_files = check_then_delete
+        await service.release({CHUNK_HASH: 1})
+
+        assert db.get(Chunk, CHUNK_HASH) is None
+        assert await storage.object_size(key) is None
+
+    @pytest.mark.asyncio
+    async def test_failed_delete_restores_chunk(self, db, storage):
+        """Test that a chunk whose object could not be deleted can be referenced again"""
+        service = ChunkService(db, storage)
+        await service._store_chunk(CHUNK_HASH, DATA)
+
+        async def fail_delete(stored_names):
+            return stored_names
+
+        storage.delete_files = fail_delete
+        await service.release({CHUNK_HASH: 1})
+
+        chunk = db.get(Chunk, CHUNK_HASH)
+        assert chunk.state == ContentState.READY
+        assert chunk.ref_count == 0
+        assert service.chunk_repo.add_reference(CHUNK_HASH)
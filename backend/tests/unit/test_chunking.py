@@ -0,0 +1,69 @@
+"""
+Unit tests for content-defined chunking
+Covers boundary search, size bounds and resynchronisation after an edit
+"""
+import hashlib
+import random
+from app.utils.chunking import find_chunks
+
+MIN_SIZE, AVG_SIZE, MAX_SIZE = 1024, 4096, 16384
+
+
+def data_of(size, seed=1):
+    return random.Random(seed).randbytes(size)
+
+
+def split(data):
+    return find_chunks(data, True, MIN_SIZE, AVG_SIZE, MAX_SIZE)
+
+
+class TestChunking:
+    """Test suite for find_chunks"""
+
+    def test_chunks_cover_data_within_bounds(self):
+        """Test that chunks cover the buffer in order and respect the size bounds"""
+        data = data_of(300_000)
+        chunks = split(data)
+
+        start = 0
+        for end, chunk_hash in chunks:
+            assert chunk_hash == hashlib.sha256(data[start:end]).hexdigest()
+            assert end - start <= MAX_SIZE
+            if end != len(data):
+                assert end - start > MIN_SIZE
+            start = end
+        assert start == len(data)
+
+    def test_tail_is_kept_until_final(self):
+        """Test that without final the data after the last boundary is not returned"""
+        data = data_of(50_000)
+        partial = find_chunks(data, False, MIN_SIZE, AVG_SIZE, MAX_SIZE)
+
+        assert partial == split(data)[:len(partial)]
+        assert partial[-1][0] < len(data)
+
+    def test_streamed_split_matches_whole(self):
+        """Test that feeding the data piece by piece gives the same chunks"""
+        data = data_of(200_000)
+        hashes = []
+        pending = b""
+        for start in range(0, len(data) + 7000, 7000):
+            piece = data[start:start + 7000]
+            pending += piece
+            found = find_chunks(pending, not piece, MIN_SIZE, AVG_SIZE, MAX_SIZE)
+            hashes.extend(chunk_hash for _, chunk_hash in found)
+            pending = pending[found[-1][0]:] if found else pending
+
+        assert hashes == [chunk_hash for _, chunk_hash in split(data)]
+
+    def test_insert_changes_only_nearby_chunks(self):
+        """Test that an insertion in the middle leaves most chunks unchanged"""
+        data = data_of(400_000)
+        edited = data[:200_000] + b"inserted text" + data[200_000:]
+
+        before = {chunk_hash for _, chunk_hash in split(data)}
+        after = [chunk_hash for _, chunk_hash in split(edited)]
+
+        changed = [chunk_hash for chunk_hash in after if chunk_hash not in before]
+        assert len(changed) <= 3
+        assert len(after) > 20
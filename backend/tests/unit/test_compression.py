@@ -0,0 +1,55 @@
+"""
+Unit tests for at-rest compression
+Covers codec selection, Accept-Encoding parsing and the compressed storage round trip
+"""
+import io
+import pytest
+from fastapi import UploadFile
+from app.services.storage_service import StorageService
+from app.storage.local_backend import LocalBackend
+from app.utils.compression import CODEC_ZSTD, accepts_encoding, choose_codec
+
+DATA = b"".join(b"%d,value,%d\n" % (i, i * 3) for i in range(5000))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.ensure_ready()
+    return StorageService(backend)
+
+
+class TestCompression:
+    """Test suite for compression helpers and compressed objects in StorageService"""
+
+    def test_choose_codec(self):
+        """Test that only large enough compressible types get a codec"""
+        assert choose_codec("report.CSV", len(DATA)) == CODEC_ZSTD
+        assert choose_codec("report.csv", None) == CODEC_ZSTD
+        assert choose_codec("report.csv", 10) is None
+        assert choose_codec("photo.png", len(DATA)) is None
+
+    def test_accepts_encoding(self):
+        """Test Accept-Encoding matching with quality values"""
+        assert accepts_encoding("gzip, zstd", "zstd")
+        assert accepts_encoding("ZSTD;q=0.5", "zstd")
+        assert not accepts_encoding("zstd;q=0", "zstd")
+        assert not accepts_encoding("gzip, br", "zstd")
+        assert not accepts_encoding(None, "zstd")
+
+    @pytest.mark.asyncio
+    async def test_compressed_round_trip(self, storage):
+        """Test that a compressed upload reads back as the original content"""
+        upload = UploadFile(file=io.BytesIO(DATA), filename="data.csv")
+
+        info = await storage.upload_stream("user", upload, codec=CODEC_ZSTD)
+
+        assert info["size"] == len(DATA)
+        assert info["codec"] == CODEC_ZSTD
+        assert info["stored_size"] < len(DATA) // 2
+        assert await storage.download_file(info["stored_name"], CODEC_ZSTD) == DATA
+
+        chunks = [
+            chunk async for chunk in storage.stream_file(info["stored_name"], 1000, 5000, CODEC_ZSTD)
+        ]
+        assert b"".join(chunks) == DATA[1000:6000]
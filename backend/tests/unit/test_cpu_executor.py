@@ -0,0 +1,64 @@
+"""
+Unit tests for the shared CPU executor
+Per-task-type limits, queue rejection and counters on the thread pool
+"""
+import asyncio
+import hashlib
+import threading
+import pytest
+from app.utils.cpu_executor import CpuBusyError, CpuExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = CpuExecutor(thread_workers=4, limits={"hash": 2}, queue_limits={"hash": 1})
+    yield executor
+    executor.shutdown()
+
+
+class TestCpuExecutor:
+    """Test suite for CpuExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self, executor):
+        """Test that a task runs in the pool and its result is returned"""
+        digest = await executor.run("hash", lambda data: hashlib.sha256(data).hexdigest(), b"abc")
+
+        assert digest == hashlib.sha256(b"abc").hexdigest()
+        stats = executor.stats()["tasks"]["hash"]
+        assert stats["completed"] == 1
+        assert stats["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_limit_and_queue_rejection(self, executor):
+        """Test that no more than the limit run at once and extra waiters are rejected"""
+        release = threading.Event()
+        tasks = [asyncio.create_task(executor.run("hash", release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()["tasks"]["hash"]
+        assert stats["running"] == 2
+        assert stats["waiting"] == 1
+        with pytest.raises(CpuBusyError):
+            await executor.run("hash", release.wait, 5)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        stats = executor.stats()["tasks"]["hash"]
+        assert stats["completed"] == 3
+        assert stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_task_releases_slot(self, executor):
+        """Test that an exception is propagated and counted without leaking a slot"""
+        def boom():
+            raise RuntimeError("boom")
+
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await executor.run("hash", boom)
+
+        assert await executor.run("hash", lambda: 42) == 42
+        stats = executor.stats()["tasks"]["hash"]
+        assert stats["failed"] == 3
+        assert stats["running"] == 0
@@ -0,0 +1,143 @@
+"""
+Unit tests for the disk read-through cache
+The origin is a LocalBackend that pretends to be remote (no local paths)
+"""
+import asyncio
+import os
+import pytest
+from app.storage.cached_backend import CachedBackend
+from app.storage.disk_cache import DiskCache
+from app.storage.local_backend import LocalBackend
+
+
+class RemoteLikeBackend(LocalBackend):
+    def local_path(self, key):
+        return None
+
+
+async def put(backend, key, data):
+    writer = backend.open_writer(key)
+    await writer.write(data)
+    await writer.complete()
+
+
+async def download(backend, key):
+    return b"".join([chunk async for chunk in backend.stream(key, chunk_size=4)])
+
+
+@pytest.fixture
+def backend(tmp_path):
+    origin = RemoteLikeBackend(str(tmp_path / "origin"))
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=100, max_object_size=60)
+    backend = CachedBackend(origin, cache)
+    backend.ensure_ready()
+    return backend
+
+
+class TestDiskCache:
+    """Test suite for DiskCache and CachedBackend"""
+
+    @pytest.mark.asyncio
+    async def test_read_through(self, backend):
+        """Test that a full download fills the cache and the next one hits it"""
+        await put(backend, "blobs/a", b"cached bytes")
+        assert backend.local_path("blobs/a") is None
+
+        assert await download(backend, "blobs/a") == b"cached bytes"
+        path = backend.local_path("blobs/a")
+        assert path and open(path, "rb").read() == b"cached bytes"
+
+        assert await download(backend, "blobs/a") == b"cached bytes"
+        stats = backend.cache_stats()["disk"]
+        assert stats["misses"] == 1
+        assert stats["fills"] == 1
+        assert stats["hits"] == 2
+        assert stats["bytes"] == len(b"cached bytes")
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, backend):
+        """Test that the byte budget evicts the least recently used entry"""
+        for key in ("k1", "k2", "k3"):
+            await put(backend, key, b"x" * 40)
+            await download(backend, key)
+            if key == "k2":
+                # k1 становится свежее k2
+                backend.local_path("k1")
+
+        stats = backend.cache_stats()["disk"]
+        assert stats["bytes"] <= 100
+        assert stats["evictions"] == 1
+        assert backend.local_path("k1") is not None
+        assert backend.local_path("k2") is None
+
+    @pytest.mark.asyncio
+    async def test_large_and_partial_reads_bypass_cache(self, backend):
+        """Test that oversized objects and ranges are not cached"""
+        await put(backend, "big", b"y" * 80)
+        assert await download(backend, "big") == b"y" * 80
+        await put(backend, "small", b"0123456789")
+        chunks = [c async for c in backend.stream("small", 2, 3)]
+        assert b"".join(chunks) == b"234"
+
+        assert backend.local_path("big") is None
+        assert backend.local_path("small") is None
+        assert os.listdir(backend.disk_cache.temp_dir) == []
+
+    def test_single_flight(self, backend):
+        """Test that only one fill per key can be in progress"""
+        fill = backend.disk_cache.begin_fill("key")
+        assert fill is not None
+        assert backend.disk_cache.begin_fill("key") is None
+        fill.write(b"data")
+        fill.commit()
+        assert backend.disk_cache.begin_fill("key") is None
+        assert backend.local_path("key") is not None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_read_origin_once(self, backend):
+        """Test that simultaneous cold misses wait for one fill instead of each reading the origin"""
+        await put(backend, "hot", b"h" * 50)
+        opened = []
+        open_reader = backend.origin.open_reader
+
+        def counting_open_reader(key, *args):
+            opened.append(key)
+            return open_reader(key, *args)
+
+        backend.origin.open_reader = counting_open_reader
+
+        results = await asyncio.gather(*(download(backend, "hot") for _ in range(5)))
+
+        assert results == [b"h" * 50] * 5
+        assert opened == ["hot"]
+        stats = backend.cache_stats()["disk"]
+        assert stats["fills"] == 1
+        assert stats["hits"] == 4
+
+    @pytest.mark.asyncio
+    async def test_interrupted_download_is_discarded(self, backend):
+        """Test that an aborted stream leaves nothing in the cache"""
+        await put(backend, "obj", b"z" * 20)
+        stream = backend.stream("obj", chunk_size=4)
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert backend.local_path("obj") is None
+        assert os.listdir(backend.disk_cache.temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_and_reload(self, backend):
+        """Test that deletes drop entries and the index survives a restart"""
+        await put(backend, "keep", b"k" * 10)
+        await put(backend, "gone", b"g" * 10)
+        await download(backend, "keep")
+        await download(backend, "gone")
+
+        await backend.delete("gone")
+        assert backend.local_path("gone") is None
+
+        restarted = DiskCache(backend.disk_cache.root, max_bytes=100, max_object_size=60)
+        restarted.load()
+        assert restarted.lookup("keep") is not None
+        assert restarted.lookup("gone") is None
+        assert restarted.stats()["bytes"] == 10
@@ -0,0 +1,171 @@
+"""
+Unit tests for the garbage collector
+Soft-deleted files are collected against a local storage backend
+"""
+import os
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from app.repositories.blob_repository import BlobRepository
+from app.repositories.file_repository import FileRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.file import File
+from app.schemas.gc_run import GcRunStatus
+from app.schemas.presigned_upload import PresignedUpload
+from app.schemas.upload_session import UploadSession, UploadSessionStatus
+from app.schemas.user import User
+from app.services.gc_service import GarbageCollector
+from app.services.storage_service import StorageService
+from app.storage.local_backend import LocalBackend
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.ensure_ready()
+    return StorageService(backend)
+
+
+@pytest.fixture
+def owner(db):
+    return UserRepository(db).create(
+        email="gcowner@test.com",
+        username="gcowner",
+        hashed_password="hashed_pass"
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_grace_period(monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "GC_GRACE_PERIOD_HOURS", 0)
+    monkeypatch.setattr(get_settings(), "GC_BATCH_SIZE", 2)
+    monkeypatch.setattr(get_settings(), "GC_BATCH_DELAY", 0)
+
+
+async def make_file(db, storage, owner, data, deleted=True, blob_hash=None):
+    stored_name = f"{owner.id}/{uuid4()}"
+    if blob_hash is None:
+        await storage.write_object(stored_name, data)
+    else:
+        stored_name = BlobRepository(db).get_by_hash(blob_hash).stored_name
+    return FileRepository(db).create({
+        "owner_id": owner.id,
+        "original_name": "gc.txt",
+        "stored_name": stored_name,
+        "file_size": len(data),
+        "file_type": "text/plain",
+        "folder": "root",
+        "file_hash": uuid4().hex,
+        "s3_path": stored_name,
+        "blob_hash": blob_hash,
+        "is_deleted": deleted
+    })
+
+
+class TestGarbageCollector:
+    """Test suite for GarbageCollector"""
+
+    @pytest.mark.asyncio
+    async def test_dry_run_changes_nothing(self, db, storage, owner):
+        """Test that a dry run reports deleted files without removing them"""
+        file = await make_file(db, storage, owner, b"12345")
+        await make_file(db, storage, owner, b"alive", deleted=False)
+
+        report = await GarbageCollector(db, storage).dry_run()
+
+        assert report["files"] == 1
+        assert report["objects"] == 1
+        assert report["bytes"] == 5
+        assert await storage.object_size(file.stored_name) == 5
+
+    @pytest.mark.asyncio
+    async def test_run_removes_objects_and_rows(self, db, storage, owner):
+        """Test that a run deletes own objects, releases blob references and hard-deletes rows"""
+        deleted = [(await make_file(db, storage, owner, b"old%d" % i)).stored_name for i in range(3)]
+        alive = await make_file(db, storage, owner, b"alive", deleted=False)
+        BlobRepository(db).create("b" * 64, "blobs/" + "b" * 64, 4)
+        await storage.write_object("blobs/" + "b" * 64, b"blob")
+        await make_file(db, storage, owner, b"blob", blob_hash="b" * 64)
+
+        run = await GarbageCollector(db, storage).run()
+
+        assert run.status == GcRunStatus.FINISHED
+        assert run.files_deleted == 4
+        assert run.objects_deleted == 3
+        assert run.blob_references == 1
+        assert [f.id for f in db.query(File).all()] == [alive.id]
+        for stored_name in deleted:
+            assert await storage.object_size(stored_name) is None
+        assert await storage.object_size("blobs/" + "b" * 64) is None
+        assert BlobRepository(db).get_by_hash("b" * 64) is None
+
+    @pytest.mark.asyncio
+    async def test_run_resumes_from_checkpoint(self, db, storage, owner):
+        """Test that a run stopped by the file limit is continued by the next run"""
+        for i in range(3):
+            await make_file(db, storage, owner, b"old%d" % i)
+        collector = GarbageCollector(db, storage)
+
+        first = await collector.run(max_files=2)
+        assert first.status == GcRunStatus.PAUSED
+        assert first.files_deleted == 2
+
+        second = await collector.run()
+        assert second.id == first.id
+        assert second.status == GcRunStatus.FINISHED
+        assert second.files_deleted == 3
+        assert db.query(File).count() == 0
+
+    @pytest.mark.asyncio
+    async def test_run_sweeps_expired_uploads(self, db, storage, owner):
+        """Test that expired upload sessions and presigned uploads are removed with their data"""
+        expired = datetime.utcnow() - timedelta(days=2)
+        stored_name = f"{owner.id}/{uuid4()}"
+        upload_id = await storage.create_multipart_upload(stored_name)
+        await storage.upload_part(stored_name, upload_id, 1, b"part")
+        presigned_name = f"{owner.id}/{uuid4()}"
+        await storage.write_object(presigned_name, b"direct")
+        common = {"owner_id": owner.id, "original_name": "big.bin", "file_type": "application/octet-stream"}
+        db.add_all([
+            UploadSession(
+                **common, total_size=4, chunk_size=4, total_chunks=1,
+                stored_name=stored_name, upload_id=upload_id, expires_at=expired
+            ),
+            UploadSession(
+                **common, total_size=4, chunk_size=4, total_chunks=1, stored_name=f"{owner.id}/{uuid4()}",
+                upload_id=uuid4().hex, expires_at=datetime.utcnow() + timedelta(hours=1)
+            ),
+            PresignedUpload(**common, total_size=6, stored_name=presigned_name, expires_at=expired),
+        ])
+        db.commit()
+
+        assert (await GarbageCollector(db, storage).dry_run())["uploads"] == 2
+        run = await GarbageCollector(db, storage).run()
+
+        assert run.uploads_expired == 2
+        assert [s.status for s in db.query(UploadSession).all()] == [UploadSessionStatus.ACTIVE]
+        assert db.query(PresignedUpload).count() == 0
+        assert await storage.object_size(presigned_name) is None
+        assert not os.path.exists(storage.backend._upload_dir(upload_id))
+
+    @pytest.mark.asyncio
+    async def test_run_purges_user_with_files_uploaded_after_deletion(self, db, storage, owner):
+        """Test that a file a deleted user created after deletion does not keep the account alive"""
+        late = await make_file(db, storage, owner, b"late", deleted=False)
+        stored_name = late.stored_name
+        owner.deleted_at = datetime.utcnow() - timedelta(minutes=1)
+        db.commit()
+
+        collector = GarbageCollector(db, storage)
+        await collector.run()
+        # Грейс-период отсчитывается от мягкого удаления, сделанного этим запуском
+        db.refresh(late)
+        assert late.is_deleted
+
+        run = await collector.run()
+
+        assert run.users_deleted == 1
+        assert db.query(File).count() == 0
+        assert await storage.object_size(stored_name) is None
+        assert db.query(User).count() == 0
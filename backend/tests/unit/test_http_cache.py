@@ -0,0 +1,66 @@
+"""
+Unit tests for conditional request helpers
+"""
+from datetime import datetime
+from app.utils.http_cache import content_disposition, evaluate_preconditions, http_date, if_range_allows, make_etag
+
+MODIFIED = datetime(2026, 1, 8, 18, 0, 0, 500000)
+ETAG = make_etag("abc")
+
+
+class TestEvaluatePreconditions:
+    """Test suite for evaluate_preconditions"""
+
+    def test_plain_request(self):
+        """Test that a request without validators is served normally"""
+        assert evaluate_preconditions({}, ETAG, MODIFIED) is None
+
+    def test_if_none_match(self):
+        """Test weak comparison and lists in If-None-Match"""
+        assert evaluate_preconditions({"if-none-match": '"x", W/"abc"'}, ETAG, MODIFIED) == 304
+        assert evaluate_preconditions({"if-none-match": "*"}, ETAG, MODIFIED) == 304
+        assert evaluate_preconditions({"if-none-match": '"x"'}, ETAG, MODIFIED) is None
+
+    def test_if_match(self):
+        """Test that If-Match failures are reported as 412"""
+        assert evaluate_preconditions({"if-match": '"abc"'}, ETAG, MODIFIED) is None
+        assert evaluate_preconditions({"if-match": 'W/"abc"'}, ETAG, MODIFIED) == 412
+
+    def test_if_modified_since(self):
+        """Test date validators at one-second precision"""
+        same = {"if-modified-since": http_date(MODIFIED)}
+        earlier = {"if-modified-since": http_date(datetime(2025, 1, 1))}
+        assert evaluate_preconditions(same, ETAG, MODIFIED) == 304
+        assert evaluate_preconditions(earlier, ETAG, MODIFIED) is None
+
+    def test_if_none_match_takes_precedence(self):
+        """Test that If-Modified-Since is ignored when If-None-Match is present"""
+        headers = {"if-none-match": '"x"', "if-modified-since": http_date(MODIFIED)}
+        assert evaluate_preconditions(headers, ETAG, MODIFIED) is None
+
+
+class TestIfRange:
+    """Test suite for if_range_allows"""
+
+    def test_if_range(self):
+        """Test that ranges are served only for the current representation"""
+        assert if_range_allows({}, ETAG, MODIFIED)
+        assert if_range_allows({"if-range": ETAG}, ETAG, MODIFIED)
+        assert not if_range_allows({"if-range": '"old"'}, ETAG, MODIFIED)
+        assert if_range_allows({"if-range": http_date(MODIFIED)}, ETAG, MODIFIED)
+
+
+class TestContentDisposition:
+    """Test suite for content_disposition"""
+
+    def test_ascii_name(self):
+        """Test that a plain name is sent both as filename and filename*"""
+        assert content_disposition("report.pdf") == "attachment; filename=\"report.pdf\"; filename*=UTF-8''report.pdf"
+
+    def test_unicode_and_unsafe_characters(self):
+        """Test that non-latin-1 names, quotes and CR/LF cannot break the header"""
+        header = content_disposition('Отчёт "q"\r\n.zip')
+        header.encode("latin-1")
+        assert "\r" not in header and "\n" not in header
+        assert 'filename="_____ _q___.zip"' in header
+        assert header.endswith("filename*=UTF-8''%D0%9E%D1%82%D1%87%D1%91%D1%82%20%22q%22%0D%0A.zip")
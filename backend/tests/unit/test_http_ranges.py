@@ -0,0 +1,40 @@
+"""
+Unit tests for Range header parsing
+"""
+import pytest
+from app.utils.http_ranges import MAX_RANGES, RangeNotSatisfiableError, parse_range_header
+
+
+class TestParseRangeHeader:
+    """Test suite for parse_range_header"""
+
+    def test_no_header(self):
+        """Test that a missing header means the whole file"""
+        assert parse_range_header(None, 100) is None
+
+    def test_single_ranges(self):
+        """Test closed, open-ended and suffix ranges"""
+        assert parse_range_header("bytes=0-9", 100) == [(0, 9)]
+        assert parse_range_header("bytes=90-", 100) == [(90, 99)]
+        assert parse_range_header("bytes=-10", 100) == [(90, 99)]
+        assert parse_range_header("bytes=50-500", 100) == [(50, 99)]
+        assert parse_range_header("bytes=-500", 100) == [(0, 99)]
+
+    def test_overlapping_ranges_are_merged(self):
+        """Test that overlapping and adjacent ranges are coalesced"""
+        assert parse_range_header("bytes=10-20,0-5,6-9,50-60", 100) == [(0, 20), (50, 60)]
+
+    def test_invalid_header_is_ignored(self):
+        """Test that malformed headers fall back to the whole file"""
+        assert parse_range_header("items=0-1", 100) is None
+        assert parse_range_header("bytes=abc", 100) is None
+        assert parse_range_header("bytes=9-1", 100) is None
+        many = ",".join(f"{i * 2}-{i * 2}" for i in range(MAX_RANGES + 1))
+        assert parse_range_header(f"bytes={many}", 100) is None
+
+    def test_unsatisfiable(self):
+        """Test that ranges outside the file raise"""
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range_header("bytes=100-", 100)
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range_header("bytes=-5", 0)
@@ -0,0 +1,58 @@
+"""
+Unit tests for image derivatives
+render_derivative is called directly, without the process pool
+"""
+import io
+import pytest
+from PIL import Image
+from app.utils.images import render_derivative
+
+
+def make_image(image_format, size=(800, 400), mode="RGB", exif=None):
+    color = (10, 120, 200) if mode == "RGB" else (10, 120, 200, 100)
+    output = io.BytesIO()
+    Image.new(mode, size, color).save(output, format=image_format, **({"exif": exif} if exif else {}))
+    return output.getvalue()
+
+
+def open_result(data):
+    return Image.open(io.BytesIO(data))
+
+
+class TestRenderDerivative:
+    """Test suite for render_derivative"""
+
+    def test_resize_keeps_aspect_ratio(self):
+        """Test that the width is bounded and the height follows the proportions"""
+        result = open_result(render_derivative(make_image("PNG"), 200, "webp", 80, 10_000_000))
+
+        assert result.format == "WEBP"
+        assert result.size == (200, 100)
+
+    def test_never_upscales(self):
+        """Test that a small image keeps its size"""
+        result = open_result(render_derivative(make_image("PNG"), 2000, "png", 80, 10_000_000))
+
+        assert result.size == (800, 400)
+
+    def test_exif_rotation(self):
+        """Test that a rotated photo is bounded by its displayed width"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        result = open_result(render_derivative(make_image("JPEG", exif=exif), 100, "jpeg", 80, 10_000_000))
+
+        assert result.size == (100, 200)
+
+    def test_transparent_to_jpeg(self):
+        """Test that an image with alpha can be re-encoded as JPEG"""
+        result = open_result(render_derivative(make_image("PNG", mode="RGBA"), 100, "jpeg", 80, 10_000_000))
+
+        assert result.mode == "RGB"
+
+    def test_corrupt_image(self):
+        """Test that unreadable content raises ValueError"""
+        with pytest.raises(ValueError):
+            render_derivative(b"not an image", 100, "webp", 80, 10_000_000)
+
+        with pytest.raises(ValueError):
+            render_derivative(make_image("PNG"), 100, "webp", 80, 1000)
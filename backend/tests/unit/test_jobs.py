@@ -0,0 +1,115 @@
+"""
+Unit tests for the background job queue
+The worker runs against the in-memory broker, which mirrors the Redis broker's semantics
+"""
+import asyncio
+import pytest
+from app.jobs.base import Job
+from app.jobs.memory_broker import MemoryBroker
+from app.jobs.tasks import task
+from app.jobs.worker import Worker
+
+calls = []
+
+
+@task("test_record", queue="test")
+async def record(value):
+    calls.append(value)
+
+
+@task("test_flaky", queue="test", max_attempts=3)
+async def flaky(fail_times):
+    calls.append("attempt")
+    if len(calls) <= fail_times:
+        raise RuntimeError("temporary failure")
+
+
+def make_job(name, max_attempts=3, **payload):
+    return Job(queue="test", task=name, payload=payload, max_attempts=max_attempts)
+
+
+async def run_all(worker, broker):
+    # Выполнить всё, что готово к выдаче, без фоновых потребителей
+    while (job := await broker.dequeue("test", worker.visibility_timeout)) is not None:
+        await worker.execute(job)
+
+
+@pytest.fixture
+def broker():
+    calls.clear()
+    return MemoryBroker()
+
+
+@pytest.fixture
+def worker(broker, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "JOB_RETRY_BACKOFF", 0)
+    return Worker(broker, {"test": 2}, visibility_timeout=30, poll_interval=0.01)
+
+
+class TestJobQueue:
+    """Test suite for the job broker and worker"""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_and_is_acked(self, broker, worker):
+        """Test that a job is executed once and counted as processed"""
+        await broker.enqueue(make_job("test_record", value=42))
+
+        await run_all(worker, broker)
+
+        assert calls == [42]
+        stats = (await broker.stats(["test"]))["test"]
+        assert stats["processed"] == 1
+        assert stats["ready"] == stats["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_job_is_retried(self, broker, worker):
+        """Test that a failing job is retried until it succeeds"""
+        await broker.enqueue(make_job("test_flaky", fail_times=2))
+
+        await run_all(worker, broker)
+
+        assert calls == ["attempt"] * 3
+        stats = (await broker.stats(["test"]))["test"]
+        assert stats["retried"] == 2
+        assert stats["processed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_job_goes_to_dead_letter_after_max_attempts(self, broker, worker):
+        """Test that a job failing every attempt ends up in the dead letter queue"""
+        await broker.enqueue(make_job("test_flaky", max_attempts=2, fail_times=10))
+
+        await run_all(worker, broker)
+
+        assert len(calls) == 2
+        stats = (await broker.stats(["test"]))["test"]
+        assert stats["failed"] == 1
+        assert stats["dead"] == 1
+        assert stats["delayed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_job_is_redelivered(self, broker):
+        """Test that a job not finished within the visibility timeout is handed out again"""
+        await broker.enqueue(make_job("test_record", value=1))
+
+        first = await broker.dequeue("test", visibility_timeout=0)
+        second = await broker.dequeue("test", visibility_timeout=30)
+
+        assert second.id == first.id
+        assert second.attempts == 2
+        assert await broker.dequeue("test", visibility_timeout=30) is None
+        assert (await broker.stats(["test"]))["test"]["redelivered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_worker_consumes_in_background(self, broker, worker):
+        """Test that started consumers pick up jobs and stop cleanly"""
+        worker.start()
+        for value in range(5):
+            await broker.enqueue(make_job("test_record", value=value))
+        for _ in range(100):
+            if len(calls) == 5:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop(timeout=1)
+
+        assert sorted(calls) == list(range(5))
@@ -0,0 +1,141 @@
+"""
+Unit tests for LocalBackend
+Runs against a temporary directory, no object store required
+"""
+import asyncio
+import threading
+import pytest
+from app.storage.base import StorageError
+from app.storage.local_backend import LocalBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalBackend(str(tmp_path))
+    backend.ensure_ready()
+    return backend
+
+
+def read_all(backend, key):
+    return b"".join(backend.iter_object(key, 4))
+
+
+class TestLocalBackend:
+    """Test suite for LocalBackend"""
+
+    @pytest.mark.asyncio
+    async def test_writer_creates_object(self, backend):
+        """Test that a streamed write becomes visible only after complete()"""
+        writer = backend.open_writer("user/object")
+        await writer.write(b"hello ")
+        await writer.write(b"world")
+
+        with pytest.raises(StorageError):
+            read_all(backend, "user/object")
+
+        await writer.complete()
+
+        assert read_all(backend, "user/object") == b"hello world"
+        assert writer.size == 11
+
+    @pytest.mark.asyncio
+    async def test_writer_abort_leaves_nothing(self, backend, tmp_path):
+        """Test that abort() removes the temporary file"""
+        writer = backend.open_writer("user/aborted")
+        await writer.write(b"partial")
+        await writer.abort()
+
+        assert list((tmp_path / ".tmp").iterdir()) == []
+        with pytest.raises(StorageError):
+            read_all(backend, "user/aborted")
+
+    @pytest.mark.asyncio
+    async def test_multipart_parts_in_any_order(self, backend):
+        """Test that parts uploaded out of order are assembled by number"""
+        upload_id = await backend.create_multipart_upload("user/multi")
+        etag2 = await backend.upload_part("user/multi", upload_id, 2, b"second")
+        etag1 = await backend.upload_part("user/multi", upload_id, 1, b"first-")
+
+        await backend.complete_multipart_upload("user/multi", upload_id, [(2, etag2), (1, etag1)])
+
+        assert read_all(backend, "user/multi") == b"first-second"
+
+    @pytest.mark.asyncio
+    async def test_copy_and_delete(self, backend):
+        """Test that a copy survives deletion of the source"""
+        writer = backend.open_writer("user/source")
+        await writer.write(b"content")
+        await writer.complete()
+
+        await backend.copy("user/source", "blobs/abc")
+        await backend.delete("user/source")
+        await backend.delete("user/source")  # повторное удаление — не ошибка
+
+        assert read_all(backend, "blobs/abc") == b"content"
+        assert backend.local_path("blobs/abc").endswith("blobs/abc")
+
+    def test_key_outside_root_rejected(self, backend):
+        """Test that keys cannot escape the storage directory"""
+        with pytest.raises(StorageError):
+            backend.path_for("../etc/passwd")
+
+    @pytest.mark.asyncio
+    async def test_stream_reads_in_chunks(self, backend):
+        """Test that stream() yields bounded chunks of the requested range"""
+        writer = backend.open_writer("user/streamed")
+        await writer.write(bytes(range(100)))
+        await writer.complete()
+
+        chunks = [chunk async for chunk in backend.stream("user/streamed", 10, 50, chunk_size=16)]
+
+        assert b"".join(chunks) == bytes(range(10, 60))
+        assert max(len(chunk) for chunk in chunks) <= 16
+
+    @pytest.mark.asyncio
+    async def test_cancelled_stream_closes_reader_after_read(self, backend):
+        """Test that a cancelled stream closes the reader only once the read in progress returns"""
+        writer = backend.open_writer("user/slow")
+        await writer.write(b"data")
+        await writer.complete()
+
+        events = []
+        started, release = threading.Event(), threading.Event()
+        open_reader = backend.open_reader
+
+        class SlowReader:
+            def __init__(self, reader):
+                self.reader = reader
+
+            def read(self, size):
+                events.append("read")
+                started.set()
+                release.wait(5)
+                data = self.reader.read(size)
+                events.append("read done")
+                return data
+
+            def close(self):
+                events.append("close")
+                self.reader.close()
+
+        backend.open_reader = lambda *args: SlowReader(open_reader(*args))
+
+        async def consume():
+            async for _ in backend.stream("user/slow"):
+                pass
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        await asyncio.sleep(0.05)
+        assert "close" not in events
+
+        release.set()
+        for _ in range(100):
+            if "close" in events:
+                break
+            await asyncio.sleep(0.01)
+        assert events == ["read", "read done", "close"]
@@ -0,0 +1,79 @@
+"""
+Unit tests for the in-memory small-object cache
+"""
+import pytest
+from app.storage.cached_backend import CachedBackend
+from app.storage.local_backend import LocalBackend
+from app.storage.memory_cache import MemoryCache
+
+
+class RemoteLikeBackend(LocalBackend):
+    def local_path(self, key):
+        return None
+
+
+async def put(backend, key, data):
+    writer = backend.open_writer(key)
+    await writer.write(data)
+    await writer.complete()
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = CachedBackend(
+        RemoteLikeBackend(str(tmp_path)),
+        memory_cache=MemoryCache(max_bytes=100, max_object_size=40)
+    )
+    backend.ensure_ready()
+    return backend
+
+
+class TestMemoryCache:
+    """Test suite for MemoryCache"""
+
+    def test_lru_budget(self):
+        """Test that the byte budget evicts least recently used entries"""
+        cache = MemoryCache(max_bytes=10, max_object_size=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        assert cache.get("a") == b"aaaa"
+        cache.put("c", b"cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.stats()["bytes"] == 8
+        assert cache.stats()["evictions"] == 1
+
+    def test_size_threshold(self):
+        """Test that objects above the threshold are not cached"""
+        cache = MemoryCache(max_bytes=100, max_object_size=4)
+        cache.put("big", b"12345")
+        assert cache.get("big") is None
+
+    def test_invalidation_during_fill(self):
+        """Test that a fill started before a delete is dropped"""
+        cache = MemoryCache(max_bytes=100, max_object_size=100)
+        generation = cache.begin_fill()
+        cache.invalidate("key")
+        cache.put("key", b"stale", generation)
+        assert cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_backend_serves_small_objects_from_memory(self, backend):
+        """Test read-through, range reads from memory and delete invalidation"""
+        await put(backend, "small", b"0123456789")
+        await put(backend, "large", b"x" * 50)
+
+        assert b"".join([c async for c in backend.stream("small")]) == b"0123456789"
+        assert await backend.read("large") == b"x" * 50
+        assert backend.memory_cache.contains("small")
+        assert not backend.memory_cache.contains("large")
+
+        assert await backend.read("small") == b"0123456789"
+        assert b"".join([c async for c in backend.stream("small", 2, 3, chunk_size=2)]) == b"234"
+        stats = backend.cache_stats()["memory"]
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+
+        await backend.delete("small")
+        assert not backend.memory_cache.contains("small")
@@ -0,0 +1,85 @@
+"""
+Unit tests for MultipartWriter
+Uses an in-memory stand-in for the MinIO client
+"""
+import threading
+import pytest
+from app.storage.multipart_writer import MultipartWriter
+
+
+class InMemoryMinio:
+    """Minimal subset of the Minio client used by MultipartWriter"""
+
+    def __init__(self, fail_part=None):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+        self.fail_part = fail_part
+        self.lock = threading.Lock()
+
+    def put_object(self, bucket, name, data, length, content_type=None):
+        self.objects[name] = data.read(length)
+
+    def _create_multipart_upload(self, bucket, name, headers):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def _upload_part(self, bucket, name, data, headers, upload_id, part_number):
+        if part_number == self.fail_part:
+            raise RuntimeError("part upload failed")
+        with self.lock:
+            self.uploads[upload_id][part_number] = data
+        return f"etag-{part_number}"
+
+    def _complete_multipart_upload(self, bucket, name, upload_id, parts):
+        received = self.uploads.pop(upload_id)
+        self.objects[name] = b"".join(received[p.part_number] for p in parts)
+
+    def _abort_multipart_upload(self, bucket, name, upload_id):
+        self.aborted.append(upload_id)
+        self.uploads.pop(upload_id, None)
+
+
+class TestMultipartWriter:
+    """Test suite for MultipartWriter"""
+
+    @pytest.mark.asyncio
+    async def test_small_object_uses_single_put(self):
+        """Test that data smaller than one part is uploaded with put_object"""
+        client = InMemoryMinio()
+        writer = MultipartWriter(client, "bucket", "small", part_size=10)
+
+        await writer.write(b"hello")
+        await writer.complete()
+
+        assert client.objects["small"] == b"hello"
+        assert client.uploads == {}
+
+    @pytest.mark.asyncio
+    async def test_large_object_assembled_in_order(self):
+        """Test that parts uploaded in parallel are assembled in order"""
+        client = InMemoryMinio()
+        writer = MultipartWriter(client, "bucket", "large", part_size=10, parallelism=3)
+        data = bytes(range(95))
+
+        for i in range(0, len(data), 7):
+            await writer.write(data[i:i + 7])
+        await writer.complete()
+
+        assert client.objects["large"] == data
+        assert writer.size == len(data)
+
+    @pytest.mark.asyncio
+    async def test_failed_part_aborts_upload(self):
+        """Test that a failed part surfaces the error and abort() cleans up"""
+        client = InMemoryMinio(fail_part=2)
+        writer = MultipartWriter(client, "bucket", "broken", part_size=10)
+
+        with pytest.raises(RuntimeError):
+            await writer.write(b"x" * 50)
+            await writer.complete()
+        await writer.abort()
+
+        assert "broken" not in client.objects
+        assert client.aborted == ["upload-0"]
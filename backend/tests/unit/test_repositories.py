@@ -6,6 +6,7 @@ import pytest
 from uuid import uuid4
 from app.repositories.user_repository import UserRepository
 from app.repositories.file_repository import FileRepository
+from app.repositories.blob_repository import BlobRepository
 from app.schemas.user import User
 from app.schemas.file import File
 
@@ -253,6 +254,39 @@ class TestFileRepository:
         found = repo.get_by_id(str(file.id))
         assert found is None  # get_by_id filters out deleted files
 
+    def test_soft_delete_many_only_owned_files(self, db, test_user):
+        """Test bulk soft deletion skips files of other users"""
+        repo = FileRepository(db)
+        other = UserRepository(db).create(
+            email="otherowner@test.com",
+            username="otherowner",
+            hashed_password="hashed_pass"
+        )
+
+        def make_file(owner):
+            return repo.create({
+                "owner_id": owner.id,
+                "original_name": "bulk.txt",
+                "stored_name": f"{uuid4()}.txt",
+                "file_size": 100,
+                "file_type": "text/plain",
+                "folder": "root",
+                "file_hash": "bulkhash",
+                "s3_path": "/files/bulk.txt"
+            })
+
+        own = make_file(test_user)
+        foreign = make_file(other)
+
+        rows = repo.soft_delete_many(str(test_user.id), file_ids=[str(own.id), str(foreign.id)])
+
+        assert [row[0] for row in rows] == [own.id]
+        assert repo.get_by_id(str(own.id)) is None
+        assert repo.get_by_id(str(foreign.id)) is not None
+
+        # Повторное удаление ничего не возвращает
+        assert repo.soft_delete_many(str(test_user.id), file_ids=[str(own.id)]) == []
+
     def test_update_file_name(self, db, test_user):
         """Test updating file name"""
         repo = FileRepository(db)
@@ -306,3 +340,51 @@ class TestFileRepository:
         page1_ids = {str(f.id) for f in page1}
         page2_ids = {str(f.id) for f in page2}
         assert page1_ids.isdisjoint(page2_ids)
+
+
+class TestBlobRepository:
+    """Test suite for BlobRepository"""
+
+    def test_create_blob(self, db):
+        """Test creating a blob with a single reference"""
+        repo = BlobRepository(db)
+        file_hash = uuid4().hex * 2
+
+        blob = repo.create(file_hash, f"blobs/{file_hash}", 2048)
+
+        assert blob is not None
+        assert blob.hash == file_hash
+        assert blob.ref_count == 1
+
+    def test_add_reference_increments_count(self, db):
+        """Test that add_reference bumps the reference counter"""
+        repo = BlobRepository(db)
+        file_hash = uuid4().hex * 2
+        repo.create(file_hash, f"blobs/{file_hash}", 10)
+
+        blob = repo.add_reference(file_hash)
+
+        assert blob is not None
+        assert blob.ref_count == 2
+
+    def test_add_reference_missing_blob(self, db):
+        """Test that add_reference returns None for unknown content"""
+        repo = BlobRepository(db)
+
+        assert repo.add_reference(uuid4().hex * 2) is None
+
+    def test_remove_references_returns_remaining_count(self, db):
+        """Test batched reference removal and cleanup of unreferenced blobs"""
+        repo = BlobRepository(db)
+        shared, single = uuid4().hex * 2, uuid4().hex * 2
+        repo.create(shared, f"blobs/{shared}", 10)
+        repo.add_reference(shared)
+        repo.create(single, f"blobs/{single}", 10)
+
+        released = repo.remove_references({shared: 1, single: 1})
+        repo.delete_unreferenced([h for h, _, count in released if count <= 0])
+        db.commit()
+
+        assert sorted((h, count) for h, _, count in released) == sorted([(shared, 1), (single, 0)])
+        assert repo.get_by_hash(single) is None
+        assert repo.get_by_hash(shared).ref_count == 1
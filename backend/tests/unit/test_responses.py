@@ -0,0 +1,53 @@
+"""
+Unit tests for download responses
+Sendfile from the local disk and the fallback to streaming from storage
+"""
+import os
+import pytest
+from starlette.responses import StreamingResponse
+from app.api.responses import SendfileResponse, ranged_response
+
+DATA = b"0123456789" * 10
+
+
+async def send_response(response):
+    messages = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http", "method": "GET", "extensions": {}}, receive, send)
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def open_stream(offset, length):
+    async def stream():
+        yield DATA[offset:None if length is None else offset + length]
+    return stream()
+
+
+class TestRangedResponse:
+    """Test suite for ranged_response"""
+
+    @pytest.mark.asyncio
+    async def test_file_removed_after_open_is_still_sent(self, tmp_path):
+        """Test that the file is opened up front, so eviction before sending does not break the response"""
+        path = tmp_path / "cached"
+        path.write_bytes(DATA)
+
+        response = ranged_response(open_stream, len(DATA), [(10, 19)], {}, local_path=str(path))
+        os.unlink(path)
+
+        assert isinstance(response, SendfileResponse)
+        assert await send_response(response) == DATA[10:20]
+
+    @pytest.mark.asyncio
+    async def test_missing_file_falls_back_to_stream(self, tmp_path):
+        """Test that a file evicted before it could be opened is streamed from storage"""
+        response = ranged_response(open_stream, len(DATA), None, {}, local_path=str(tmp_path / "evicted"))
+
+        assert isinstance(response, StreamingResponse)
+        assert await send_response(response) == DATA
@@ -0,0 +1,57 @@
+"""
+Unit tests for upload admission control
+Covers route limits and reading file names from multipart part headers
+"""
+from app.config import get_settings
+from app.middleware.upload_limits import MultipartFilenames, upload_limit
+
+settings = get_settings()
+BOUNDARY = b"----form-boundary"
+
+
+def form(*parts):
+    body = b""
+    for headers, content in parts:
+        body += b"--" + BOUNDARY + b"\r\n" + headers + b"\r\n\r\n" + content + b"\r\n"
+    return body + b"--" + BOUNDARY + b"--\r\n"
+
+
+def file_part(filename, content):
+    return f'Content-Disposition: form-data; name="files"; filename="{filename}"'.encode(), content
+
+
+class TestUploadLimits:
+    """Test suite for upload_limit and MultipartFilenames"""
+
+    def test_route_limits(self):
+        """Test that only upload routes are limited, each with its own cap"""
+        api = settings.API_V1_STR
+        assert upload_limit("POST", f"{api}/files/upload") == (
+            settings.MAX_FILE_SIZE + settings.UPLOAD_FORM_OVERHEAD, True
+        )
+        assert upload_limit("POST", f"{api}/files/0b7e/versions")[1] is True
+        assert upload_limit("POST", f"{api}/files/upload/batch") == (settings.BATCH_UPLOAD_MAX_SIZE, False)
+        assert upload_limit("PUT", f"{api}/files/uploads/0b7e/chunks/3") == (settings.UPLOAD_CHUNK_SIZE, False)
+        assert upload_limit("GET", f"{api}/files/upload") is None
+        assert upload_limit("POST", f"{api}/files/0b7e/versions/2/download") is None
+
+    def test_filenames_split_across_pieces(self):
+        """Test that names are found however the body is split, fields without a name are skipped"""
+        body = form(
+            (b'Content-Disposition: form-data; name="folder"', b"docs"),
+            file_part("report.pdf", b"a" * 3000),
+            file_part("tool.exe", b"b" * 10),
+        )
+        for size in (1, 7, 64, len(body)):
+            scanner = MultipartFilenames(BOUNDARY)
+            names = []
+            for start in range(0, len(body), size):
+                names.extend(scanner.feed(body[start:start + size]))
+            assert names == ["report.pdf", "tool.exe"]
+
+    def test_content_is_not_parsed_as_headers(self):
+        """Test that header-like bytes inside file content are ignored"""
+        fake = b'--' + BOUNDARY + b'\nContent-Disposition: form-data; name="x"; filename="evil.exe"\r\n\r\n'
+        scanner = MultipartFilenames(BOUNDARY)
+
+        assert scanner.feed(form(file_part("notes.txt", fake))) == ["notes.txt"]